@@ -1,87 +1,125 @@
+import asyncio
+import logging
+import os
+import time
+
 from dotenv import load_dotenv
 from livekit.plugins import cartesia, groq, deepgram
 from livekit import agents, rtc
-from livekit.agents import AgentServer, AgentSession, Agent, room_io
+from livekit.agents import AgentServer, AgentSession, JobProcess, room_io
 from livekit.plugins import noise_cancellation, silero
 from livekit.plugins.turn_detector.multilingual import MultilingualModel
+from prometheus_client import Histogram
 
-# Import all tools
-from tools import (
-    # Weather & DateTime
-    get_weather,
-    get_current_datetime,
-    get_current_date,
-    get_current_time,
-    
-    # Doctor & Schedule
-    get_doctor_schedule,
-    check_doctor_availability,
-    list_all_departments,
-    
-    # Appointments
-    book_appointment,
-    check_patient_appointments,
-    cancel_appointment,
-    
-    # Department Info
-    get_department_info,
-    get_visiting_hours,
-    
-    # Emergency
-    get_emergency_info,
-    get_ambulance_service,
-)
+from tools.weather import close_http_session
 
 # Import prompts
-from prompts import ASSISTANT_INSTRUCTIONS, GREETING_INSTRUCTIONS
+from prompts import GREETING_TEXT, HOLD_TEXT
 
 # Import database
+from database.indexes import MissingIndexError
 from database.mongodb import MongoDB
+from database.directory import DirectoryCache
+from conversation.intent_router import ANSWERS
+from conversation.receptionist import HospitalReceptionist
+from conversation.state import SIP_PHONE_ATTRIBUTE, CallState
+from conversation.utterance_cache import UtteranceCache
+from observability.logs import bind_call, setup_logging
+from observability.metrics import register_process_exit, start_metrics_server
+from observability.worker_load import LoopLagMonitor, WorkerLoad
 
 load_dotenv()
 
+logger = logging.getLogger("receptionist")
+
+TTS_MODEL = "sonic-3"
+TTS_VOICE = "f786b574-daa5-4673-aa0c-cbe3e8534c02"
+
+# Played from the on-disk audio cache instead of live TTS
+FIXED_UTTERANCES = [GREETING_TEXT, HOLD_TEXT, *ANSWERS.values()]
+
+# AGENT_PREWARM=0 loads models and connects to MongoDB inside each call, as
+# before worker prewarm, to measure the difference in FIRST_AUDIO
+PREWARM = os.getenv("AGENT_PREWARM", "1") == "1"
+
+FIRST_AUDIO = Histogram(
+    "hospital_first_audio_seconds",
+    "Time from job dispatch to the first greeting audio, by whether the worker prewarms",
+    ["prewarm"],
+    buckets=(0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0),
+)
+
+
+# Reports sessions, CPU and event-loop lag; jobs over the threshold go to other workers
+worker_load = WorkerLoad()
+server = AgentServer(load_threshold=worker_load.threshold)
+server.load_fnc = worker_load
+
+
+def prewarm(proc: JobProcess):
+    """Load models and open the MongoDB pool once per worker process."""
+    setup_logging()
+    if PREWARM:
+        proc.userdata["vad"] = silero.VAD.load()
+        proc.userdata["turn_detection"] = MultilingualModel()
+        MongoDB.init()
+    register_process_exit()
+
+
+server.setup_fnc = prewarm
 
-class HospitalReceptionist(Agent):
-    def __init__(self) -> None:
-        super().__init__(
-            instructions=ASSISTANT_INSTRUCTIONS,
-            tools=[
-                # Weather & DateTime
-                get_weather,
-                get_current_datetime,
-                get_current_date,
-                get_current_time,
-                
-                # Doctor & Schedule
-                get_doctor_schedule,
-                check_doctor_availability,
-                list_all_departments,
-                
-                # Appointments
-                book_appointment,
-                check_patient_appointments,
-                cancel_appointment,
-                
-                # Department Info
-                get_department_info,
-                get_visiting_hours,
-                
-                # Emergency
-                get_emergency_info,
-                get_ambulance_service,
-            ],
-        )
-
-
-server = AgentServer()
-
-
-@server.rtc_session()
+
+async def warm_data_layer():
+    """Ping MongoDB and load the directory without blocking call pickup."""
+    try:
+        try:
+            await MongoDB.connect()
+        except MissingIndexError:
+            # book_appointment refuses to book until the index exists
+            logger.critical("double-booking guard is missing; bookings are refused", exc_info=True)
+        await DirectoryCache.ensure_loaded()
+    except Exception:
+        logger.exception("data layer warmup failed; tools will retry on demand")
+
+
+@server.rtc_session(on_request=worker_load.on_request)
 async def receptionist_agent(ctx: agents.JobContext):
-    # Connect to MongoDB (synchronous - no await)
-    await MongoDB.connect()  # ← REMOVED await
+    dispatched_at = time.perf_counter()
+    # Every log line from this call (and the tasks it starts) carries these
+    bind_call(call_id=ctx.job.id, room=ctx.room.name)
+    
+    # Background work for this call only; proc.userdata is shared by every job in the process
+    tasks = set()
+    
+    def spawn(coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        return task
+    
+    async def cancel_tasks():
+        for task in list(tasks):
+            task.cancel()
+    
+    ctx.add_shutdown_callback(cancel_tasks)
+    
+    if PREWARM:
+        # Runs alongside session start and the greeting; the pool already exists from prewarm
+        spawn(warm_data_layer())
+        vad, turn_detection = ctx.proc.userdata["vad"], ctx.proc.userdata["turn_detection"]
+    else:
+        vad, turn_detection = silero.VAD.load(), MultilingualModel()
+        await warm_data_layer()
+    ctx.add_shutdown_callback(close_http_session)
+    lag_monitor = LoopLagMonitor()
+    lag_monitor.start()
+    ctx.add_shutdown_callback(lag_monitor.stop)
     
-    session = AgentSession(
+    timings = {}
+    state = CallState()
+    
+    session = AgentSession[CallState](
+        userdata=state,
         stt=deepgram.STTv2(
             model="flux-general-en",
             eager_eot_threshold=0.4,
@@ -90,16 +128,51 @@ async def receptionist_agent(ctx: agents.JobContext):
             model="openai/gpt-oss-120b"
         ),
         tts=cartesia.TTS(
-            model="sonic-3",
-            voice="f786b574-daa5-4673-aa0c-cbe3e8534c02",
+            model=TTS_MODEL,
+            voice=TTS_VOICE,
         ),
-        vad=silero.VAD.load(),
-        turn_detection=MultilingualModel(),
+        vad=vad,
+        turn_detection=turn_detection,
     )
+    
+    utterances = UtteranceCache(session.tts, voice=TTS_VOICE, model=TTS_MODEL)
+    spawn(utterances.prewarm(FIXED_UTTERANCES))
+    agent = HospitalReceptionist(utterances, state)
+    
+    async def prefetch_caller():
+        # Overlaps with the greeting; returning SIP callers are known before they speak
+        participant = await ctx.wait_for_participant()
+        if participant.kind != rtc.ParticipantKind.PARTICIPANT_KIND_SIP:
+            return
+        task = state.start_prefetch(participant.attributes.get(SIP_PHONE_ATTRIBUTE, ""))
+        if task is not None:
+            await task
+            logger.info("caller prefetch done (room %s, known patient: %s)", ctx.room.name, state.patient is not None)
+    
+    spawn(prefetch_caller())
+    
+    async def log_call_report():
+        logger.info("intent router for room %s: %s", ctx.room.name, agent.intent_router.stats())
+        logger.info("phases for room %s: %s", ctx.room.name, agent.phases.stats())
+        logger.info("chat context for room %s: %s", ctx.room.name, agent.compactor.stats())
+        logger.info("tool memo for room %s: %s", ctx.room.name, state.memo.stats())
+    
+    ctx.add_shutdown_callback(log_call_report)
+    
+    @session.on("agent_state_changed")
+    def _on_agent_state_changed(ev):
+        # Time from dispatch to the first greeting audio, logged once per call
+        if ev.new_state == "speaking" and "first_audio_ms" not in timings:
+            timings["first_audio_ms"] = (time.perf_counter() - dispatched_at) * 1000
+            FIRST_AUDIO.labels(prewarm="1" if PREWARM else "0").observe(timings["first_audio_ms"] / 1000)
+            logger.info(
+                "first greeting audio %.0f ms after dispatch (room %s, prewarm %s)",
+                timings["first_audio_ms"], ctx.room.name, PREWARM,
+            )
 
     await session.start(
         room=ctx.room,
-        agent=HospitalReceptionist(),
+        agent=agent,
         room_options=room_io.RoomOptions(
             audio_input=room_io.AudioInputOptions(
                 noise_cancellation=lambda params: noise_cancellation.BVCTelephony() 
@@ -109,10 +182,10 @@ async def receptionist_agent(ctx: agents.JobContext):
         ),
     )
 
-    await session.generate_reply(
-        instructions=GREETING_INSTRUCTIONS
-    )
+    # Fixed greeting from the audio cache: no LLM generation, no TTS after the first call
+    utterances.say(session, GREETING_TEXT)
 
 
 if __name__ == "__main__":
+    start_metrics_server()
     agents.cli.run_app(server)
\ No newline at end of file
@@ -0,0 +1,166 @@
+"""Benchmark for the phonetic/trigram name resolver.
+
+Builds a resolver over synthetic doctor names, then resolves queries that
+carry the kind of noise speech-to-text produces (dropped or swapped
+letters, sound-alike spellings, missing first names, honorifics) and
+prints a JSON report with build time, lookup latency and accuracy.
+
+A share of the queries (``--unknown``) name doctors who are not in the
+directory, built from the same first and last names. Any of those that
+pass the acceptance rule would book the wrong doctor, so they count
+against ``accepted_precision`` and show up as ``unknown_accept_rate``.
+
+    uv run python -m benchmarks.name_resolver --names 10000 --queries 5000
+
+No database is needed.
+"""
+
+import argparse
+import json
+import random
+import time
+
+from database.name_resolver import NameResolver
+
+FIRST_NAMES = [
+    "Aisha", "Ahmed", "Ali", "Amir", "Anna", "Ayesha", "Bilal", "Carlos", "Chen", "Daniel",
+    "David", "Elena", "Emily", "Fatima", "Hassan", "Imran", "James", "John", "Julia", "Kamal",
+    "Laura", "Leila", "Maria", "Michael", "Mohammed", "Nadia", "Omar", "Priya", "Rahul", "Sara",
+    "Sarah", "Sofia", "Tariq", "Thomas", "Usman", "Wei", "Yusuf", "Zainab", "Zara", "Peter",
+]
+LAST_NAMES = [
+    "Ahmed", "Ali", "Baker", "Chaudhry", "Chen", "Clark", "Davis", "Farooq", "Garcia", "Hussain",
+    "Iqbal", "Jackson", "Johnson", "Khan", "Kim", "Lee", "Lopez", "Malik", "Martin", "Mirza",
+    "Nguyen", "Patel", "Qureshi", "Rashid", "Rodriguez", "Saleem", "Shah", "Sheikh", "Siddiqui", "Singh",
+    "Smith", "Taylor", "Thompson", "Walker", "Wang", "White", "Williams", "Wilson", "Wright", "Young",
+]
+# Sound-alike substitutions typical of transcription errors
+SOUND_ALIKES = [("ph", "f"), ("ck", "k"), ("ee", "i"), ("ie", "y"), ("ou", "u"), ("z", "s"), ("ll", "l"), ("c", "k")]
+
+
+def make_names(count: int, rng: random.Random, seen: set = None) -> list:
+    names, seen = [], seen if seen is not None else set()
+    while len(names) < count:
+        # A middle initial or second surname keeps 10k names mostly distinct
+        parts = [rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)]
+        if rng.random() < 0.8:
+            parts.insert(1, rng.choice(FIRST_NAMES + LAST_NAMES))
+        name = "Dr. " + " ".join(parts)
+        if name not in seen:
+            seen.add(name)
+            names.append(name)
+    return names
+
+
+def add_noise(name: str, rng: random.Random) -> str:
+    words = name.split()[1:]
+    kind = rng.choice(["exact", "swap", "drop", "sound", "honorific"])
+    if kind == "swap":
+        word = rng.randrange(len(words))
+        w = words[word]
+        if len(w) > 3:
+            i = rng.randrange(1, len(w) - 2)
+            words[word] = w[:i] + w[i + 1] + w[i] + w[i + 2:]
+    elif kind == "drop":
+        word = rng.randrange(len(words))
+        w = words[word]
+        if len(w) > 3:
+            i = rng.randrange(1, len(w) - 1)
+            words[word] = w[:i] + w[i + 1:]
+    elif kind == "sound":
+        text = " ".join(words).lower()
+        for old, new in rng.sample(SOUND_ALIKES, len(SOUND_ALIKES)):
+            if old in text:
+                text = text.replace(old, new, 1)
+                break
+        words = text.split()
+    elif kind == "honorific":
+        words = [rng.choice(["doctor", "Dr", "dr."])] + words
+    return " ".join(words)
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run(args) -> dict:
+    rng = random.Random(args.seed)
+    names = make_names(args.names, rng)
+
+    resolver = NameResolver()
+    start = time.perf_counter()
+    for i, name in enumerate(names):
+        resolver.add(i, name)
+    build_seconds = time.perf_counter() - start
+
+    # Incremental update cost: rename 1% of the entries in place
+    renamed = max(1, len(names) // 100)
+    start = time.perf_counter()
+    for i in rng.sample(range(len(names)), renamed):
+        resolver.add(i, names[i] + " Jr")
+        resolver.add(i, names[i])
+    update_seconds = (time.perf_counter() - start) / (renamed * 2)
+
+    unknown_queries = round(args.queries * args.unknown)
+    known_queries = args.queries - unknown_queries
+    unknown_names = make_names(unknown_queries, rng, seen=set(names))
+    queries = [(rng.randrange(len(names)), None) for _ in range(known_queries)]
+    queries += [(None, name) for name in unknown_names]
+    rng.shuffle(queries)
+
+    latencies, correct, accepted, accepted_correct, unknown_accepted = [], 0, 0, 0, 0
+    for target, unknown in queries:
+        query = add_noise(names[target] if unknown is None else unknown, rng)
+        start = time.perf_counter()
+        match = resolver.resolve(query)
+        latencies.append(time.perf_counter() - start)
+        hit = target is not None and match is not None and match.entry_id == target
+        correct += hit
+        if match is not None and match.is_clear(args.min_confidence, args.min_margin):
+            accepted += 1
+            accepted_correct += hit
+            unknown_accepted += unknown is not None
+    latencies.sort()
+
+    return {
+        "config": {
+            "names": args.names,
+            "queries": args.queries,
+            "unknown": args.unknown,
+            "min_confidence": args.min_confidence,
+            "min_margin": args.min_margin,
+            "seed": args.seed,
+        },
+        "build_ms": round(build_seconds * 1000, 2),
+        "update_us": round(update_seconds * 1e6, 2),
+        "resolve_p50_us": round(percentile(latencies, 0.50) * 1e6, 2),
+        "resolve_p99_us": round(percentile(latencies, 0.99) * 1e6, 2),
+        "top1_accuracy": round(correct / known_queries, 4) if known_queries else 0.0,
+        "accepted_rate": round((accepted - unknown_accepted) / known_queries, 4) if known_queries else 0.0,
+        "accepted_precision": round(accepted_correct / accepted, 4) if accepted else 0.0,
+        "unknown_accept_rate": round(unknown_accepted / unknown_queries, 4) if unknown_queries else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--names", type=int, default=10000, help="directory size")
+    parser.add_argument("--queries", type=int, default=5000, help="noisy lookups to run")
+    parser.add_argument("--unknown", type=float, default=0.2, help="share of queries naming doctors not in the directory")
+    parser.add_argument("--min-confidence", type=float, default=0.65, help="acceptance threshold to evaluate")
+    parser.add_argument("--min-margin", type=float, default=0.15, help="required lead over the runner-up")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
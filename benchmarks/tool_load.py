@@ -0,0 +1,240 @@
+"""Load test for the tool layer against a local MongoDB.
+
+Simulates concurrent callers invoking the real tool coroutines with a stub
+RunContext and prints a JSON report (throughput, latency percentiles,
+conflict rate) that can be diffed between runs.
+
+    uv run python -m benchmarks.tool_load --callers 50 --duration 30 --output run.json
+
+The benchmark database (``hospital_bench`` by default) is wiped and
+re-seeded on every run.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+from typing import Dict, List
+
+# Default mix: 60% schedule checks, 25% bookings, 15% lookups/cancels
+DEFAULT_MIX = {
+    "get_doctor_schedule": 30,
+    "check_doctor_availability": 20,
+    "find_available_slots": 10,
+    "book_appointment": 25,
+    "check_patient_appointments": 10,
+    "cancel_appointment": 5,
+}
+
+DEPARTMENTS = ["Cardiology", "Neurology", "Orthopedics", "Pediatrics", "General Medicine"]
+DOCTORS = ["Dr. Sarah Ahmed", "Dr. Michael Chen", "Dr. Emily Rodriguez", "Dr. James Wilson", "Dr. Aisha Khan"]
+# Popular doctors get most requests, which is what drives booking conflicts
+DOCTOR_WEIGHTS = [8, 4, 3, 2, 1]
+TIMES = [f"{hour:02d}:{minute:02d}" for hour in range(8, 18) for minute in (0, 15, 30, 45)]
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    mix = {}
+    for part in value.split(","):
+        name, weight = part.split("=")
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown tool {name!r}")
+        mix[name] = int(weight)
+    return mix
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.outcomes: Dict[str, Dict[str, int]] = {}
+        self.booked_ids: List[tuple] = []
+
+    def record(self, tool: str, seconds: float, outcome: str):
+        self.latencies.setdefault(tool, []).append(seconds)
+        counts = self.outcomes.setdefault(tool, {})
+        counts[outcome] = counts.get(outcome, 0) + 1
+
+    def report(self, elapsed: float, config: dict) -> dict:
+        tools = {}
+        total = 0
+        for tool, values in sorted(self.latencies.items()):
+            values.sort()
+            total += len(values)
+            tools[tool] = {
+                "calls": len(values),
+                "outcomes": self.outcomes[tool],
+                "p50_ms": round(percentile(values, 0.50) * 1000, 2),
+                "p95_ms": round(percentile(values, 0.95) * 1000, 2),
+                "p99_ms": round(percentile(values, 0.99) * 1000, 2),
+                "max_ms": round(values[-1] * 1000, 2),
+            }
+
+        bookings = self.outcomes.get("book_appointment", {})
+        attempts = sum(bookings.values())
+        return {
+            "config": config,
+            "elapsed_seconds": round(elapsed, 3),
+            "total_calls": total,
+            "throughput_per_second": round(total / elapsed, 2) if elapsed else 0.0,
+            "booking_conflict_rate": round(bookings.get("conflict", 0) / attempts, 4) if attempts else 0.0,
+            "error_rate": round(
+                sum(counts.get("error", 0) for counts in self.outcomes.values()) / total, 4
+            ) if total else 0.0,
+            "tools": tools,
+        }
+
+
+def classify(tool: str, result: str) -> str:
+    if tool == "book_appointment":
+        if result.startswith("BOOKING CONFIRMED"):
+            return "booked"
+        if "already booked" in result:
+            return "conflict"
+        return "rejected"
+    if tool == "cancel_appointment":
+        return "cancelled" if result.startswith("CANCELLED") else "not_found"
+    return "ok"
+
+
+class SyntheticCaller:
+    def __init__(self, caller_id: int, tools, recorder: Recorder, mix: Dict[str, int], days: int, rng: random.Random):
+        self.tools = tools
+        self.recorder = recorder
+        self.names = list(mix)
+        self.weights = list(mix.values())
+        self.days = days
+        self.rng = rng
+        self.phone = f"+1555{caller_id:07d}"
+        self.context = SimpleNamespace(userdata=None, session=None)
+
+    def _date(self) -> str:
+        return (date.today() + timedelta(days=self.rng.randint(1, self.days))).isoformat()
+
+    def _doctor(self) -> str:
+        return self.rng.choices(DOCTORS, DOCTOR_WEIGHTS)[0]
+
+    def _arguments(self, tool: str) -> dict:
+        if tool == "get_doctor_schedule":
+            return {"department": self.rng.choice(DEPARTMENTS), "date": self._date()}
+        if tool == "check_doctor_availability":
+            return {"doctor_name": self._doctor(), "date": self._date(), "time": self.rng.choice(TIMES)}
+        if tool == "find_available_slots":
+            return {"department": self.rng.choice(DEPARTMENTS), "days": 7, "count": 3}
+        if tool == "book_appointment":
+            return {
+                "patient_name": f"Bench Caller {self.phone[-4:]}",
+                "patient_phone": self.phone,
+                "doctor_name": self._doctor(),
+                "date": self._date(),
+                "time": self.rng.choice(TIMES),
+                "reason": "Consultation",
+            }
+        if tool == "check_patient_appointments":
+            return {"patient_phone": self.phone}
+        if tool == "cancel_appointment":
+            if self.recorder.booked_ids:
+                appointment_id, phone = self.recorder.booked_ids.pop(self.rng.randrange(len(self.recorder.booked_ids)))
+                return {"appointment_id": appointment_id, "patient_phone": phone}
+            return {"appointment_id": "00000000", "patient_phone": self.phone}
+        raise ValueError(tool)
+
+    async def call(self, tool: str):
+        arguments = self._arguments(tool)
+        start = time.perf_counter()
+        try:
+            result = await self.tools[tool](self.context, **arguments)
+            outcome = classify(tool, result)
+        except Exception:
+            result, outcome = "", "error"
+        self.recorder.record(tool, time.perf_counter() - start, outcome)
+
+        if outcome == "booked":
+            appointment_id = result.split("ID: ", 1)[1].split("\n", 1)[0]
+            self.recorder.booked_ids.append((appointment_id, self.phone))
+
+    async def run(self, deadline: float, think_time: float):
+        while time.perf_counter() < deadline:
+            await self.call(self.rng.choices(self.names, self.weights)[0])
+            if think_time:
+                await asyncio.sleep(self.rng.uniform(0, think_time))
+
+
+async def run(args) -> dict:
+    os.environ["MONGODB_URL"] = args.mongodb_url
+    os.environ["MONGODB_DB_NAME"] = args.db_name
+
+    # Imported after the environment is set so every module sees the bench database
+    import tools
+    from database.directory import DirectoryCache
+    from database.mongodb import MongoDB
+    from seed_database import seed_database
+
+    await seed_database()
+    await MongoDB.connect()
+    await DirectoryCache.ensure_loaded()
+
+    tool_functions = {name: getattr(tools, name) for name in args.mix}
+    recorder = Recorder()
+    rng = random.Random(args.seed)
+    callers = [
+        SyntheticCaller(i, tool_functions, recorder, args.mix, args.days, random.Random(rng.random()))
+        for i in range(args.callers)
+    ]
+
+    start = time.perf_counter()
+    deadline = start + args.duration
+    await asyncio.gather(*(caller.run(deadline, args.think_time) for caller in callers))
+    elapsed = time.perf_counter() - start
+
+    await DirectoryCache.stop()
+    await MongoDB.close()
+
+    config = {
+        "callers": args.callers,
+        "duration_seconds": args.duration,
+        "think_time_seconds": args.think_time,
+        "days": args.days,
+        "seed": args.seed,
+        "mix": args.mix,
+        "db_name": args.db_name,
+    }
+    return recorder.report(elapsed, config)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--callers", type=int, default=20, help="concurrent synthetic callers")
+    parser.add_argument("--duration", type=float, default=30.0, help="run time in seconds")
+    parser.add_argument("--think-time", type=float, default=0.0, help="max random pause between calls, seconds")
+    parser.add_argument("--days", type=int, default=7, help="booking horizon in days")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="e.g. book_appointment=25,get_doctor_schedule=60")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--mongodb-url", default="mongodb://localhost:27017")
+    parser.add_argument("--db-name", default="hospital_bench")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    if args.db_name == "hospital_db":
+        parser.error("refusing to wipe the default application database; pick another --db-name")
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
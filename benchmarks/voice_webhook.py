@@ -0,0 +1,180 @@
+"""Load test for the Twilio ``/voice`` webhook.
+
+Starts the FastAPI app under uvicorn in a child process (so the client
+doesn't compete with it for the event loop), opens ``--concurrency``
+keep-alive connections that each post Twilio-shaped webhooks until
+``--requests`` have been sent, and prints a JSON report (requests/sec,
+latency percentiles, status counts).
+
+    uv run python -m benchmarks.voice_webhook --concurrency 1000 --requests 20000
+
+Requests are signed with a throwaway auth token so signature validation is
+part of the measurement (``--unsigned`` to skip it). Run from the project
+root; 1000 connections may need ``ulimit -n 4096``.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List
+from urllib.parse import urlencode
+
+BENCH_AUTH_TOKEN = "bench-auth-token"
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def build_request(port: int, index: int, validator) -> bytes:
+    params = {
+        "AccountSid": "AC" + "0" * 32,
+        "CallSid": f"CA{index:032d}",
+        "CallStatus": "ringing",
+        "Direction": "inbound",
+        "From": f"+1555{index % 10_000_000:07d}",
+        "To": os.environ["TWILIO_PHONE_NUMBER"],
+    }
+    body = urlencode(params).encode()
+    headers = [
+        "POST /voice HTTP/1.1",
+        f"Host: 127.0.0.1:{port}",
+        "Content-Type: application/x-www-form-urlencoded",
+        f"Content-Length: {len(body)}",
+    ]
+    if validator is not None:
+        url = f"http://127.0.0.1:{port}/voice"
+        signature = validator.signature(url, {name: [value] for name, value in params.items()})
+        headers.append(f"X-Twilio-Signature: {signature}")
+    return ("\r\n".join(headers) + "\r\n\r\n").encode() + body
+
+
+async def read_response(reader: asyncio.StreamReader) -> int:
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ", 2)[1])
+    length = 0
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    if length:
+        await reader.readexactly(length)
+    return status
+
+
+async def client(port: int, requests: List[bytes], latencies: List[float], statuses: Dict[int, int]):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        for request in requests:
+            start = time.perf_counter()
+            writer.write(request)
+            try:
+                status = await read_response(reader)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                statuses[0] = statuses.get(0, 0) + 1
+                return
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run(args) -> dict:
+    # The uvicorn child inherits this environment
+    os.environ.setdefault("TWILIO_PHONE_NUMBER", "+12292139528")
+    os.environ.setdefault("LIVEKIT_SIP_HOST", "bench.sip.livekit.cloud")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    if args.unsigned:
+        os.environ.pop("TWILIO_AUTH_TOKEN", None)
+    else:
+        os.environ["TWILIO_AUTH_TOKEN"] = BENCH_AUTH_TOKEN
+    os.environ.pop("TWILIO_WEBHOOK_BASE_URL", None)
+
+    from web.voice import SignatureValidator
+
+    port = free_port()
+    server = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+        "--log-level", "warning", "--no-access-log", "--backlog", str(args.concurrency * 2),
+    ])
+    try:
+        await wait_for_port(port, server)
+        return await measure(args, port, validator=None if args.unsigned else SignatureValidator(BENCH_AUTH_TOKEN))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+async def wait_for_port(port: int, server: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("uvicorn exited before accepting connections")
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+        except OSError:
+            await asyncio.sleep(0.1)
+            continue
+        writer.close()
+        return
+    raise RuntimeError(f"uvicorn did not start listening on port {port}")
+
+
+async def measure(args, port: int, validator) -> dict:
+    per_client = [[] for _ in range(args.concurrency)]
+    for index in range(args.requests):
+        per_client[index % args.concurrency].append(build_request(port, index, validator))
+
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, requests, latencies, statuses) for requests in per_client if requests))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "config": {"concurrency": args.concurrency, "requests": args.requests, "signed": not args.unsigned},
+        "elapsed_seconds": round(elapsed, 3),
+        "completed": len(latencies),
+        "requests_per_second": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=1000, help="concurrent keep-alive connections")
+    parser.add_argument("--requests", type=int, default=20000, help="total webhooks to send")
+    parser.add_argument("--unsigned", action="store_true", help="disable Twilio signature validation")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Local stand-in for the OpenWeatherMap API.
+
+Starts a stub upstream, points get_weather at it and fires concurrent
+requests to show pooling, caching and miss collapsing at work:
+
+    uv run python -m benchmarks.weather_stub --requests 200 --cities 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from types import SimpleNamespace
+
+from aiohttp import web
+
+
+async def start_stub(port: int, delay: float, unknown=()):
+    """Serve fake conditions for any city, or a 404 for those in ``unknown``."""
+    hits = {"count": 0}
+
+    async def weather(request):
+        hits["count"] += 1
+        await asyncio.sleep(delay)
+        if request.query.get("q") in unknown:
+            return web.json_response({"cod": "404", "message": "city not found"}, status=404)
+        return web.json_response({
+            "weather": [{"description": "clear sky"}],
+            "main": {"temp": 21.5, "humidity": 40},
+        })
+
+    app = web.Application()
+    app.router.add_get("/data/2.5/weather", weather)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner, hits
+
+
+async def run(args) -> dict:
+    runner, hits = await start_stub(args.port, args.delay)
+    os.environ["WEATHER_API_KEY"] = "stub"
+    os.environ["WEATHER_API_URL"] = f"http://127.0.0.1:{args.port}/data/2.5/weather"
+
+    # Imported after the environment is set so the tool targets the stub
+    from tools.weather import close_http_session, get_weather
+
+    context = SimpleNamespace(userdata=None, session=None)
+    cities = [f"City {i}" for i in range(args.cities)]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(get_weather(context, cities[i % len(cities)]) for i in range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    await close_http_session()
+    await runner.cleanup()
+    return {
+        "requests": args.requests,
+        "cities": args.cities,
+        "upstream_requests": hits["count"],
+        "elapsed_ms": round(elapsed * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--cities", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.2, help="simulated upstream latency, seconds")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Compare ``/voice`` throughput under the plain and the tuned server setup.
+
+Runs the webhook load from ``benchmarks.voice_webhook`` twice: once against
+``uvicorn main:app`` with its defaults (asyncio loop, h11, one process) and
+once against ``python main.py`` (uvloop/httptools when installed,
+``--workers`` processes). Prints one JSON report per setup.
+
+    uv run python -m benchmarks.web_server --workers 4 --concurrency 1000 --requests 20000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.voice_webhook import BENCH_AUTH_TOKEN, free_port, measure, wait_for_port
+
+
+def setups(port: int, workers: int) -> dict:
+    return {
+        "default": (
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+             "--loop", "asyncio", "--http", "h11", "--log-level", "warning", "--no-access-log"],
+            {},
+        ),
+        "tuned": (
+            [sys.executable, "main.py"],
+            {"WEB_HOST": "127.0.0.1", "WEB_PORT": str(port), "WEB_WORKERS": str(workers), "WEB_DRAIN_DELAY_SECONDS": "0"},
+        ),
+    }
+
+
+async def run_setup(args, command, extra_env: dict, port: int, validator) -> dict:
+    server = subprocess.Popen(command, env={**os.environ, **extra_env})
+    try:
+        await wait_for_port(port, server)
+        # Worker processes start after the parent binds, so give them a moment
+        await asyncio.sleep(args.warmup)
+        return await measure(args, port, validator)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+async def run(args) -> dict:
+    # The server processes inherit this environment
+    os.environ.setdefault("TWILIO_PHONE_NUMBER", "+12292139528")
+    os.environ.setdefault("LIVEKIT_SIP_HOST", "bench.sip.livekit.cloud")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    if args.unsigned:
+        os.environ.pop("TWILIO_AUTH_TOKEN", None)
+    else:
+        os.environ["TWILIO_AUTH_TOKEN"] = BENCH_AUTH_TOKEN
+    os.environ.pop("TWILIO_WEBHOOK_BASE_URL", None)
+
+    from web.voice import SignatureValidator
+
+    validator = None if args.unsigned else SignatureValidator(BENCH_AUTH_TOKEN)
+    reports = {}
+    port = free_port()
+    for name, (command, extra_env) in setups(port, args.workers).items():
+        reports[name] = await run_setup(args, command, extra_env, port, validator)
+    reports["speedup"] = round(
+        reports["tuned"]["requests_per_second"] / reports["default"]["requests_per_second"], 2
+    ) if reports["default"]["requests_per_second"] else 0.0
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes for the tuned setup")
+    parser.add_argument("--concurrency", type=int, default=1000, help="concurrent keep-alive connections")
+    parser.add_argument("--requests", type=int, default=20000, help="total webhooks per setup")
+    parser.add_argument("--warmup", type=float, default=3.0, help="seconds to let workers start before measuring")
+    parser.add_argument("--unsigned", action="store_true", help="disable Twilio signature validation")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
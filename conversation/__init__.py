@@ -0,0 +1 @@
+"""Per-call conversation handling for the receptionist agent."""
@@ -0,0 +1,244 @@
+"""Rolling chat-context compaction for long calls.
+
+The session sends the whole chat history to the LLM on every turn, so
+long calls get slower and more expensive as they go. Before each reply
+the compactor:
+
+- keeps the last ``COMPACTION_KEEP_TURNS`` user turns verbatim
+- folds older turns into a short structured summary (patient name, phone,
+  doctor, date/time, completed and pending actions) built from the
+  arguments and results of tool calls
+- blanks raw tool outputs in the kept turns that a newer call to the same
+  tool with the same arguments has superseded; the last
+  ``COMPACTION_PROTECT_TURNS`` turns are never rewritten
+- folds further turns until the estimate fits ``COMPACTION_MAX_TOKENS``
+
+System messages (the instructions) are never touched.
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from livekit.agents.llm import ChatContext, ChatMessage
+from prometheus_client import Histogram
+
+from observability.tool_metrics import estimate_tokens
+
+SUMMARY_ID = "call_summary"
+SUPERSEDED_OUTPUT = "(older result omitted)"
+
+CONTEXT_TOKENS = Histogram(
+    "hospital_chat_context_tokens",
+    "Estimated LLM input tokens in the chat context per user turn",
+    ["stage"],
+    buckets=(250, 500, 1000, 2000, 3000, 4000, 6000, 8000, 12000, 16000),
+)
+
+# Tool arguments copied into the summary: {argument: summary field}
+SUMMARY_ARGUMENTS = {
+    "patient_name": "patient_name",
+    "patient_phone": "patient_phone",
+    "doctor_name": "doctor",
+    "department": "department",
+    "date": "date",
+    "time": "time",
+}
+
+# Tools that mean the caller is heading towards a booking or cancellation
+PENDING_ACTIONS = {
+    "check_doctor_availability": "booking an appointment",
+    "find_available_slots": "booking an appointment",
+    "get_doctor_schedule": "booking an appointment",
+    "check_patient_appointments": "reviewing or cancelling appointments",
+}
+
+
+@dataclass
+class CallSummary:
+    """What the caller has told us so far, distilled from folded turns."""
+
+    patient_name: Optional[str] = None
+    patient_phone: Optional[str] = None
+    doctor: Optional[str] = None
+    department: Optional[str] = None
+    date: Optional[str] = None
+    time: Optional[str] = None
+    pending_action: Optional[str] = None
+    completed: List[str] = field(default_factory=list)
+    folded_turns: int = 0
+
+    def record_call(self, name: str, arguments: dict):
+        for argument, attribute in SUMMARY_ARGUMENTS.items():
+            value = arguments.get(argument)
+            if value:
+                setattr(self, attribute, value)
+        if name in PENDING_ACTIONS:
+            self.pending_action = PENDING_ACTIONS[name]
+
+    def record_output(self, name: str, output: str, arguments: dict):
+        if name == "book_appointment" and output.startswith("BOOKING CONFIRMED"):
+            appointment_id = output.split("ID: ", 1)[-1].split("\n", 1)[0]
+            self.completed.append(
+                f"booked {arguments.get('doctor_name')} on {arguments.get('date')} "
+                f"at {arguments.get('time')} (ID {appointment_id})"
+            )
+            self.pending_action = None
+        elif name == "cancel_appointment" and output.startswith("CANCELLED"):
+            self.completed.append(f"cancelled appointment {arguments.get('appointment_id')}")
+            self.pending_action = None
+
+    def render(self) -> str:
+        known = [
+            ("Patient name", self.patient_name),
+            ("Phone", self.patient_phone),
+            ("Doctor", self.doctor),
+            ("Department", self.department),
+            ("Date", self.date),
+            ("Time", self.time),
+            ("In progress", self.pending_action),
+            ("Done", "; ".join(self.completed)),
+        ]
+        lines = [f"{label}: {value}" for label, value in known if value]
+        return (
+            f"Summary of the first {self.folded_turns} turns of this call "
+            f"(earlier messages were removed):\n" + ("\n".join(lines) or "Nothing recorded yet.")
+        )
+
+
+@dataclass
+class CompactionResult:
+    tokens_before: int
+    tokens_after: int
+    folded_turns: int
+
+    @property
+    def changed(self) -> bool:
+        return self.folded_turns > 0 or self.tokens_after != self.tokens_before
+
+
+def item_tokens(item) -> int:
+    """Estimated tokens for one chat context item."""
+    if item.type == "message":
+        return estimate_tokens(item.text_content or "") + 4
+    if item.type == "function_call":
+        return estimate_tokens(item.name + item.arguments) + 4
+    if item.type == "function_call_output":
+        return estimate_tokens(item.output) + 4
+    return 0
+
+
+def context_tokens(items) -> int:
+    return sum(item_tokens(item) for item in items)
+
+
+def _arguments(item) -> dict:
+    try:
+        return json.loads(item.arguments or "{}")
+    except ValueError:
+        return {}
+
+
+class ContextCompactor:
+    """Per-call compactor; keeps the running summary between turns."""
+
+    def __init__(
+        self,
+        keep_turns: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        protect_turns: Optional[int] = None,
+    ):
+        self.keep_turns = keep_turns if keep_turns is not None else int(os.getenv("COMPACTION_KEEP_TURNS", "6"))
+        self.protect_turns = protect_turns if protect_turns is not None else int(os.getenv("COMPACTION_PROTECT_TURNS", "2"))
+        self.max_tokens = max_tokens if max_tokens is not None else int(os.getenv("COMPACTION_MAX_TOKENS", "3000"))
+        self.summary = CallSummary()
+        self.history: List[CompactionResult] = []
+
+    def _fold(self, turn) -> None:
+        calls: Dict[str, tuple] = {}
+        for item in turn:
+            if item.type == "function_call":
+                arguments = _arguments(item)
+                calls[item.call_id] = (item.name, arguments)
+                self.summary.record_call(item.name, arguments)
+            elif item.type == "function_call_output":
+                name, arguments = calls.get(item.call_id, (item.name, {}))
+                self.summary.record_output(name, item.output, arguments)
+        self.summary.folded_turns += 1
+
+    @staticmethod
+    def _supersede_outputs(turns: List[list], protect_turns: int):
+        """Blank outputs that a later call to the same tool with the same arguments replaced.
+
+        Only turns before the last ``protect_turns`` are rewritten; the
+        recent ones still count as the later call.
+        """
+        keys: Dict[str, tuple] = {}
+        latest = {}
+        for turn in turns:
+            for item in turn:
+                if item.type == "function_call":
+                    keys[item.call_id] = (item.name, json.dumps(_arguments(item), sort_keys=True))
+                elif item.type == "function_call_output":
+                    latest[keys.get(item.call_id, (item.name, item.call_id))] = item
+        for turn in turns[:max(0, len(turns) - protect_turns)]:
+            for i, item in enumerate(turn):
+                if item.type != "function_call_output":
+                    continue
+                if latest[keys.get(item.call_id, (item.name, item.call_id))] is not item:
+                    turn[i] = item.model_copy(update={"output": SUPERSEDED_OUTPUT})
+
+    def _items(self, system: list, turns: List[list]) -> list:
+        summary = []
+        if self.summary.folded_turns:
+            summary = [ChatMessage(id=SUMMARY_ID, role="system", content=[self.summary.render()])]
+        return system + summary + [item for turn in turns for item in turn]
+
+    def compact(self, chat_ctx: ChatContext) -> Tuple[ChatContext, CompactionResult]:
+        """Return a compacted copy of ``chat_ctx`` and what it saved."""
+        system, turns = [], []
+        for item in chat_ctx.items:
+            if item.id == SUMMARY_ID:
+                continue
+            if item.type == "message" and item.role == "system":
+                system.append(item)
+                continue
+            if (item.type == "message" and item.role == "user") or not turns:
+                turns.append([])
+            turns[-1].append(item)
+
+        tokens_before = context_tokens(chat_ctx.items)
+
+        # Fold from the untouched turns so superseded results still reach the summary
+        originals = [list(turn) for turn in turns]
+
+        folded = max(0, len(turns) - self.keep_turns)
+        for turn in originals[:folded]:
+            self._fold(turn)
+        self._supersede_outputs(turns[folded:], self.protect_turns)
+        # The most recent turn is always kept, even over the ceiling
+        while folded < len(turns) - 1 and context_tokens(self._items(system, turns[folded:])) > self.max_tokens:
+            self._fold(originals[folded])
+            folded += 1
+
+        items = self._items(system, turns[folded:])
+        result = CompactionResult(tokens_before, context_tokens(items), folded)
+        CONTEXT_TOKENS.labels(stage="before").observe(tokens_before)
+        CONTEXT_TOKENS.labels(stage="after").observe(result.tokens_after)
+        self.history.append(result)
+        return ChatContext(items=items), result
+
+    def stats(self) -> dict:
+        """Token counts before/after compaction for the last turn and the call."""
+        if not self.history:
+            return {"turns": 0}
+        last = self.history[-1]
+        return {
+            "turns": len(self.history),
+            "folded_turns": self.summary.folded_turns,
+            "last_tokens_before": last.tokens_before,
+            "last_tokens_after": last.tokens_after,
+            "peak_tokens_before": max(result.tokens_before for result in self.history),
+            "peak_tokens_after": max(result.tokens_after for result in self.history),
+        }
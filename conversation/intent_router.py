@@ -0,0 +1,118 @@
+"""Answers fixed FAQ questions straight from the transcript, without the LLM.
+
+The classifier is a handful of weighted regular expressions. It only
+answers when one intent clearly wins and nothing in the utterance hints
+at a task the LLM has to handle (booking, cancelling, symptoms).
+"""
+
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from prometheus_client import Counter
+
+from tools.department_info import VISITING_HOURS_SPOKEN
+from tools.emergency import AMBULANCE_SERVICE_SPOKEN, EMERGENCY_INFO_SPOKEN
+
+ROUTER_TURNS = Counter(
+    "hospital_intent_router_turns_total",
+    "User turns seen by the FAQ intent router",
+    ["outcome", "intent"],
+)
+
+# (pattern, weight) per intent; the best matching weight is the score
+INTENT_PATTERNS: Dict[str, List[Tuple[str, float]]] = {
+    "visiting_hours": [
+        (r"\bvisit(ing|ation)? (hours?|times?|timings?|polic(y|ies)|rules)\b", 1.0),
+        (r"\bwhen can (i|we|people|family) (come )?visit\b", 0.95),
+        (r"\bvisit\w*\b.*\b(hours?|times?|timings?|open)\b", 0.85),
+    ],
+    "emergency_info": [
+        (r"\b(emergency|er) (room|department|number|contact|phone|hours)\b", 1.0),
+        (r"\bwhere is (the|your) (emergency|er)\b", 0.95),
+        (r"\bis (the|your) (emergency|er)\b.*\bopen\b", 0.9),
+    ],
+    "ambulance_service": [
+        # Only questions about the service; asking for an ambulance is an emergency for the LLM
+        (r"\bambulance (number|service|services|phone|contact)\b", 1.0),
+    ],
+}
+
+# Anything here means the caller wants more than a canned answer
+LLM_CUES = re.compile(
+    r"\b(book|appointment|schedule|reschedul\w*|cancel\w*|doctor|dr|"
+    r"pain|bleed\w*|breath\w*|unconscious|faint\w*|collaps\w*|passed out|stroke|attack|seizure\w*|"
+    r"accident|injur\w*|hurt\w*|(send|call|get|need) (an |the )?ambulance|"
+    r"my (mother|father|son|daughter|wife|husband|child) (is|has))\b"
+)
+
+ANSWERS = {
+    "visiting_hours": VISITING_HOURS_SPOKEN,
+    "emergency_info": EMERGENCY_INFO_SPOKEN,
+    "ambulance_service": AMBULANCE_SERVICE_SPOKEN,
+}
+
+# Long utterances tend to carry several requests
+MAX_WORDS = 25
+
+
+@dataclass
+class IntentMatch:
+    intent: str
+    confidence: float
+    answer: str
+
+
+class IntentRouter:
+    """Cheap local classifier for high-frequency FAQ questions."""
+
+    def __init__(self, threshold: Optional[float] = None):
+        self.threshold = threshold if threshold is not None else float(os.getenv("INTENT_ROUTER_THRESHOLD", "0.85"))
+        self._patterns = {
+            intent: [(re.compile(pattern), weight) for pattern, weight in patterns]
+            for intent, patterns in INTENT_PATTERNS.items()
+        }
+        self.turns = 0
+        self.hits: Dict[str, int] = {}
+
+    def score(self, text: str) -> Dict[str, float]:
+        """Confidence per intent for a normalized utterance."""
+        scores = {}
+        for intent, patterns in self._patterns.items():
+            best = max((weight for pattern, weight in patterns if pattern.search(text)), default=0.0)
+            if best:
+                scores[intent] = best
+        return scores
+
+    def classify(self, transcript: str) -> Optional[IntentMatch]:
+        """Return the FAQ answer for a final transcript, or None to defer to the LLM."""
+        self.turns += 1
+        text = " ".join(re.sub(r"[^\w\s']", " ", transcript.lower()).split())
+
+        match = None
+        if text and not LLM_CUES.search(text):
+            scores = self.score(text)
+            if len(scores) == 1:
+                intent, confidence = scores.popitem()
+                if len(text.split()) > MAX_WORDS:
+                    confidence -= 0.2
+                if confidence >= self.threshold:
+                    match = IntentMatch(intent, confidence, ANSWERS[intent])
+
+        if match is None:
+            ROUTER_TURNS.labels(outcome="fallback", intent="").inc()
+            return None
+
+        self.hits[match.intent] = self.hits.get(match.intent, 0) + 1
+        ROUTER_TURNS.labels(outcome="hit", intent=match.intent).inc()
+        return match
+
+    def stats(self) -> dict:
+        """Turns seen, hits per intent and overall hit rate."""
+        total_hits = sum(self.hits.values())
+        return {
+            "turns": self.turns,
+            "hits": dict(self.hits),
+            "hit_rate": round(total_hits / self.turns, 4) if self.turns else 0.0,
+        }
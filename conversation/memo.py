@@ -0,0 +1,149 @@
+"""Per-call memoization of read-only tool results.
+
+The LLM often repeats a lookup within one call (re-checking the same slot
+after the caller confirms). Read tools are wrapped with ``memoized`` and
+their results kept on the session's userdata, keyed by tool name and
+normalized arguments. Write tools are wrapped with ``invalidates`` and
+drop every entry tagged with the topics they change.
+
+Entries also expire after ``TOOL_MEMO_TTL_SECONDS`` because other callers
+book slots in the meantime. Replies that ask for better input (an unknown
+doctor, an incomplete phone number) are returned as ``Uncached`` and never
+stored, so the corrected lookup runs for real. Phone arguments are keyed
+by their E.164 form, with an empty one standing for the caller's number.
+"""
+
+import functools
+import inspect
+import os
+import time
+from typing import Dict, Hashable, Optional, Tuple
+
+from prometheus_client import Counter
+
+from database.phone import normalize_phone
+
+MEMO_LOOKUPS = Counter(
+    "hospital_tool_memo_lookups_total",
+    "Per-call tool memo lookups",
+    ["tool", "outcome"],
+)
+
+
+class Uncached(str):
+    """A tool reply asking for different input; returned as is but never memoized."""
+
+
+class ToolMemo:
+    """Tool results for one call."""
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv("TOOL_MEMO_TTL_SECONDS", "60"))
+        self._entries: Dict[Hashable, Tuple[float, frozenset, str]] = {}
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self.invalidated = 0
+
+    def get(self, tool: str, key: Hashable) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] < time.monotonic():
+            del self._entries[key]
+            entry = None
+        counts = self.misses if entry is None else self.hits
+        counts[tool] = counts.get(tool, 0) + 1
+        MEMO_LOOKUPS.labels(tool=tool, outcome="miss" if entry is None else "hit").inc()
+        return None if entry is None else entry[2]
+
+    def put(self, key: Hashable, topics: frozenset, value: str):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, topics, value)
+
+    def invalidate(self, topics: frozenset) -> int:
+        """Drop entries tagged with any of ``topics``; returns how many."""
+        stale = [key for key, (_, tags, _) in self._entries.items() if tags & topics]
+        for key in stale:
+            del self._entries[key]
+        self.invalidated += len(stale)
+        return len(stale)
+
+    def stats(self) -> dict:
+        hits, misses = sum(self.hits.values()), sum(self.misses.values())
+        return {
+            "hits": dict(self.hits),
+            "misses": dict(self.misses),
+            "invalidated": self.invalidated,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+        }
+
+
+def _userdata(context):
+    try:
+        return context.userdata
+    except (AttributeError, ValueError):
+        # No session userdata (e.g. the load-test harness)
+        return None
+
+
+def _memo_for(context) -> Optional[ToolMemo]:
+    return getattr(_userdata(context), "memo", None)
+
+
+def _normalize(name: str, value, caller_phone: Optional[str]):
+    if isinstance(value, str):
+        if name.endswith("phone"):
+            # Tools read an empty phone as the caller's own number
+            return normalize_phone(value or caller_phone or "") or value.strip()
+        return " ".join(value.lower().split())
+    return value
+
+
+def memoized(*topics: str):
+    """Cache a read-only tool's result per call, tagged with ``topics``."""
+    tags = frozenset(topics)
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(context, *args, **kwargs):
+            memo = _memo_for(context)
+            if memo is None:
+                return await func(context, *args, **kwargs)
+
+            caller_phone = getattr(_userdata(context), "caller_phone", None)
+            bound = signature.bind(context, *args, **kwargs)
+            bound.apply_defaults()
+            key = (func.__name__,) + tuple(
+                (name, _normalize(name, value, caller_phone))
+                for name, value in list(bound.arguments.items())[1:]
+            )
+            cached = memo.get(func.__name__, key)
+            if cached is not None:
+                return cached
+            result = await func(context, *args, **kwargs)
+            if not isinstance(result, Uncached):
+                memo.put(key, tags, result)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def invalidates(*topics: str):
+    """Drop memoized results tagged with ``topics`` after a write tool runs."""
+    tags = frozenset(topics)
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(context, *args, **kwargs):
+            try:
+                return await func(context, *args, **kwargs)
+            finally:
+                # Even a failed write (e.g. slot taken meanwhile) means cached reads may be stale
+                memo = _memo_for(context)
+                if memo is not None:
+                    memo.invalidate(tags)
+
+        return wrapper
+
+    return decorator
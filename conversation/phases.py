@@ -0,0 +1,236 @@
+"""Conversation phases that scope the tools and prompt sent to the LLM.
+
+Every tool schema and prompt section goes out with every LLM request, so
+a call only sees what its current phase needs:
+
+- triage: understanding the concern, departments, general questions
+- scheduling: doctor schedules and free slots
+- booking: booking, looking up and cancelling appointments
+- emergency: emergency and ambulance contacts
+
+Phases change on cues in the caller's words and otherwise stay put, so a
+booking conversation keeps its tools while the caller spells out a name.
+Booking is left only on a strong cue: "Monday with Dr. Khan" or "tomorrow
+at 10 works" are details of the booking, not a new request. Once booking
+has been reached, later phases (other than emergency) keep its tools and
+rules on top of their own. Tool lists keep a fixed order so unchanged
+phases reuse the provider's cached prefix.
+
+Run ``python -m conversation.phases`` to print prompt and schema token
+counts per phase.
+"""
+
+import json
+import re
+from typing import Dict, List, Optional, Tuple
+
+from prometheus_client import Counter
+
+from observability.tool_metrics import estimate_tokens
+from prompts import ASSISTANT_INSTRUCTIONS, build_instructions
+from tools import (
+    book_appointment,
+    cancel_appointment,
+    check_doctor_availability,
+    check_patient_appointments,
+    find_available_slots,
+    get_ambulance_service,
+    get_current_date,
+    get_current_datetime,
+    get_current_time,
+    get_department_info,
+    get_doctor_schedule,
+    get_emergency_info,
+    get_schedule_range,
+    get_visiting_hours,
+    get_weather,
+    list_all_departments,
+    verify_caller_identity,
+)
+
+INITIAL_PHASE = "triage"
+
+PHASE_TOOLS = {
+    "triage": [
+        list_all_departments,
+        get_department_info,
+        get_visiting_hours,
+        get_emergency_info,
+        get_current_datetime,
+        get_current_time,
+        get_weather,
+        verify_caller_identity,
+    ],
+    "scheduling": [
+        list_all_departments,
+        get_department_info,
+        get_doctor_schedule,
+        get_schedule_range,
+        check_doctor_availability,
+        find_available_slots,
+        get_current_date,
+        # Lets a confirmed slot be booked without waiting for a booking cue
+        book_appointment,
+    ],
+    "booking": [
+        check_doctor_availability,
+        find_available_slots,
+        get_current_date,
+        book_appointment,
+        check_patient_appointments,
+        cancel_appointment,
+        verify_caller_identity,
+    ],
+    "emergency": [
+        get_emergency_info,
+        get_ambulance_service,
+        get_department_info,
+    ],
+}
+
+# Booking and cancelling, kept by later phases once the call has reached booking
+WRITE_PHASE = "booking"
+
+# Checked in this order, strong cues first; the first match wins. Weak
+# cues (a day, a doctor's name) move the call between the read-only
+# phases but don't pull it out of booking.
+PHASE_CUES: List[Tuple[str, bool, re.Pattern]] = [
+    ("emergency", True, re.compile(
+        r"\b(emergency|ambulance|chest pains?|heart attack|stroke|seizures?|unconscious|"
+        r"passed out|fainted|collapsed|not breathing|(can't|cannot) breathe|(trouble|difficulty) breathing|"
+        r"bleeding (a lot|heavily|badly|won't stop)|overdosed?|(had|been in|was in) an accident)\b"
+    )),
+    ("booking", True, re.compile(
+        r"\b(book\w*|reserve|make an appointment|cancel\w*|reschedul\w*|"
+        r"my appointments?|confirm\w*)\b"
+    )),
+    ("scheduling", True, re.compile(
+        r"\b(availab\w*|schedule|slots?|when can|what times|free (times|slots))\b"
+    )),
+    ("triage", True, re.compile(
+        r"\b(which (department|specialist)|visiting hours|services|weather)\b"
+    )),
+    ("scheduling", False, re.compile(
+        r"\b(free|see (a|the|dr|doctor)|dr|doctor|"
+        r"today|tomorrow|next week|monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b"
+    )),
+    ("triage", False, re.compile(
+        r"\b(department|which doctor|visit\w*|what time)\b"
+    )),
+]
+
+# Emergency words about the past ("an accident last month", "a stroke two
+# years ago") are history for a follow-up, not an emergency now
+PAST_EVENT = re.compile(
+    r"\b(last (week|month|year)|(days|weeks|months|years) ago|follow ?up|history of|used to|in the past)\b"
+)
+
+PHASE_TRANSITIONS = Counter(
+    "hospital_phase_transitions_total",
+    "Conversation phase changes",
+    ["from_phase", "to_phase"],
+)
+
+
+def _normalize(transcript: str) -> str:
+    return " ".join(re.sub(r"[^\w\s']", " ", transcript.lower()).split())
+
+
+def detect_cue(transcript: str) -> Optional[Tuple[str, bool]]:
+    """``(phase, strong)`` cued by a user turn, or None when nothing points anywhere."""
+    text = _normalize(transcript)
+    for phase, strong, pattern in PHASE_CUES:
+        if phase == "emergency" and PAST_EVENT.search(text):
+            continue
+        if pattern.search(text):
+            return phase, strong
+    return None
+
+
+def detect_phase(transcript: str) -> Optional[str]:
+    """Phase cued by a user turn, or None when nothing points anywhere."""
+    cue = detect_cue(transcript)
+    return cue[0] if cue else None
+
+
+class PhaseTracker:
+    """Current phase of one call, with per-phase turn counts."""
+
+    def __init__(self, phase: str = INITIAL_PHASE):
+        self.phase = phase
+        self.transitions = 0
+        self.turns: Dict[str, int] = {}
+        # Set once the call reaches booking; later phases keep its tools
+        self.write_unlocked = phase == WRITE_PHASE
+
+    def _keeps_writes(self) -> bool:
+        return self.write_unlocked and self.phase not in (WRITE_PHASE, "emergency")
+
+    @property
+    def tools(self) -> List:
+        tools = PHASE_TOOLS[self.phase]
+        if self._keeps_writes():
+            tools = tools + [tool for tool in PHASE_TOOLS[WRITE_PHASE] if tool not in tools]
+        return tools
+
+    @property
+    def instructions(self) -> str:
+        if self._keeps_writes():
+            return build_instructions(self.phase, WRITE_PHASE)
+        return build_instructions(self.phase)
+
+    def update(self, transcript: str) -> bool:
+        """Move to the phase cued by ``transcript``; True if the phase changed."""
+        cue = detect_cue(transcript)
+        cued = cue[0] if cue else None
+        if self.phase == WRITE_PHASE and cue is not None and not cue[1]:
+            cued = None
+        changed = cued is not None and cued != self.phase
+        if changed:
+            PHASE_TRANSITIONS.labels(from_phase=self.phase, to_phase=cued).inc()
+            self.phase = cued
+            self.transitions += 1
+            self.write_unlocked = self.write_unlocked or cued == WRITE_PHASE
+        self.turns[self.phase] = self.turns.get(self.phase, 0) + 1
+        return changed
+
+    def stats(self) -> dict:
+        return {"phase": self.phase, "transitions": self.transitions, "turns": dict(self.turns)}
+
+
+def tool_schema_tokens(tools) -> int:
+    """Estimated tokens for the JSON schemas of ``tools``."""
+    from livekit.agents.llm.utils import build_legacy_openai_schema
+
+    return sum(estimate_tokens(json.dumps(build_legacy_openai_schema(tool))) for tool in tools)
+
+
+def token_report() -> dict:
+    """Prompt and tool-schema tokens per phase against sending everything."""
+    all_tools = list({id(tool): tool for tools in PHASE_TOOLS.values() for tool in tools}.values())
+    baseline = estimate_tokens(ASSISTANT_INSTRUCTIONS) + tool_schema_tokens(all_tools)
+
+    phases = {}
+    for phase, tools in PHASE_TOOLS.items():
+        prompt = estimate_tokens(build_instructions(phase))
+        schemas = tool_schema_tokens(tools)
+        phases[phase] = {
+            "tools": len(tools),
+            "prompt_tokens": prompt,
+            "schema_tokens": schemas,
+            "total_tokens": prompt + schemas,
+            "saved_pct": round(100 * (1 - (prompt + schemas) / baseline), 1),
+        }
+    return {
+        "all_tools": {
+            "tools": len(all_tools),
+            "prompt_tokens": estimate_tokens(ASSISTANT_INSTRUCTIONS),
+            "schema_tokens": baseline - estimate_tokens(ASSISTANT_INSTRUCTIONS),
+            "total_tokens": baseline,
+        },
+        "phases": phases,
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(token_report(), indent=2))
@@ -0,0 +1,69 @@
+"""The receptionist agent: per-turn routing, phases and context compaction.
+
+Kept apart from ``agent.py`` (which wires up the STT, LLM and TTS plugins)
+so the turn handling can be exercised without them.
+"""
+
+import logging
+
+from livekit.agents import Agent, StopResponse
+from livekit.agents.llm import ChatContext, ChatMessage
+from livekit.agents.voice.generation import update_instructions
+
+from conversation.compaction import ContextCompactor
+from conversation.intent_router import IntentRouter
+from conversation.phases import PhaseTracker
+from conversation.state import CallState
+from conversation.utterance_cache import UtteranceCache
+
+logger = logging.getLogger("receptionist")
+
+
+class HospitalReceptionist(Agent):
+    def __init__(self, utterances: UtteranceCache, state: CallState) -> None:
+        # Each phase only carries its own tools and prompt section
+        phases = PhaseTracker()
+        super().__init__(instructions=phases.instructions + state.prompt_note(), tools=phases.tools)
+        self.phases = phases
+        self.state = state
+        self.intent_router = IntentRouter()
+        self.compactor = ContextCompactor()
+        self.utterances = utterances
+        # Prefetch, identity checks and bookings change what the prompt says about the caller
+        state.on_change = self.refresh_instructions
+    
+    async def on_user_turn_completed(self, turn_ctx: ChatContext, new_message: ChatMessage) -> None:
+        # Fixed FAQ answers skip the LLM round trips entirely
+        match = self.intent_router.classify(new_message.text_content or "")
+        if match is not None:
+            logger.info("intent router answered %s (confidence %.2f)", match.intent, match.confidence)
+            # LiveKit only adds the user message to the history when it generates a reply
+            self._chat_ctx.items.append(new_message)
+            self.session._conversation_item_added(new_message)
+            self.utterances.say(self.session, match.answer)
+            raise StopResponse()
+        
+        if self.phases.update(new_message.text_content or ""):
+            logger.info("conversation phase -> %s", self.phases.phase)
+            instructions = self.call_instructions()
+            await self.update_instructions(instructions)
+            await self.update_tools(self.phases.tools)
+            # turn_ctx was copied before the update, but this reply already gets the new tools
+            update_instructions(turn_ctx, instructions=instructions, add_if_missing=True)
+        
+        # Keep the history sent to the LLM bounded on long calls
+        chat_ctx, result = self.compactor.compact(self.chat_ctx)
+        if result.changed:
+            logger.info(
+                "chat context compacted: %d -> %d tokens (%d turns folded)",
+                result.tokens_before, result.tokens_after, result.folded_turns,
+            )
+            await self.update_chat_ctx(chat_ctx)
+            turn_ctx.items[:] = chat_ctx.items
+    
+    def call_instructions(self) -> str:
+        # Caller details go last so the static prefix stays cacheable
+        return self.phases.instructions + self.state.prompt_note()
+    
+    async def refresh_instructions(self) -> None:
+        await self.update_instructions(self.call_instructions())
@@ -0,0 +1,146 @@
+"""Typed per-call state kept in ``AgentSession.userdata``.
+
+For SIP calls the caller's number is known before they say a word, so the
+patient record and upcoming appointments are fetched in the background
+while the greeting plays. Tools read them from here, so returning patients
+aren't asked for their number and their first lookup needs no database
+round trip. The patient's name and appointments only reach the prompt once
+the caller has confirmed who they are (anyone can call from a patient's
+phone), and the prompt is rebuilt whenever a booking or cancellation
+changes them.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from database.mongodb import get_patients_collection
+from database.name_resolver import phonetic_key, strip_honorifics
+from database.phone import normalize_phone
+from conversation.memo import ToolMemo
+
+logger = logging.getLogger(__name__)
+
+# SIP participant attribute carrying the caller's number
+SIP_PHONE_ATTRIBUTE = "sip.phoneNumber"
+
+# Upcoming appointments mentioned in the prompt
+PROMPT_APPOINTMENTS = 3
+
+
+@dataclass
+class CallState:
+    caller_phone: Optional[str] = None
+    patient: Optional[dict] = None
+    # First page of the caller's scheduled appointments; None until fetched
+    # and again after a booking or cancellation changes them
+    upcoming: Optional[List[dict]] = None
+    has_more: bool = False
+    prefetch_task: Optional[asyncio.Task] = None
+    memo: ToolMemo = field(default_factory=ToolMemo)
+    # Set once the caller gives the name on file for their number
+    identity_confirmed: bool = False
+    # Rebuilds the agent's instructions after the caller's details change
+    on_change: Optional[Callable[[], Awaitable[None]]] = None
+
+    def start_prefetch(self, raw_phone: str) -> Optional[asyncio.Task]:
+        """Fetch the caller's patient record and appointments in the background."""
+        phone = normalize_phone(raw_phone)
+        if phone is None:
+            return None
+        self.caller_phone = phone
+        self.prefetch_task = asyncio.create_task(self._prefetch(phone))
+        return self.prefetch_task
+
+    async def _prefetch(self, phone: str):
+        from tools.appointment import fetch_patient_appointments
+
+        try:
+            patient, (appointments, has_more) = await asyncio.gather(
+                get_patients_collection().find_one({"phone": phone}, {"_id": 0, "patient_id": 1, "name": 1}),
+                fetch_patient_appointments(phone),
+            )
+        except Exception:
+            logger.exception("caller prefetch failed; tools will query on demand")
+        else:
+            self.patient = patient
+            self.upcoming, self.has_more = appointments, has_more
+        await self.refresh_prompt()
+
+    async def refresh_prompt(self):
+        """Push the current caller details into the agent's instructions."""
+        if self.on_change is None:
+            return
+        try:
+            await self.on_change()
+        except Exception:
+            logger.exception("could not update instructions with caller details")
+
+    async def prefetched_appointments(self, phone: str) -> Optional[Tuple[List[dict], bool]]:
+        """The caller's first page of appointments if ``phone`` is theirs and it's still valid."""
+        if phone != self.caller_phone:
+            return None
+        if self.prefetch_task is not None and not self.prefetch_task.done():
+            await asyncio.shield(self.prefetch_task)
+        if self.upcoming is None:
+            return None
+        return self.upcoming, self.has_more
+
+    def appointments_changed(self, phone: str):
+        """Refetch the caller's appointments after a booking or cancellation for ``phone``."""
+        if phone != self.caller_phone:
+            return
+        # Lookups wait on the task instead of serving the stale page
+        self.upcoming = None
+        self.prefetch_task = asyncio.create_task(self._prefetch(phone))
+
+    def confirm_identity(self, name: str) -> bool:
+        """Mark the caller as the patient on file if ``name`` matches the record."""
+        if not self.patient:
+            return False
+        given = [phonetic_key(word) for word in strip_honorifics(name)]
+        on_file = [phonetic_key(word) for word in strip_honorifics(self.patient["name"])]
+        # Every word must sound like part of the record, and a lone first name isn't enough
+        if not given or len(given) < min(2, len(on_file)) or not all(key in on_file for key in given):
+            return False
+        self.identity_confirmed = True
+        return True
+
+    def prompt_note(self) -> str:
+        """Prompt section describing the caller, or "" when nothing is known."""
+        if self.caller_phone is None:
+            return ""
+        lines = [
+            f"The caller is phoning from {self.caller_phone}. Use this number for bookings and "
+            "appointment lookups instead of asking for it; just confirm it once.",
+        ]
+        if not self.identity_confirmed:
+            # Anyone can call from a patient's phone; nothing about them until they say who they are
+            if self.patient:
+                lines.append(
+                    "This number belongs to a returning patient. Ask for the caller's full name and call "
+                    "verify_caller_identity before discussing any patient details or appointments."
+                )
+            return self._render(lines)
+        lines.append(f"They have confirmed they are {self.patient['name']}, a returning patient.")
+        if self.upcoming:
+            upcoming = "; ".join(
+                f"{apt['date']} at {apt['time']} with Dr. {apt['doctor_name']} (ID {apt['appointment_id'][:8]})"
+                for apt in self.upcoming[:PROMPT_APPOINTMENTS]
+            )
+            lines.append(f"Their upcoming appointments: {upcoming}.")
+        return self._render(lines)
+
+    @staticmethod
+    def _render(lines: List[str]) -> str:
+        return "\n────────────────────────────\nCALLER\n────────────────────────────\n" + "\n".join(lines) + "\n"
+
+
+def call_state(context) -> Optional[CallState]:
+    """The CallState behind a tool's RunContext, if the session has one."""
+    try:
+        userdata = context.userdata
+    except (AttributeError, ValueError):
+        return None
+    return userdata if isinstance(userdata, CallState) else None
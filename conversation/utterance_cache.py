@@ -0,0 +1,134 @@
+"""On-disk cache of synthesized audio for fixed utterances.
+
+Greetings, hold messages and FAQ answers never change, so they are
+synthesized once per (text, voice, TTS model, sample rate) and stored as
+WAV files that every later call plays straight into the room. On a cold
+cache the utterance is spoken with live streaming TTS, so the caller never
+waits for a whole file to be synthesized, and the WAV is written in the
+background for the next call.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import wave
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterable
+
+from livekit import rtc
+from livekit.agents import tts as agents_tts
+
+logger = logging.getLogger(__name__)
+
+FRAME_MS = 20
+
+
+class UtteranceCache:
+    def __init__(self, tts: agents_tts.TTS, voice: str, model: str, cache_dir: str = None):
+        self.tts = tts
+        self.voice = voice
+        self.model = model
+        self.cache_dir = Path(cache_dir or os.getenv("UTTERANCE_CACHE_DIR", ".cache/utterances"))
+        self._pending: Dict[str, asyncio.Task] = {}
+
+    def path_for(self, text: str) -> Path:
+        key = f"{self.model}|{self.voice}|{self.tts.sample_rate}|{text}"
+        return self.cache_dir / f"{hashlib.sha256(key.encode()).hexdigest()}.wav"
+
+    async def _synthesize(self, text: str, path: Path):
+        pcm = bytearray()
+        async with self.tts.synthesize(text) as stream:
+            async for audio in stream:
+                pcm += audio.frame.data.tobytes()
+
+        def write():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so other worker processes never read a partial file
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            with wave.open(str(tmp), "wb") as wav:
+                wav.setnchannels(self.tts.num_channels)
+                wav.setsampwidth(2)
+                wav.setframerate(self.tts.sample_rate)
+                wav.writeframes(bytes(pcm))
+            os.replace(tmp, path)
+
+        await asyncio.to_thread(write)
+        logger.info("cached utterance %s (%d bytes)", path.name, len(pcm))
+
+    def _start(self, text: str, path: Path) -> asyncio.Task:
+        task = self._pending.get(text)
+        if task is None:
+            task = asyncio.create_task(self._synthesize(text, path))
+            self._pending[text] = task
+            task.add_done_callback(lambda done: self._finished(text, done))
+        return task
+
+    def _finished(self, text: str, task: asyncio.Task):
+        self._pending.pop(text, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("could not cache utterance %r: %s", text[:40], task.exception())
+
+    async def ensure(self, text: str) -> Path:
+        """Synthesize ``text`` unless it is already cached; returns the WAV path."""
+        path = self.path_for(text)
+        if path.exists():
+            return path
+        await asyncio.shield(self._start(text, path))
+        return path
+
+    async def prewarm(self, texts: Iterable[str]):
+        """Make sure every fixed utterance is on disk; failures are logged as they happen."""
+        await asyncio.gather(*(self.ensure(text) for text in texts), return_exceptions=True)
+
+    async def frames(self, text: str) -> AsyncIterator[rtc.AudioFrame]:
+        """Cached audio for ``text`` as 20 ms frames."""
+        path = await self.ensure(text)
+
+        def read():
+            with wave.open(str(path), "rb") as wav:
+                return wav.getframerate(), wav.getnchannels(), wav.readframes(wav.getnframes())
+
+        sample_rate, num_channels, pcm = await asyncio.to_thread(read)
+        samples_per_frame = sample_rate * FRAME_MS // 1000
+        frame_bytes = samples_per_frame * num_channels * 2
+
+        for offset in range(0, len(pcm), frame_bytes):
+            chunk = pcm[offset:offset + frame_bytes]
+            yield rtc.AudioFrame(
+                data=chunk,
+                sample_rate=sample_rate,
+                num_channels=num_channels,
+                samples_per_channel=len(chunk) // (num_channels * 2),
+            )
+
+    def say(self, session, text: str, **kwargs):
+        """``session.say`` with cached audio, or live TTS while the cache is filled."""
+        path = self.path_for(text)
+        if path.exists():
+            return session.say(text, audio=self.frames(text), **kwargs)
+        self._start(text, path)
+        return session.say(text, **kwargs)
+
+
+@asynccontextmanager
+async def hold_if_slow(context, text: str, delay: float = None):
+    """Play a cached hold message if the wrapped block outlasts ``delay`` seconds."""
+    delay = delay if delay is not None else float(os.getenv("HOLD_MESSAGE_AFTER_SECONDS", "1.0"))
+    session = getattr(context, "session", None)
+    utterances = getattr(getattr(session, "current_agent", None), "utterances", None)
+
+    if utterances is None:
+        yield
+        return
+
+    async def announce():
+        await asyncio.sleep(delay)
+        utterances.say(session, text, add_to_chat_ctx=False)
+
+    task = asyncio.create_task(announce())
+    try:
+        yield
+    finally:
+        task.cancel()
@@ -0,0 +1,94 @@
+"""Rewrite stored phone numbers to E.164.
+
+Run ``python -m database.backfill_phones`` once after upgrading (add
+``--dry-run`` to only count). Patients whose numbers normalize to the same
+E.164 value are merged into one record and their appointments re-pointed,
+so the unique phone index keeps holding.
+"""
+
+import argparse
+import asyncio
+from typing import Dict, List
+
+from pymongo import DeleteOne, UpdateMany, UpdateOne
+
+from database.phone import normalize_phone
+
+
+async def backfill_patients(db, dry_run: bool = False) -> dict:
+    stats = {"updated": 0, "merged": 0, "invalid": 0}
+    groups: Dict[str, List[dict]] = {}
+    async for patient in db.patients.find({}, {"_id": 1, "patient_id": 1, "phone": 1}).sort("_id", 1):
+        phone = normalize_phone(patient.get("phone") or "")
+        if phone is None:
+            stats["invalid"] += 1
+            continue
+        groups.setdefault(phone, []).append(patient)
+
+    patient_ops, appointment_ops = [], []
+    for phone, patients in groups.items():
+        # Keep the record already in canonical form, else the oldest one
+        keep = next((p for p in patients if p["phone"] == phone), patients[0])
+        for duplicate in patients:
+            if duplicate is keep:
+                continue
+            appointment_ops.append(UpdateMany(
+                {"patient_id": duplicate["patient_id"]},
+                {"$set": {"patient_id": keep["patient_id"]}},
+            ))
+            patient_ops.append(DeleteOne({"_id": duplicate["_id"]}))
+            stats["merged"] += 1
+        if keep["phone"] != phone:
+            patient_ops.append(UpdateOne({"_id": keep["_id"]}, {"$set": {"phone": phone}}))
+            stats["updated"] += 1
+
+    if not dry_run:
+        # Re-point and delete duplicates before any phone rewrite can collide with them
+        if appointment_ops:
+            await db.appointments.bulk_write(appointment_ops, ordered=False)
+        if patient_ops:
+            await db.patients.bulk_write(patient_ops, ordered=True)
+    return stats
+
+
+async def backfill_appointments(db, dry_run: bool = False) -> dict:
+    stats = {"updated": 0, "invalid": 0}
+    ops = []
+    # One update per distinct stored value rather than per appointment
+    async for group in db.appointments.aggregate([
+        {"$group": {"_id": "$patient_phone", "count": {"$sum": 1}}},
+    ]):
+        raw = group["_id"]
+        phone = normalize_phone(raw or "")
+        if phone is None:
+            stats["invalid"] += group["count"]
+        elif phone != raw:
+            ops.append(UpdateMany({"patient_phone": raw}, {"$set": {"patient_phone": phone}}))
+            stats["updated"] += group["count"]
+
+    if ops and not dry_run:
+        await db.appointments.bulk_write(ops, ordered=False)
+    return stats
+
+
+async def main():
+    from dotenv import load_dotenv
+    from database.mongodb import MongoDB
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="count changes without writing")
+    args = parser.parse_args()
+
+    load_dotenv()
+    await MongoDB.connect()
+    db = MongoDB.get_db()
+    patients = await backfill_patients(db, args.dry_run)
+    appointments = await backfill_appointments(db, args.dry_run)
+    prefix = "would change" if args.dry_run else "changed"
+    print(f"patients:     {prefix} {patients}")
+    print(f"appointments: {prefix} {appointments}")
+    await MongoDB.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
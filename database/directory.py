@@ -0,0 +1,279 @@
+"""In-process cache of the doctor and department directory."""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from database.indexes import CASE_INSENSITIVE
+from database.mongodb import MongoDB, get_doctors_collection, get_departments_collection
+from database.name_resolver import NameResolver, Resolution
+
+logger = logging.getLogger(__name__)
+
+WATCHED_COLLECTIONS = ("doctors", "departments")
+
+# Closest names scoring at least this are offered back when a name doesn't resolve
+SUGGEST_MIN_CONFIDENCE = 0.4
+
+
+def normalize_name(value: str) -> str:
+    """Normalize a doctor or department name for lookups."""
+    return " ".join(value.lower().split())
+
+
+class DirectoryCache:
+    """Per-process cache of doctors and departments.
+
+    The directory is loaded once and kept fresh by a MongoDB change stream.
+    When change streams are unavailable (e.g. a standalone mongod) entries
+    are reloaded after ``DIRECTORY_CACHE_TTL_SECONDS``.
+
+    Names that miss the exact index go through a phonetic/trigram resolver
+    and are accepted at ``NAME_RESOLVER_MIN_CONFIDENCE`` or above, and only
+    when they lead the runner-up by ``NAME_RESOLVER_MIN_MARGIN``. Anything
+    less is left for the caller to confirm via ``suggest_doctors``.
+    """
+
+    _doctors_by_id: Dict[str, dict] = {}
+    _doctors_by_name: Dict[str, dict] = {}
+    _doctors_by_department: Dict[str, List[dict]] = {}
+    _departments_by_name: Dict[str, dict] = {}
+    _departments: List[dict] = []
+
+    _doctor_resolver: NameResolver = NameResolver()
+    _department_resolver: NameResolver = NameResolver()
+
+    _loaded_at: Optional[float] = None
+    _watching: bool = False
+    _watch_task: Optional[asyncio.Task] = None
+    _lock: Optional[asyncio.Lock] = None
+
+    _stats: Dict[str, int] = {
+        "hits": 0,
+        "fuzzy_hits": 0,
+        "misses": 0,
+        "stale_reloads": 0,
+        "reloads": 0,
+        "change_events": 0,
+    }
+
+    @classmethod
+    def ttl_seconds(cls) -> float:
+        return float(os.getenv("DIRECTORY_CACHE_TTL_SECONDS", "300"))
+
+    @classmethod
+    def min_confidence(cls) -> float:
+        return float(os.getenv("NAME_RESOLVER_MIN_CONFIDENCE", "0.65"))
+
+    @classmethod
+    def min_margin(cls) -> float:
+        return float(os.getenv("NAME_RESOLVER_MIN_MARGIN", "0.15"))
+
+    @classmethod
+    def _is_fresh(cls) -> bool:
+        if cls._loaded_at is None:
+            return False
+        if cls._watching:
+            return True
+        return time.monotonic() - cls._loaded_at < cls.ttl_seconds()
+
+    @classmethod
+    async def ensure_loaded(cls):
+        """Load the directory if it is missing or stale."""
+        if cls._is_fresh():
+            return
+
+        if cls._lock is None:
+            cls._lock = asyncio.Lock()
+
+        async with cls._lock:
+            if cls._is_fresh():
+                return
+            if cls._loaded_at is not None:
+                cls._stats["stale_reloads"] += 1
+            await cls.reload()
+            cls._start_watch()
+
+    @classmethod
+    async def reload(cls, collection: Optional[str] = None):
+        """Reload one collection (or both) from MongoDB."""
+        if collection in (None, "doctors"):
+            doctors = [doc async for doc in get_doctors_collection().find()]
+            cls._index_doctors(doctors)
+        if collection in (None, "departments"):
+            departments = [dept async for dept in get_departments_collection().find()]
+            cls._index_departments(departments)
+        cls._loaded_at = time.monotonic()
+        cls._stats["reloads"] += 1
+
+    @classmethod
+    def _index_doctors(cls, doctors: List[dict]):
+        by_id, by_name, by_department = {}, {}, {}
+        for doctor in doctors:
+            by_id[doctor["doctor_id"]] = doctor
+            by_name[normalize_name(doctor["name"])] = doctor
+            by_department.setdefault(normalize_name(doctor["department"]), []).append(doctor)
+        # Swap whole indexes so concurrent readers never see a partial load
+        cls._doctors_by_id = by_id
+        cls._doctors_by_name = by_name
+        cls._doctors_by_department = by_department
+        cls._doctor_resolver.sync({
+            doctor["doctor_id"]: (doctor["name"], doctor) for doctor in doctors
+        })
+        cls._sync_department_resolver()
+
+    @classmethod
+    def _index_departments(cls, departments: List[dict]):
+        cls._departments_by_name = {normalize_name(dept["name"]): dept for dept in departments}
+        cls._departments = departments
+        cls._sync_department_resolver()
+
+    @classmethod
+    def _sync_department_resolver(cls):
+        # Departments are named both in their own collection and on each
+        # doctor; resolve against both so either lookup can use the result
+        names = {key: (dept["name"], None) for key, dept in cls._departments_by_name.items()}
+        for key, doctors in cls._doctors_by_department.items():
+            names.setdefault(key, (doctors[0]["department"], None))
+        cls._department_resolver.sync(names)
+
+    @classmethod
+    def _start_watch(cls):
+        if cls._watch_task is None or cls._watch_task.done():
+            cls._watch_task = asyncio.create_task(cls._watch())
+
+    @classmethod
+    async def _watch(cls):
+        pipeline = [{"$match": {"ns.coll": {"$in": list(WATCHED_COLLECTIONS)}}}]
+        try:
+            async with MongoDB.get_db().watch(pipeline) as stream:
+                cls._watching = True
+                logger.info("directory cache: watching change stream")
+                # Pick up anything written between the initial load and the stream opening
+                await cls.reload()
+                async for change in stream:
+                    cls._stats["change_events"] += 1
+                    # The directory is small, so reloading the touched
+                    # collection is simpler than patching single entries.
+                    await cls.reload(change["ns"]["coll"])
+        except OperationFailure as e:
+            logger.info("directory cache: change streams unavailable (%s), using %ss TTL", e.code, cls.ttl_seconds())
+        except PyMongoError:
+            logger.exception("directory cache: change stream failed, falling back to TTL")
+        finally:
+            cls._watching = False
+
+    @classmethod
+    async def stop(cls):
+        """Stop the change stream watcher."""
+        if cls._watch_task and not cls._watch_task.done():
+            cls._watch_task.cancel()
+            try:
+                await cls._watch_task
+            except asyncio.CancelledError:
+                pass
+        cls._watch_task = None
+        cls._watching = False
+
+    @classmethod
+    def _record(cls, found) -> None:
+        cls._stats["hits" if found else "misses"] += 1
+
+    @classmethod
+    def _resolve(cls, resolver: NameResolver, name: str) -> Optional[Resolution]:
+        match = resolver.resolve(name)
+        if match is None:
+            return None
+        if not match.is_clear(cls.min_confidence(), cls.min_margin()):
+            logger.debug(
+                "not resolving %r: closest is %r (confidence %.2f, runner-up %.2f)",
+                name, match.name, match.confidence, match.runner_up,
+            )
+            return None
+        cls._stats["fuzzy_hits"] += 1
+        logger.debug("resolved %r to %r (confidence %.2f)", name, match.name, match.confidence)
+        return match
+
+    @classmethod
+    def _department_key(cls, name: str) -> str:
+        key = normalize_name(name)
+        if key in cls._departments_by_name or key in cls._doctors_by_department:
+            return key
+        match = cls._resolve(cls._department_resolver, name)
+        return match.entry_id if match else key
+
+    @classmethod
+    async def get_doctor_by_name(cls, name: str) -> Optional[dict]:
+        """Find a doctor by name, tolerating speech-to-text misspellings."""
+        await cls.ensure_loaded()
+        doctor = cls._doctors_by_name.get(normalize_name(name))
+        if doctor is None:
+            match = cls._resolve(cls._doctor_resolver, name)
+            doctor = match.payload if match else None
+        cls._record(doctor)
+        if doctor is None:
+            # Directory may lag behind MongoDB in TTL mode; ask once before giving up
+            doctor = await get_doctors_collection().find_one(
+                {"name": name.strip()}, collation=CASE_INSENSITIVE
+            )
+            if doctor:
+                await cls.reload("doctors")
+        return doctor
+
+    @classmethod
+    def suggest_doctors(cls, name: str) -> List[str]:
+        """Names of the closest doctors to offer when ``name`` didn't resolve."""
+        return [match.name for match in cls._doctor_resolver.suggest(name, SUGGEST_MIN_CONFIDENCE)]
+
+    @classmethod
+    async def get_doctor_by_id(cls, doctor_id: str) -> Optional[dict]:
+        """Find a doctor by ``doctor_id``."""
+        await cls.ensure_loaded()
+        doctor = cls._doctors_by_id.get(doctor_id)
+        cls._record(doctor)
+        return doctor
+
+    @classmethod
+    async def get_doctors_by_department(cls, department: str) -> List[dict]:
+        """List doctors working in a department, tolerating misspellings."""
+        await cls.ensure_loaded()
+        doctors = cls._doctors_by_department.get(cls._department_key(department), [])
+        cls._record(doctors)
+        return list(doctors)
+
+    @classmethod
+    async def get_department(cls, name: str) -> Optional[dict]:
+        """Find a department by name, tolerating misspellings."""
+        await cls.ensure_loaded()
+        department = cls._departments_by_name.get(cls._department_key(name))
+        cls._record(department)
+        if department is None:
+            department = await get_departments_collection().find_one(
+                {"name": name.strip()}, collation=CASE_INSENSITIVE
+            )
+            if department:
+                await cls.reload("departments")
+        return department
+
+    @classmethod
+    async def list_departments(cls) -> List[dict]:
+        """List all departments in directory order."""
+        await cls.ensure_loaded()
+        cls._record(True)
+        return list(cls._departments)
+
+    @classmethod
+    def stats(cls) -> dict:
+        """Hit/miss/staleness counters for the directory cache."""
+        age = None if cls._loaded_at is None else round(time.monotonic() - cls._loaded_at, 3)
+        return {
+            **cls._stats,
+            "mode": "change_stream" if cls._watching else "ttl",
+            "age_seconds": age,
+            "doctors": len(cls._doctors_by_id),
+            "departments": len(cls._departments),
+        }
@@ -0,0 +1,223 @@
+"""Index definitions and query-plan report for the hospital database.
+
+Run ``python -m database.indexes`` to create indexes and print the report
+without starting the agent.
+"""
+
+import asyncio
+import logging
+from typing import List
+
+from prometheus_client import Gauge
+from pymongo import ASCENDING, IndexModel
+from pymongo.collation import Collation
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+INDEX_MISSING = Gauge(
+    "mongodb_index_missing",
+    "1 while an index from INDEXES could not be created",
+    ["collection", "index"],
+    multiprocess_mode="livemax",
+)
+
+# Case-insensitive comparison; lets exact name lookups use an index
+CASE_INSENSITIVE = Collation(locale="en", strength=2)
+
+INDEXES = {
+    "doctors": [
+        IndexModel([("doctor_id", ASCENDING)], name="doctor_id_unique", unique=True),
+        IndexModel([("name", ASCENDING)], name="name_ci", collation=CASE_INSENSITIVE),
+        IndexModel([("department", ASCENDING)], name="department_ci", collation=CASE_INSENSITIVE),
+    ],
+    "departments": [
+        IndexModel([("department_id", ASCENDING)], name="department_id_unique", unique=True),
+        IndexModel([("name", ASCENDING)], name="name_ci", collation=CASE_INSENSITIVE),
+    ],
+    "appointments": [
+        IndexModel([("appointment_id", ASCENDING)], name="appointment_id_unique", unique=True),
+        # One scheduled appointment per doctor slot; cancelled ones don't count.
+        # Every slot query filters on status "scheduled", so this also serves reads.
+        IndexModel(
+            [("doctor_id", ASCENDING), ("date", ASCENDING), ("time", ASCENDING)],
+            name="doctor_slot_scheduled_unique",
+            unique=True,
+            partialFilterExpression={"status": "scheduled"},
+        ),
+        IndexModel(
+            [("patient_phone", ASCENDING), ("status", ASCENDING), ("date", ASCENDING)],
+            name="patient_phone_status_date",
+        ),
+    ],
+    "patients": [
+        IndexModel([("phone", ASCENDING)], name="phone_unique", unique=True),
+    ],
+}
+
+# Indexes that enforce correctness rather than speed; startup fails without them
+REQUIRED_INDEXES = {"doctor_slot_scheduled_unique"}
+
+
+class MissingIndexError(RuntimeError):
+    """A required index could not be created, e.g. because existing rows violate it."""
+
+
+# Representative shapes of the queries issued by the tools package.
+# Keep in sync with tools/ so the startup report stays meaningful.
+TOOL_QUERIES = [
+    {
+        "name": "doctor by name",
+        "collection": "doctors",
+        "filter": {"name": "Dr. Sarah Ahmed"},
+        "collation": CASE_INSENSITIVE,
+    },
+    {
+        "name": "doctors by department",
+        "collection": "doctors",
+        "filter": {"department": "Cardiology"},
+        "collation": CASE_INSENSITIVE,
+    },
+    {
+        "name": "department by name",
+        "collection": "departments",
+        "filter": {"name": "Cardiology"},
+        "collation": CASE_INSENSITIVE,
+    },
+    {
+        "name": "booked slots in range",
+        "collection": "appointments",
+        "filter": {
+            "doctor_id": {"$in": ["doc_001", "doc_002"]},
+            "date": {"$gte": "2026-01-26", "$lte": "2026-02-01"},
+            "status": "scheduled",
+        },
+    },
+    {
+        "name": "patient appointments",
+        "collection": "appointments",
+        "filter": {"patient_phone": "+12292139528", "status": "scheduled"},
+        "sort": {"date": 1},
+    },
+    {
+        "name": "cancel by id prefix",
+        "collection": "appointments",
+        "filter": {"appointment_id": {"$regex": "^1a2b3c4d"}, "patient_phone": "+12292139528", "status": "scheduled"},
+    },
+    {
+        "name": "patient by phone",
+        "collection": "patients",
+        "filter": {"phone": "+12292139528"},
+    },
+]
+
+
+async def ensure_indexes(db):
+    """Create all indexes. Safe to call repeatedly.
+
+    Raises ``MissingIndexError`` if a ``REQUIRED_INDEXES`` entry could not be
+    built; other failures are logged and exported as ``mongodb_index_missing``.
+    """
+    results = await asyncio.gather(
+        *(db[name].create_indexes(models) for name, models in INDEXES.items()),
+        return_exceptions=True,
+    )
+    missing = []
+    for name, result in zip(INDEXES, results):
+        # createIndexes builds all of a collection's indexes or none of them
+        for model in INDEXES[name]:
+            index = model.document["name"]
+            INDEX_MISSING.labels(collection=name, index=index).set(1 if isinstance(result, Exception) else 0)
+            if isinstance(result, Exception) and index in REQUIRED_INDEXES:
+                missing.append(index)
+        if isinstance(result, Exception):
+            # e.g. duplicate phone numbers blocking a unique index
+            logger.warning("could not create indexes on %s: %s", name, result)
+    if missing:
+        raise MissingIndexError(
+            f"required indexes could not be created: {', '.join(missing)}; "
+            "bookings are refused until the conflicting appointments are fixed"
+        )
+
+
+async def check_required_indexes(db):
+    """Raise ``MissingIndexError`` unless every ``REQUIRED_INDEXES`` entry exists.
+
+    Used instead of ``ensure_indexes`` when index creation is disabled.
+    """
+    missing = []
+    for name, models in INDEXES.items():
+        required = [model.document["name"] for model in models if model.document["name"] in REQUIRED_INDEXES]
+        if not required:
+            continue
+        existing = await db[name].index_information()
+        for index in required:
+            INDEX_MISSING.labels(collection=name, index=index).set(0 if index in existing else 1)
+            if index not in existing:
+                missing.append(index)
+    if missing:
+        raise MissingIndexError(
+            f"required indexes do not exist: {', '.join(missing)}; "
+            "run python -m database.indexes to create them"
+        )
+
+
+def _plan_stages(plan: dict) -> List[str]:
+    stages = [plan.get("stage")]
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages += _plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        stages += _plan_stages(child)
+    return stages
+
+
+async def collscan_report(db) -> List[str]:
+    """Return the names of tool queries whose winning plan is a COLLSCAN."""
+    scans = []
+    for query in TOOL_QUERIES:
+        find = {"find": query["collection"], "filter": query["filter"]}
+        if "sort" in query:
+            find["sort"] = query["sort"]
+        if "collation" in query:
+            find["collation"] = query["collation"].document
+        try:
+            explain = await db.command({"explain": find, "verbosity": "queryPlanner"})
+        except OperationFailure as e:
+            logger.warning("could not explain %r: %s", query["name"], e)
+            continue
+        if "COLLSCAN" in _plan_stages(explain["queryPlanner"]["winningPlan"]):
+            scans.append(query["name"])
+    return scans
+
+
+async def log_collscan_report(db):
+    """Log a warning listing tool queries that still scan a collection."""
+    scans = await collscan_report(db)
+    if scans:
+        logger.warning("queries running a COLLSCAN: %s", ", ".join(scans))
+    else:
+        logger.info("all tool queries are index-backed")
+
+
+async def main():
+    from dotenv import load_dotenv
+    from database.mongodb import MongoDB
+
+    load_dotenv()
+    # init() rather than connect(): connect would build indexes and schedule its own report
+    MongoDB.init()
+    db = MongoDB.get_db()
+    try:
+        await ensure_indexes(db)
+
+        scans = await collscan_report(db)
+        for query in TOOL_QUERIES:
+            status = "COLLSCAN" if query["name"] in scans else "ok"
+            print(f"{query['collection']:<13} {query['name']:<24} {status}")
+    finally:
+        await MongoDB.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -2,43 +2,102 @@
 
 from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo.errors import ServerSelectionTimeoutError
+import asyncio
+import logging
 import os
 from typing import Optional
 
+from database.indexes import MissingIndexError, check_required_indexes, ensure_indexes, log_collscan_report
+from database.pool_metrics import CommandMetricsListener, PoolMetricsListener
+
+logger = logging.getLogger(__name__)
+
+
+def _client_options() -> dict:
+    """Pool sizing and timeouts, configurable from the environment."""
+    options = {
+        "serverSelectionTimeoutMS": 5000,
+        "maxPoolSize": int(os.getenv("MONGODB_MAX_POOL_SIZE", "100")),
+        "minPoolSize": int(os.getenv("MONGODB_MIN_POOL_SIZE", "0")),
+        "waitQueueTimeoutMS": int(os.getenv("MONGODB_WAIT_QUEUE_TIMEOUT_MS", "2000")),
+        "event_listeners": [PoolMetricsListener(), CommandMetricsListener()],
+    }
+    # Client-side operation timeout; the driver sends the remaining budget as maxTimeMS
+    operation_timeout = os.getenv("MONGODB_OPERATION_TIMEOUT_MS")
+    if operation_timeout:
+        options["timeoutMS"] = int(operation_timeout)
+    return options
+
 class MongoDB:
     _client: Optional[AsyncIOMotorClient] = None
     _db = None
+    _connected: bool = False
+    _report_task: Optional[asyncio.Task] = None
+    # Whether the unique slot index exists: None until checked by connect()
+    slot_guard: Optional[bool] = None
     
     @classmethod
-    async def connect(cls):
-        """Connect to MongoDB."""
+    def init(cls):
+        """Create the client and its connection pool without waiting for the server.
+        
+        Safe to call outside an event loop (e.g. from a worker prewarm hook);
+        the driver starts discovering the server in the background.
+        """
         if cls._client is None:
             mongodb_url = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
             db_name = os.getenv("MONGODB_DB_NAME", "hospital_db")
             
+            cls._client = AsyncIOMotorClient(mongodb_url, **_client_options())
+            cls._db = cls._client[db_name]
+    
+    @classmethod
+    async def connect(cls):
+        """Connect to MongoDB."""
+        if not cls._connected:
+            cls.init()
+            
             try:
-                cls._client = AsyncIOMotorClient(mongodb_url, serverSelectionTimeoutMS=5000)
                 # Test connection
                 await cls._client.admin.command('ping')
-                cls._db = cls._client[db_name]
-                print(f"✅ Connected to MongoDB: {db_name}")
+                logger.info("connected to MongoDB database %s", cls._db.name)
+                
+                # Not connected until the double-booking guard is in place, so the next call checks again
+                try:
+                    if os.getenv("MONGODB_ENSURE_INDEXES", "1") == "1":
+                        await ensure_indexes(cls._db)
+                        # Explains are diagnostics only; keep them off the connect path
+                        cls._report_task = asyncio.create_task(log_collscan_report(cls._db))
+                    else:
+                        await check_required_indexes(cls._db)
+                except MissingIndexError:
+                    cls.slot_guard = False
+                    raise
+                cls.slot_guard = True
+                cls._connected = True
             except ServerSelectionTimeoutError:
-                print("❌ Failed to connect to MongoDB")
+                logger.error("failed to connect to MongoDB")
                 raise
     
     @classmethod
     def get_db(cls):
         """Get database instance."""
         if cls._db is None:
-            raise RuntimeError("Database not connected. Call MongoDB.connect() first.")
+            raise RuntimeError("Database not connected. Call MongoDB.init() or MongoDB.connect() first.")
         return cls._db
     
     @classmethod
     async def close(cls):
         """Close MongoDB connection."""
+        if cls._report_task is not None:
+            cls._report_task.cancel()
+            cls._report_task = None
         if cls._client:
             cls._client.close()
-            print("✅ MongoDB connection closed")
+            cls._client = None
+            cls._db = None
+            cls._connected = False
+            cls.slot_guard = None
+            logger.info("MongoDB connection closed")
 
 # Collections
 def get_doctors_collection():
@@ -0,0 +1,288 @@
+"""Fuzzy name resolution for doctors and departments.
+
+Names reach the tools through speech-to-text, so "Dr. Aisha Khan" may
+arrive as "Dr Aisha Kahn" or "Aysha Khan". The resolver strips honorifics
+and scores candidates on two signals:
+
+- phonetic keys per word (a simplified Metaphone), which catch spelling
+  variants that sound alike
+- character trigrams of the whole name, which catch dropped or swapped
+  letters
+
+Both are kept in inverted indexes so a lookup only scores entries that
+share a key or a trigram with the query. Entries can be added and removed
+one at a time, so directory changes don't require a full rebuild.
+
+A match also carries the runner-up's score. A name that is only slightly
+closer to one entry than to another ("Dr. Sarah Khan" against Sarah Ahmed
+and Aisha Khan) should be confirmed with the caller, not acted on.
+"""
+
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+HONORIFICS = {"dr", "doctor", "prof", "professor", "mr", "mrs", "ms", "miss", "sir", "madam"}
+VOWELS = set("AEIOU")
+
+# How many entries to score in full, and how much a shared phonetic key
+# counts against a shared trigram when picking them
+MAX_CANDIDATES = 20
+KEY_WEIGHT = 3
+COMMON_GRAM_FRACTION = 0.02
+
+
+def strip_honorifics(name: str) -> List[str]:
+    """Lowercase words of a name without punctuation or titles."""
+    words = re.sub(r"[^\w\s]", " ", name.lower()).split()
+    return [word for word in words if word not in HONORIFICS]
+
+
+def phonetic_key(word: str) -> str:
+    """Simplified Metaphone key for a single word.
+
+    Unlike classic Metaphone, a lone H is always silent so that transposed
+    spellings such as "Khan" and "Kahn" share a key.
+    """
+    word = re.sub(r"[^A-Z]", "", word.upper())
+    if not word:
+        return ""
+
+    for prefix in ("KN", "GN", "PN", "WR", "AE"):
+        if word.startswith(prefix):
+            word = word[1:]
+            break
+    if word.startswith("X"):
+        word = "S" + word[1:]
+    if word.startswith("WH"):
+        word = "W" + word[2:]
+    if word.endswith("MB"):
+        word = word[:-1]
+
+    key = []
+    i = 0
+    while i < len(word):
+        c = word[i]
+        nxt = word[i + 1] if i + 1 < len(word) else ""
+        nxt2 = word[i + 2] if i + 2 < len(word) else ""
+
+        if c == word[i - 1:i] and c != "C":
+            i += 1
+            continue
+
+        if c in VOWELS:
+            if i == 0:
+                key.append(c)
+        elif c == "B":
+            key.append("B")
+        elif c == "C":
+            if nxt == "H" or (nxt == "I" and nxt2 == "A"):
+                key.append("X")
+            elif nxt in ("I", "E", "Y"):
+                key.append("S")
+            else:
+                key.append("K")
+        elif c == "D":
+            key.append("J" if nxt == "G" and nxt2 in ("E", "I", "Y") else "T")
+        elif c == "G":
+            if nxt in ("I", "E", "Y"):
+                key.append("J")
+            elif nxt != "H" or i + 2 >= len(word):
+                key.append("K")
+        elif c == "H":
+            pass
+        elif c == "K":
+            if word[i - 1:i] != "C":
+                key.append("K")
+        elif c == "P":
+            key.append("F" if nxt == "H" else "P")
+        elif c == "Q":
+            key.append("K")
+        elif c == "S":
+            if nxt == "H" or (nxt == "I" and nxt2 in ("O", "A")):
+                key.append("X")
+            else:
+                key.append("S")
+        elif c == "T":
+            if nxt == "H":
+                key.append("0")
+            elif nxt == "I" and nxt2 in ("O", "A"):
+                key.append("X")
+            else:
+                key.append("T")
+        elif c == "V":
+            key.append("F")
+        elif c in ("W", "Y"):
+            if nxt in VOWELS:
+                key.append(c)
+        elif c == "X":
+            key.append("KS")
+        elif c == "Z":
+            key.append("S")
+        else:
+            key.append(c)
+        i += 1
+
+    return "".join(key)
+
+
+def trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass
+class Resolution:
+    entry_id: Hashable
+    name: str
+    payload: Any
+    confidence: float
+    # Score of the next best entry; a small lead means the name is ambiguous
+    runner_up: float = 0.0
+
+    def is_clear(self, min_confidence: float, min_margin: float) -> bool:
+        """Confident enough, and far enough ahead of the runner-up, to act on."""
+        return self.confidence >= min_confidence and self.confidence - self.runner_up >= min_margin
+
+
+def dice(a: Set[str], b: Set[str]) -> float:
+    return 2 * len(a & b) / (len(a) + len(b)) if a or b else 0.0
+
+
+class _Name:
+    """Pre-computed phonetic keys and trigrams for a name."""
+
+    __slots__ = ("keys", "word_grams", "grams")
+
+    def __init__(self, words: List[str]):
+        self.keys = [phonetic_key(word) for word in words]
+        self.word_grams = [trigrams(word) for word in words]
+        self.grams = trigrams(" ".join(words))
+
+    def word_similarity(self, i: int, other: "_Name", j: int) -> float:
+        """1.0 when two words sound alike, otherwise their spelling overlap."""
+        if self.keys[i] and self.keys[i] == other.keys[j]:
+            return 1.0
+        return dice(self.word_grams[i], other.word_grams[j])
+
+
+class _Entry:
+    __slots__ = ("entry_id", "name", "payload", "parsed")
+
+    def __init__(self, entry_id, name, payload):
+        self.entry_id = entry_id
+        self.name = name
+        self.payload = payload
+        self.parsed = _Name(strip_honorifics(name))
+
+
+class NameResolver:
+    """In-memory phonetic + trigram index over a set of names."""
+
+    def __init__(self):
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._by_key: Dict[str, Set[Hashable]] = {}
+        self._by_gram: Dict[str, Set[Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, entry_id: Hashable, name: str, payload: Any = None):
+        """Index ``name`` under ``entry_id``, replacing any previous entry."""
+        existing = self._entries.get(entry_id)
+        if existing is not None:
+            if existing.name == name:
+                existing.payload = payload
+                return
+            self.remove(entry_id)
+
+        entry = _Entry(entry_id, name, payload)
+        self._entries[entry_id] = entry
+        for key in entry.parsed.keys:
+            self._by_key.setdefault(key, set()).add(entry_id)
+        for gram in entry.parsed.grams:
+            self._by_gram.setdefault(gram, set()).add(entry_id)
+
+    def remove(self, entry_id: Hashable):
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        for index, values in ((self._by_key, entry.parsed.keys), (self._by_gram, entry.parsed.grams)):
+            for value in values:
+                ids = index.get(value)
+                if ids is not None:
+                    ids.discard(entry_id)
+                    if not ids:
+                        del index[value]
+
+    def sync(self, names: Dict[Hashable, tuple]):
+        """Bring the index in line with ``{entry_id: (name, payload)}``, touching only changes."""
+        for entry_id in set(self._entries) - set(names):
+            self.remove(entry_id)
+        for entry_id, (name, payload) in names.items():
+            self.add(entry_id, name, payload)
+
+    @staticmethod
+    def _score(query: _Name, entry: _Name) -> float:
+        if not entry.keys:
+            return 0.0
+        similarity = [
+            [query.word_similarity(i, entry, j) for j in range(len(entry.keys))]
+            for i in range(len(query.keys))
+        ]
+        # How well the query's words are covered, and how much of the entry
+        # was mentioned; saying only a surname still scores fairly high
+        query_coverage = sum(max(row) for row in similarity) / len(query.keys)
+        entry_coverage = sum(max(column) for column in zip(*similarity)) / len(entry.keys)
+        word_score = (query_coverage + entry_coverage) / 2
+
+        return 0.3 * dice(query.grams, entry.grams) + 0.7 * word_score
+
+    def _ranked(self, name: str) -> List[Tuple[float, _Entry]]:
+        words = strip_honorifics(name)
+        if not words or not self._entries:
+            return []
+
+        query = _Name(words)
+
+        # Rank by shared keys and trigrams, then score only the best few
+        shared = Counter()
+        for key in query.keys:
+            ids = self._by_key.get(key, ())
+            for _ in range(KEY_WEIGHT):
+                shared.update(ids)
+        # Trigrams shared by a large part of the directory say little about
+        # which entry was meant and dominate the counting cost
+        common = max(MAX_CANDIDATES, len(self._entries) * COMMON_GRAM_FRACTION)
+        for gram in query.grams:
+            ids = self._by_gram.get(gram, ())
+            if len(ids) <= common:
+                shared.update(ids)
+        candidates = [entry_id for entry_id, _ in shared.most_common(MAX_CANDIDATES)]
+
+        scored = []
+        for entry_id in candidates:
+            entry = self._entries[entry_id]
+            score = self._score(query, entry.parsed)
+            if score > 0:
+                scored.append((score, entry))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return scored
+
+    def resolve(self, name: str) -> Optional[Resolution]:
+        """Best match for ``name`` with a confidence in [0, 1], or None."""
+        ranked = self._ranked(name)
+        if not ranked:
+            return None
+        score, best = ranked[0]
+        runner_up = ranked[1][0] if len(ranked) > 1 else 0.0
+        return Resolution(best.entry_id, best.name, best.payload, round(score, 4), round(runner_up, 4))
+
+    def suggest(self, name: str, min_confidence: float, limit: int = 2) -> List[Resolution]:
+        """Closest entries at ``min_confidence`` or above, for a "did you mean" prompt."""
+        return [
+            Resolution(entry.entry_id, entry.name, entry.payload, round(score, 4))
+            for score, entry in self._ranked(name)[:limit]
+            if score >= min_confidence
+        ]
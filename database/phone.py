@@ -0,0 +1,75 @@
+"""Phone number normalization to E.164.
+
+Callers read numbers out in every shape ("+1 229 213 9528", "229-213-9528",
+"0300 1234567"), so patients and appointments store one canonical form and
+every lookup normalizes before querying.
+
+Numbers with a known country code must also have that country's national
+length, so a partly heard "213 9528" is rejected instead of being stored
+as "+12139528" and asked for again.
+"""
+
+import os
+import re
+from typing import Optional
+
+# E.164 allows at most 15 digits including the country code
+MIN_DIGITS = 8
+MAX_DIGITS = 15
+
+# National number lengths (without the country code) for the countries we
+# expect callers from; other codes only get the E.164 bounds above
+NATIONAL_LENGTHS = {
+    "1": (10, 10),   # North America
+    "44": (9, 10),   # United Kingdom
+    "91": (10, 10),  # India
+    "92": (9, 10),   # Pakistan
+    "971": (8, 9),   # United Arab Emirates
+}
+
+
+def default_country_code() -> str:
+    """Country calling code assumed for numbers given without one."""
+    return os.getenv("PHONE_DEFAULT_COUNTRY_CODE", "1").lstrip("+")
+
+
+def normalize_phone(raw: str, country_code: Optional[str] = None) -> Optional[str]:
+    """Return ``raw`` as E.164 (``+12292139528``), or None if it can't be a phone number."""
+    if not raw:
+        return None
+    raw = raw.strip()
+    country_code = country_code or default_country_code()
+    digits = re.sub(r"\D", "", raw)
+
+    if raw.startswith("+"):
+        pass
+    elif digits.startswith("00"):
+        # International dialling prefix
+        digits = digits[2:]
+    elif country_code == "1" and len(digits) == 11 and digits.startswith("1"):
+        # North American number with the leading 1 but no plus sign
+        pass
+    else:
+        # National format; drop the trunk prefix (e.g. "0300 ..." in Pakistan)
+        digits = country_code + digits.lstrip("0")
+
+    if not MIN_DIGITS <= len(digits) <= MAX_DIGITS or not _valid_national(digits):
+        return None
+    return "+" + digits
+
+
+def _valid_national(digits: str) -> bool:
+    """Check the national part's length for known country codes."""
+    # Country codes are prefix-free, so at most one of these matches
+    for size in (1, 2, 3):
+        lengths = NATIONAL_LENGTHS.get(digits[:size])
+        if lengths is None:
+            continue
+        national = digits[size:]
+        if not lengths[0] <= len(national) <= lengths[1]:
+            return False
+        if size == 1:
+            # North American area codes and exchanges never start with 0 or 1
+            return national[0] not in "01" and national[3] not in "01"
+        return True
+    return True
@@ -0,0 +1,116 @@
+"""MongoDB connection pool and command metrics.
+
+Pool checkout latency next to server-side command latency shows whether
+slow tool calls are waiting for a connection or for MongoDB itself.
+"""
+
+from prometheus_client import Counter, Gauge, Histogram
+from pymongo import monitoring
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+POOL_CHECKOUT_SECONDS = Histogram(
+    "mongodb_pool_checkout_seconds",
+    "Time spent waiting to check a connection out of the pool",
+    buckets=LATENCY_BUCKETS,
+)
+POOL_CHECKOUT_FAILURES = Counter(
+    "mongodb_pool_checkout_failures_total",
+    "Connection checkouts that failed",
+    ["reason"],
+)
+POOL_WAIT_QUEUE = Gauge(
+    "mongodb_pool_wait_queue",
+    "Operations currently waiting for a pooled connection",
+    multiprocess_mode="livesum",
+)
+POOL_CHECKED_OUT = Gauge(
+    "mongodb_pool_checked_out",
+    "Connections currently checked out of the pool",
+    multiprocess_mode="livesum",
+)
+POOL_CONNECTIONS_CREATED = Counter(
+    "mongodb_pool_connections_created_total",
+    "Connections opened by the pool",
+)
+POOL_CONNECTIONS_CLOSED = Counter(
+    "mongodb_pool_connections_closed_total",
+    "Connections closed by the pool",
+    ["reason"],
+)
+COMMAND_SECONDS = Histogram(
+    "mongodb_command_seconds",
+    "Round trip time of MongoDB commands, excluding pool checkout",
+    ["command"],
+    buckets=LATENCY_BUCKETS,
+)
+COMMAND_FAILURES = Counter(
+    "mongodb_command_failures_total",
+    "MongoDB commands that returned an error",
+    ["command"],
+)
+
+# Commands worth tracking individually; everything else is grouped as "other"
+TRACKED_COMMANDS = {
+    "find", "insert", "update", "delete", "findAndModify", "aggregate",
+    "getMore", "count", "createIndexes", "ping", "explain",
+}
+
+
+def _command_label(name: str) -> str:
+    return name if name in TRACKED_COMMANDS else "other"
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Feeds pool events into Prometheus metrics."""
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        POOL_CONNECTIONS_CREATED.inc()
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        POOL_CONNECTIONS_CLOSED.labels(reason=event.reason).inc()
+
+    def connection_check_out_started(self, event):
+        POOL_WAIT_QUEUE.inc()
+
+    def connection_check_out_failed(self, event):
+        POOL_WAIT_QUEUE.dec()
+        POOL_CHECKOUT_FAILURES.labels(reason=event.reason).inc()
+
+    def connection_checked_out(self, event):
+        POOL_WAIT_QUEUE.dec()
+        POOL_CHECKED_OUT.inc()
+        POOL_CHECKOUT_SECONDS.observe(event.duration)
+
+    def connection_checked_in(self, event):
+        POOL_CHECKED_OUT.dec()
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Feeds command round-trip times into Prometheus metrics."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        COMMAND_SECONDS.labels(command=_command_label(event.command_name)).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        command = _command_label(event.command_name)
+        COMMAND_SECONDS.labels(command=command).observe(event.duration_micros / 1e6)
+        COMMAND_FAILURES.labels(command=command).inc()
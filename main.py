@@ -1,282 +1,163 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, FileResponse
-from fastapi.staticfiles import StaticFiles
-from twilio.jwt.access_token import AccessToken
-from twilio.jwt.access_token.grants import VoiceGrant
-from twilio.twiml.voice_response import VoiceResponse
+from fastapi.responses import JSONResponse, Response
 from dotenv import load_dotenv
+from urllib.parse import parse_qs
+from typing import Dict, List, Optional
+import logging
 import os
 
+from observability.logs import bind_call, setup_logging
+from observability.metrics import collect_registry, render_latest
+from observability.tool_metrics import latency_summary
+from web.console import REVALIDATE_CACHE, Encoded, StaticBundle, encoded_response, render_console
+from web.hold_queue import HoldQueue
+from web.server import Health, lifespan, serve
+from web.tokens import TokenCache
+from web.voice import SignatureValidator, TwimlTable
 
 
 load_dotenv()
+setup_logging()
 
-app = FastAPI()
+logger = logging.getLogger("web")
 
-# Serve static files
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app = FastAPI(lifespan=lifespan)
 
 ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
 API_KEY = os.getenv("TWILIO_API_KEY")
 API_SECRET = os.getenv("TWILIO_API_SECRET")
 TWIML_APP_SID = os.getenv("TWILIO_TWIML_APP_SID")
 PHONE_NUMBER = os.getenv("TWILIO_PHONE_NUMBER")
-SIP_HOST = os.getenv("LIVEKIT_SIP_HOST")
-SIP_USER = os.getenv("LIVEKIT_SIP_USERNAME")
-SIP_PASS = os.getenv("LIVEKIT_SIP_PASSWORD")
+
+# The webhook response only depends on settings, so render it once at startup
+VOICE_TWIML = TwimlTable.from_env()
+VOICE_SIGNATURES = SignatureValidator.from_env()
+HOLD_QUEUE = HoldQueue()
+
+# Static files and the console page are loaded and compressed once too
+STATIC = StaticBundle("static")
+CONSOLE_PAGE = Encoded.build(
+    render_console(PHONE_NUMBER or "", STATIC.url("twilio.min.js")).encode(),
+    "text/html; charset=utf-8",
+)
+TOKENS = TokenCache(ACCOUNT_SID, API_KEY, API_SECRET, TWIML_APP_SID)
 
 
 @app.get("/token")
-def token():
+def token(identity: Optional[str] = None):
     """Generate Twilio access token for browser WebRTC"""
-    token = AccessToken(
-        ACCOUNT_SID,
-        API_KEY,
-        API_SECRET,
-        identity="browser-user"
-    )
+    # Only configured identities get a token; anyone can reach this endpoint
+    identity = identity or TOKENS.identities[0]
+    if not TOKENS.allows(identity):
+        return JSONResponse({"error": "unknown identity"}, status_code=403)
+    return {"token": TOKENS.get(identity)}
+
+
+@app.get("/static/{name}")
+def static(name: str, request: Request):
+    """Static files, precompressed; hashed names are cached forever"""
+    found = STATIC.get(name)
+    if found is None:
+        return Response(status_code=404)
+    asset, cache_control = found
+    return encoded_response(request, asset, cache_control)
+
+
+async def twilio_params(request: Request) -> Optional[Dict[str, List[str]]]:
+    """Form parameters of a Twilio webhook, or None if its signature is bad."""
+    # Twilio posts a small urlencoded form; parse it directly rather than via request.form()
+    params = parse_qs((await request.body()).decode(), keep_blank_values=True)
+    if VOICE_SIGNATURES is not None:
+        url = VOICE_SIGNATURES.request_url(request.url.path, request.url.query, str(request.url))
+        if not VOICE_SIGNATURES.is_valid(url, params, request.headers.get("x-twilio-signature")):
+            logger.warning("rejected %s request with a bad Twilio signature", request.url.path)
+            return None
+    bind_call(call_id=params.get("CallSid", [None])[0])
+    return params
 
-    grant = VoiceGrant(
-        outgoing_application_sid=TWIML_APP_SID,
-        incoming_allow=True
-    )
 
-    token.add_grant(grant)
-    return {"token": token.to_jwt()}
+def twiml(body: bytes) -> Response:
+    return Response(body, media_type="application/xml")
 
 
 @app.post("/voice")
 async def voice(request: Request):
-    """Twilio webhook - forwards call to LiveKit SIP"""
-    print("📞 Incoming call received - routing to LiveKit SIP")
-    
-    response = VoiceResponse()
-    # Use callerId to set a valid E.164 phone number for SIP
-    dial = response.dial(caller_id=PHONE_NUMBER)
-    dial.sip(
-        f"sip:{PHONE_NUMBER}@{SIP_HOST}",
-        username=SIP_USER,
-        password=SIP_PASS
-    )
-    
-    print(f"🔊 TwiML Response:\n{str(response)}")
-    return HTMLResponse(str(response), media_type="application/xml")
-
-
-@app.get("/", response_class=HTMLResponse)
-def index():
+    """Twilio webhook - forwards call to LiveKit SIP, or to the hold queue when agents are full"""
+    params = await twilio_params(request)
+    if params is None:
+        return Response(status_code=403)
+
+    called = params.get("To", [None])[0]
+    if HOLD_QUEUE.should_hold():
+        HOLD_QUEUE.enqueued()
+        logger.info("incoming call to %s, agents busy; holding", called)
+        return twiml(HOLD_QUEUE.enqueue_twiml)
+
+    HOLD_QUEUE.dialing()
+    logger.info("incoming call to %s, routing to LiveKit SIP", called)
+    return twiml(VOICE_TWIML.lookup(called))
+
+
+@app.post("/hold")
+async def hold(request: Request):
+    """Twilio queue wait URL - hold audio, or <Leave/> for the first caller once there's room"""
+    params = await twilio_params(request)
+    if params is None:
+        return Response(status_code=403)
+    return twiml(HOLD_QUEUE.wait_response(
+        params.get("QueuePosition", [None])[0],
+        params.get("QueueTime", [None])[0],
+        params.get("CurrentQueueSize", [None])[0],
+    ))
+
+
+@app.post("/hold/done")
+async def hold_done(request: Request):
+    """Twilio Enqueue action - dials callers who left the queue into LiveKit SIP"""
+    params = await twilio_params(request)
+    if params is None:
+        return Response(status_code=403)
+
+    result = params.get("QueueResult", [None])[0]
+    queue_time = params.get("QueueTime", [None])[0]
+    HOLD_QUEUE.left(result, queue_time)
+    logger.info("caller left the hold queue after %ss (%s)", queue_time, result)
+    if result != "leave":
+        return twiml(HOLD_QUEUE.hangup_twiml)
+    return twiml(VOICE_TWIML.lookup(params.get("To", [None])[0]))
+
+
+@app.get("/healthz")
+def healthz():
+    """Liveness: the process is up and serving requests"""
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+def readyz():
+    """Readiness: started and not draining for shutdown"""
+    status = Health.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus metrics, aggregated across agent processes on this host"""
+    body, content_type = render_latest()
+    return Response(body, media_type=content_type)
+
+
+@app.get("/metrics/tools")
+def tool_metrics():
+    """Per-tool call counts, error counts and p50/p95/p99 latency"""
+    return latency_summary(collect_registry())
+
+
+@app.get("/")
+def index(request: Request):
     """Browser interface for making calls"""
-    html = """
-<!DOCTYPE html>
-<html>
-<head>
-  <title>Twilio Browser → LiveKit Test</title>
-  <style>
-    body {
-      font-family: Arial, sans-serif;
-      max-width: 600px;
-      margin: 50px auto;
-      padding: 20px;
-      text-align: center;
-    }
-    button {
-      padding: 15px 30px;
-      font-size: 16px;
-      margin: 10px;
-      cursor: pointer;
-      border-radius: 5px;
-      border: none;
-    }
-    #callBtn {
-      background-color: #4CAF50;
-      color: white;
-    }
-    #hangupBtn {
-      background-color: #f44336;
-      color: white;
-    }
-    #status {
-      margin-top: 20px;
-      padding: 15px;
-      border-radius: 5px;
-      font-weight: bold;
-    }
-    .idle { background-color: #f0f0f0; }
-    .loading { background-color: #fff3cd; }
-    .calling { background-color: #d1ecf1; }
-    .connected { background-color: #d4edda; }
-    .error { background-color: #f8d7da; }
-  </style>
-</head>
-<body>
-  <h2>🎙️ Twilio Browser → LiveKit SIP Test</h2>
-  <p>Call your Twilio number from the browser (no phone needed)</p>
-  
-  <button id="callBtn" onclick="startCall()">📞 Call My Twilio Number</button>
-  <button id="hangupBtn" onclick="hangup()" disabled>❌ Hang Up</button>
-  
-  <div id="status" class="idle">Status: Idle</div>
-  <div id="logs" style="margin-top: 20px; text-align: left; font-family: monospace; font-size: 12px;"></div>
-
-  <script src="/static/twilio.min.js"></script>
-  
-  <script>
-    let device;
-    let activeCall;
-    
-    function log(message) {
-      const logs = document.getElementById("logs");
-      const timestamp = new Date().toLocaleTimeString();
-      logs.innerHTML += "[" + timestamp + "] " + message + "<br>";
-      logs.scrollTop = logs.scrollHeight;
-      console.log(message);
-    }
-    
-    function updateStatus(text, className) {
-      const status = document.getElementById("status");
-      status.innerText = "Status: " + text;
-      status.className = className;
-    }
-
-    async function startCall() {
-      try {
-        document.getElementById("callBtn").disabled = true;
-        updateStatus("Getting token...", "loading");
-        log("🔑 Requesting access token...");
-
-        // Check if Twilio is loaded
-        if (typeof Twilio === 'undefined' || typeof Twilio.Device === 'undefined') {
-          throw new Error("Twilio SDK not loaded. Check /static/twilio.min.js");
-        }
-
-        const res = await fetch("/token");
-        if (!res.ok) {
-          throw new Error("Token request failed: " + res.status);
-        }
-        
-        const data = await res.json();
-        log("✅ Token received");
-        
-        updateStatus("Initializing device...", "loading");
-        log("🔧 Initializing Twilio Device (v2.x)...");
-        
-        // Initialize Twilio Device v2.x
-        device = new Twilio.Device(data.token, {
-          logLevel: 1,
-          codecPreferences: ['opus', 'pcmu'],
-          sounds: {
-            incoming: false,
-            outgoing: false,
-            disconnect: false
-          }
-        });
-
-        // Device registered and ready
-        device.on('registered', function() {
-          log("✅ Device registered");
-          updateStatus("Calling...", "calling");
-          log("📞 Placing call to """ + PHONE_NUMBER + """");
-          document.getElementById("hangupBtn").disabled = false;
-          
-          // Make the call
-          var params = {
-            To: '""" + PHONE_NUMBER + """'
-          };
-          
-          activeCall = device.connect({ params: params });
-          
-          // Setup call event handlers
-          setupCallHandlers(activeCall);
-        });
-
-        // Device error
-        device.on('error', function(error) {
-          updateStatus("Device Error: " + error.message, "error");
-          log("❌ Device Error: " + error.message);
-          console.error('Twilio Device Error:', error);
-          document.getElementById("callBtn").disabled = false;
-          document.getElementById("hangupBtn").disabled = true;
-        });
-
-        // Register the device
-        device.register();
-        
-      } catch (error) {
-        updateStatus("Error: " + error.message, "error");
-        log("❌ Exception: " + error.message);
-        console.error(error);
-        document.getElementById("callBtn").disabled = false;
-      }
-    }
-
-    function setupCallHandlers(call) {
-      call.on('accept', function() {
-        updateStatus("Connected ✓", "connected");
-        log("✅ Call connected!");
-      });
-
-      call.on('disconnect', function() {
-        updateStatus("Disconnected", "idle");
-        log("📴 Call ended");
-        document.getElementById("callBtn").disabled = false;
-        document.getElementById("hangupBtn").disabled = true;
-        activeCall = null;
-      });
-
-      call.on('cancel', function() {
-        updateStatus("Call cancelled", "idle");
-        log("📴 Call cancelled");
-        document.getElementById("callBtn").disabled = false;
-        document.getElementById("hangupBtn").disabled = true;
-        activeCall = null;
-      });
-
-      call.on('error', function(error) {
-        updateStatus("Call Error: " + error.message, "error");
-        log("❌ Call Error: " + error.message);
-        console.error('Call Error:', error);
-        document.getElementById("callBtn").disabled = false;
-        document.getElementById("hangupBtn").disabled = true;
-      });
-
-      call.on('reject', function() {
-        updateStatus("Call rejected", "error");
-        log("❌ Call rejected");
-        document.getElementById("callBtn").disabled = false;
-        document.getElementById("hangupBtn").disabled = true;
-      });
-    }
-
-    function hangup() {
-      log("📴 Hanging up...");
-      
-      if (activeCall) {
-        activeCall.disconnect();
-      }
-      
-      if (device) {
-        device.disconnectAll();
-      }
-      
-      updateStatus("Disconnected", "idle");
-      document.getElementById("callBtn").disabled = false;
-      document.getElementById("hangupBtn").disabled = true;
-      activeCall = null;
-    }
-
-    // Log when page loads
-    window.addEventListener('DOMContentLoaded', function() {
-      if (typeof Twilio !== 'undefined' && typeof Twilio.Device !== 'undefined') {
-        log("✅ Twilio Voice SDK v2.x loaded successfully");
-      } else {
-        log("❌ Twilio SDK failed to load - please check console");
-        updateStatus("Error: Twilio SDK not loaded", "error");
-      }
-    });
-  </script>
-</body>
-</html>
-"""
-    return html
+    return encoded_response(request, CONSOLE_PAGE, REVALIDATE_CACHE)
 
 
+if __name__ == "__main__":
+    serve(app)
@@ -0,0 +1 @@
+"""Metrics and monitoring shared by the agent worker and the web app."""
@@ -0,0 +1,145 @@
+"""Queue-backed JSON logging shared by the agent worker and the web app.
+
+Log calls only put the record on an in-memory queue; a background thread
+formats it as one JSON line and writes it to stdout. The event loop never
+blocks on stdout, and when the queue is full records are dropped and
+counted instead of applying back-pressure.
+
+Every record carries the call and room IDs bound with ``bind_call`` for
+the current task. High-volume records (one per tool call) are logged with
+``extra={"sampled": True}`` and only kept at ``LOG_SAMPLE_RATE``. Tool
+outputs themselves hold patient details and are never logged.
+
+Only the root handler installed here is replaced on setup; handlers added
+by LiveKit (e.g. forwarding job-process logs to the worker) stay in place.
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Optional
+
+from prometheus_client import Counter
+
+call_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("call_id", default=None)
+room_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("room", default=None)
+
+# LogRecord attributes that are not user-supplied extras
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "call_id", "room", "sampled", "color_message"}
+
+LOG_RECORDS_DROPPED = Counter(
+    "hospital_log_records_dropped_total",
+    "Log records dropped because the logging queue was full",
+)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def bind_call(call_id: Optional[str] = None, room: Optional[str] = None):
+    """Tag every record logged from the current task (and tasks it starts)."""
+    if call_id is not None:
+        call_id_var.set(call_id)
+    if room is not None:
+        room_var.set(room)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key in ("call_id", "room"):
+            value = getattr(record, key, None)
+            if value is not None:
+                entry[key] = value
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class ContextFilter(logging.Filter):
+    """Copy call/room IDs onto the record in the logging task, before it's queued."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.call_id = call_id_var.get()
+        record.room = room_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of records marked ``sampled``."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "sampled", False):
+            return random.random() < self.rate
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Never waits on a full queue; counts what it drops."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render args and traceback now, keep extras for the JSON formatter
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+def setup_logging(level: Optional[str] = None):
+    """Route the root logger through the queue. Safe to call more than once."""
+    global _listener
+    if _listener is not None:
+        return
+
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    log_queue: queue.Queue = queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+
+    stream = logging.StreamHandler(sys.stdout)
+    if os.getenv("LOG_FORMAT", "json") == "json":
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(call_id)s] %(message)s"))
+
+    handler = DroppingQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter(float(os.getenv("LOG_SAMPLE_RATE", "0.05"))))
+    handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        # Ours from a parent process; leave everyone else's alone
+        if isinstance(existing, DroppingQueueHandler):
+            root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
@@ -0,0 +1,51 @@
+"""Prometheus registry helpers.
+
+Agent job processes each hold their own metric values. When
+``PROMETHEUS_MULTIPROC_DIR`` is set in the environment (it must be set
+before the process starts, not in ``.env``), every process writes its
+values there and a single scrape aggregates them all.
+"""
+
+import atexit
+import os
+from typing import Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+
+
+def multiprocess_enabled() -> bool:
+    return bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def collect_registry() -> CollectorRegistry:
+    """Registry to scrape: the aggregated multiprocess view when enabled."""
+    if multiprocess_enabled():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def render_latest() -> Tuple[bytes, str]:
+    """Current metrics in Prometheus text format, with its content type."""
+    return generate_latest(collect_registry()), CONTENT_TYPE_LATEST
+
+
+def start_metrics_server():
+    """Serve ``/metrics`` on ``METRICS_PORT`` if it is set."""
+    port = os.getenv("METRICS_PORT")
+    if port:
+        start_http_server(int(port), registry=collect_registry())
+
+
+def register_process_exit():
+    """Drop this process's live gauges from the multiprocess view when it exits."""
+    if multiprocess_enabled():
+        atexit.register(multiprocess.mark_process_dead, os.getpid())
@@ -0,0 +1,137 @@
+"""Latency, error and output-size metrics for agent tools."""
+
+import functools
+import logging
+import time
+from typing import Dict, List, Tuple
+
+from prometheus_client import CollectorRegistry, Counter, Histogram
+
+logger = logging.getLogger("tools")
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+TOOL_LATENCY = Histogram(
+    "hospital_tool_latency_seconds",
+    "Tool execution time",
+    ["tool"],
+    buckets=LATENCY_BUCKETS,
+)
+TOOL_CALLS = Counter(
+    "hospital_tool_calls_total",
+    "Tool invocations",
+    ["tool"],
+)
+TOOL_ERRORS = Counter(
+    "hospital_tool_errors_total",
+    "Tool invocations that raised",
+    ["tool", "error"],
+)
+TOOL_OUTPUT_BYTES = Histogram(
+    "hospital_tool_output_bytes",
+    "UTF-8 size of tool output returned to the LLM",
+    ["tool"],
+    buckets=SIZE_BUCKETS,
+)
+TOOL_OUTPUT_TOKENS = Histogram(
+    "hospital_tool_output_tokens",
+    "Approximate LLM tokens in tool output (4 characters per token)",
+    ["tool"],
+    buckets=tuple(size // 4 for size in SIZE_BUCKETS),
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate; close enough to compare tools with each other."""
+    return (len(text) + 3) // 4
+
+
+def instrumented(func):
+    """Record latency, errors and output size for a tool coroutine.
+
+    Apply below ``@function_tool()`` so the tool schema is still built from
+    the original signature and docstring.
+    """
+    name = func.__name__
+    latency = TOOL_LATENCY.labels(tool=name)
+    calls = TOOL_CALLS.labels(tool=name)
+    output_bytes = TOOL_OUTPUT_BYTES.labels(tool=name)
+    output_tokens = TOOL_OUTPUT_TOKENS.labels(tool=name)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        calls.inc()
+        start = time.perf_counter()
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as e:
+            elapsed = time.perf_counter() - start
+            TOOL_ERRORS.labels(tool=name, error=type(e).__name__).inc()
+            logger.warning("tool %s failed: %s", name, e, extra={"tool": name, "error": type(e).__name__, "ms": round(elapsed * 1000, 1)})
+            raise
+        finally:
+            latency.observe(time.perf_counter() - start)
+
+        if isinstance(result, str):
+            size, tokens = len(result.encode()), estimate_tokens(result)
+            output_bytes.observe(size)
+            output_tokens.observe(tokens)
+            # Outputs carry patient names and phone numbers, so only their size is logged
+            logger.info(
+                "tool %s output", name,
+                extra={"tool": name, "output_bytes": size, "output_tokens": tokens, "sampled": True},
+            )
+        return result
+
+    return wrapper
+
+
+def _quantile(q: float, buckets: List[Tuple[float, float]]) -> float:
+    """Estimate a quantile from cumulative (upper bound, count) buckets."""
+    total = buckets[-1][1]
+    if total == 0:
+        return 0.0
+    rank = q * total
+    lower_bound, lower_count = 0.0, 0.0
+    for upper_bound, count in buckets:
+        if count >= rank:
+            if upper_bound == float("inf"):
+                return lower_bound
+            in_bucket = count - lower_count
+            fraction = (rank - lower_count) / in_bucket if in_bucket else 0.0
+            return lower_bound + (upper_bound - lower_bound) * fraction
+        lower_bound, lower_count = upper_bound, count
+    return lower_bound
+
+
+def latency_summary(registry: CollectorRegistry) -> Dict[str, dict]:
+    """Per-tool call/error counts and p50/p95/p99 latency in milliseconds."""
+    buckets: Dict[str, List[Tuple[float, float]]] = {}
+    calls: Dict[str, float] = {}
+    errors: Dict[str, float] = {}
+
+    for metric in registry.collect():
+        for sample in metric.samples:
+            tool = sample.labels.get("tool")
+            if tool is None:
+                continue
+            if sample.name == "hospital_tool_latency_seconds_bucket":
+                buckets.setdefault(tool, []).append((float(sample.labels["le"]), sample.value))
+            elif sample.name == "hospital_tool_calls_total":
+                calls[tool] = calls.get(tool, 0) + sample.value
+            elif sample.name == "hospital_tool_errors_total":
+                errors[tool] = errors.get(tool, 0) + sample.value
+
+    summary = {}
+    for tool, tool_buckets in sorted(buckets.items()):
+        tool_buckets.sort()
+        summary[tool] = {
+            "calls": int(calls.get(tool, 0)),
+            "errors": int(errors.get(tool, 0)),
+            **{
+                f"p{int(q * 100)}_ms": round(_quantile(q, tool_buckets) * 1000, 2)
+                for q in (0.5, 0.95, 0.99)
+            },
+        }
+    return summary
@@ -0,0 +1,230 @@
+"""Load reporting and admission control for the agent worker.
+
+The default LiveKit load is CPU only. A worker can be saturated well
+before that: too many concurrent sessions, or job processes whose event
+loops fall behind the 20 ms audio frames while running VAD, turn detection
+and noise cancellation. ``WorkerLoad`` reports the worst of three signals,
+each scaled so 1.0 means saturated:
+
+- active sessions / ``AGENT_MAX_SESSIONS``
+- CPU utilisation (cgroup-aware, averaged over the last few seconds)
+- worst event-loop lag across job processes / ``AGENT_MAX_LOOP_LAG_MS``
+
+Job processes measure their own lag with ``LoopLagMonitor`` and publish it
+as a small file in ``AGENT_STATUS_DIR``, tagged with their worker's ID so
+several workers can share the directory. The worker writes its load history
+to the same directory (``worker-<pid>.json``) and to Prometheus.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from livekit.agents.utils.hw import get_cpu_monitor
+from prometheus_client import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+WORKER_LOAD = Gauge(
+    "hospital_worker_load",
+    "Agent worker load by signal (1.0 = saturated)",
+    ["signal"],
+    multiprocess_mode="livemax",
+)
+JOBS_DECLINED = Counter(
+    "hospital_jobs_declined_total",
+    "Job requests declined because the worker was over its load threshold",
+)
+LOOP_LAG = Histogram(
+    "hospital_event_loop_lag_seconds",
+    "How late job-process event loop wakeups run",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.02, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+# Lag files older than this belong to finished or stuck jobs
+LAG_FILE_MAX_AGE = 5.0
+LAG_FILE_PREFIX = "lag-"
+
+
+def worker_id() -> str:
+    """The worker's PID; job processes inherit it through the environment."""
+    return os.environ.setdefault("AGENT_WORKER_ID", str(os.getpid()))
+
+
+def status_dir() -> str:
+    path = os.getenv("AGENT_STATUS_DIR", ".cache/agent-status")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _write_atomic(path: str, text: str):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+class LoopLagMonitor:
+    """Measures how late this process's event loop runs and publishes the worst recent value."""
+
+    def __init__(self, interval: float = 0.1, publish_every: float = 1.0):
+        self.interval = interval
+        self.publish_every = publish_every
+        self.path = os.path.join(status_dir(), f"{LAG_FILE_PREFIX}{worker_id()}-{os.getpid()}")
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    async def _run(self):
+        worst = 0.0
+        published = time.monotonic()
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - start - self.interval)
+            LOOP_LAG.observe(lag)
+            worst = max(worst, lag)
+            if now - published >= self.publish_every:
+                try:
+                    _write_atomic(self.path, f"{worst * 1000:.1f}")
+                except OSError:
+                    logger.warning("could not publish event-loop lag to %s", self.path)
+                worst, published = 0.0, now
+
+
+class WorkerLoad:
+    """``load_fnc`` for ``AgentServer``, plus the matching job admission check."""
+
+    def __init__(
+        self,
+        threshold: Optional[float] = None,
+        max_sessions: Optional[int] = None,
+        max_lag_ms: Optional[float] = None,
+        history_interval: float = 5.0,
+        history_size: int = 720,
+    ):
+        self.threshold = threshold if threshold is not None else float(os.getenv("AGENT_LOAD_THRESHOLD", "0.7"))
+        self.max_sessions = max_sessions if max_sessions is not None else int(os.getenv("AGENT_MAX_SESSIONS", "20"))
+        self.max_lag_ms = max_lag_ms if max_lag_ms is not None else float(os.getenv("AGENT_MAX_LOOP_LAG_MS", "100"))
+        self.worker_id = worker_id()
+        self.directory = status_dir()
+        self.history_interval = history_interval
+        self.history: Deque[dict] = deque(maxlen=history_size)
+        self.signals: Dict[str, float] = {"sessions": 0.0, "cpu": 0.0, "loop_lag": 0.0}
+        self.load = 0.0
+        # Jobs accepted since the last sample, not yet visible in active_jobs
+        self._admitted = 0
+        self._lock = threading.Lock()
+        self._last_history = 0.0
+        self._cpu = 0.0
+        self._cpu_thread: Optional[threading.Thread] = None
+
+    def _sample_cpu(self):
+        monitor = get_cpu_monitor()
+        samples: Deque[float] = deque(maxlen=5)
+        while True:
+            # Blocks for the sampling interval, so it gets its own thread
+            samples.append(monitor.cpu_percent(interval=0.5))
+            self._cpu = sum(samples) / len(samples)
+
+    def _loop_lag_ms(self) -> float:
+        worst, now = 0.0, time.time()
+        prefix = f"{LAG_FILE_PREFIX}{self.worker_id}-"
+        for name in os.listdir(self.directory):
+            if not name.startswith(prefix) or name.endswith(".tmp"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if now - os.path.getmtime(path) > LAG_FILE_MAX_AGE:
+                    continue
+                with open(path) as f:
+                    worst = max(worst, float(f.read() or 0))
+            except (OSError, ValueError):
+                continue
+        return worst
+
+    def __call__(self, server) -> float:
+        """Current load in [0, 1]; called by the worker every 0.5 s off the event loop."""
+        if self._cpu_thread is None:
+            self._cpu_thread = threading.Thread(target=self._sample_cpu, daemon=True, name="worker_load_cpu")
+            self._cpu_thread.start()
+
+        sessions = len(server.active_jobs)
+        lag_ms = self._loop_lag_ms()
+        with self._lock:
+            self._admitted = 0
+            self.signals = {
+                "sessions": sessions / self.max_sessions,
+                "cpu": self._cpu,
+                "loop_lag": lag_ms / self.max_lag_ms,
+            }
+            self.load = min(1.0, max(self.signals.values()))
+        for name, value in self.signals.items():
+            WORKER_LOAD.labels(signal=name).set(value)
+        WORKER_LOAD.labels(signal="combined").set(self.load)
+
+        now = time.time()
+        if now - self._last_history >= self.history_interval:
+            self._last_history = now
+            self.history.append({
+                "ts": round(now, 3),
+                "load": round(self.load, 3),
+                "sessions": sessions,
+                "cpu": round(self._cpu, 3),
+                "loop_lag_ms": round(lag_ms, 1),
+            })
+            self._export_history()
+        return self.load
+
+    def _export_history(self):
+        path = os.path.join(self.directory, f"worker-{self.worker_id}.json")
+        report = {
+            "worker_id": self.worker_id,
+            "threshold": self.threshold,
+            "max_sessions": self.max_sessions,
+            "max_loop_lag_ms": self.max_lag_ms,
+            "history": list(self.history),
+        }
+        try:
+            _write_atomic(path, json.dumps(report))
+        except OSError:
+            logger.warning("could not write load history to %s", path)
+
+    def admit(self) -> bool:
+        """Whether to take one more job, counting ones accepted since the last sample."""
+        with self._lock:
+            sessions = self.signals["sessions"] + (self._admitted + 1) / self.max_sessions
+            projected = max(self.load, sessions)
+            if projected > self.threshold:
+                return False
+            self._admitted += 1
+            return True
+
+    async def on_request(self, request):
+        """``on_request`` handler: decline jobs over the threshold so another worker takes them."""
+        if self.admit():
+            await request.accept()
+            return
+        JOBS_DECLINED.inc()
+        logger.warning(
+            "declining job: load %.2f with %d jobs just accepted (threshold %.2f): %s",
+            self.load, self._admitted, self.threshold, self.signals,
+        )
+        await request.reject(terminate=False)
@@ -2,10 +2,18 @@
 
 from .assistant_prompts import (
     ASSISTANT_INSTRUCTIONS,
-    GREETING_INSTRUCTIONS,
+    CORE_INSTRUCTIONS,
+    PHASE_INSTRUCTIONS,
+    GREETING_TEXT,
+    HOLD_TEXT,
+    build_instructions,
 )
 
 __all__ = [
     "ASSISTANT_INSTRUCTIONS",
-    "GREETING_INSTRUCTIONS",
+    "CORE_INSTRUCTIONS",
+    "PHASE_INSTRUCTIONS",
+    "GREETING_TEXT",
+    "HOLD_TEXT",
+    "build_instructions",
 ]
\ No newline at end of file
@@ -5,6 +5,8 @@ from motor.motor_asyncio import AsyncIOMotorClient
 import os
 from dotenv import load_dotenv
 
+from database.indexes import ensure_indexes
+
 load_dotenv()
 
 
@@ -157,7 +159,8 @@ async def seed_database():
     },
     ]
     await db.doctors.insert_many(doctors)
+    await ensure_indexes(db)
     print("Database seeded successfully.")
-    await client.close()
+    client.close()
 if __name__ == "__main__":
     asyncio.run(seed_database())
\ No newline at end of file
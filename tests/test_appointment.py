@@ -0,0 +1,80 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from livekit.agents import ToolError
+from pymongo.errors import DuplicateKeyError
+
+import tools.appointment as appointment
+from database.mongodb import MongoDB
+
+DOCTOR = {
+    "doctor_id": "doc_001",
+    "name": "Sarah Ahmed",
+    "department": "Cardiology",
+    "consultation_duration": 30,
+    "working_hours": [{"day": "Wednesday", "start_time": "09:00", "end_time": "17:00", "is_available": True}],
+}
+
+
+class FakeAppointments:
+    """Scheduled appointments, optionally enforcing the unique slot index."""
+
+    def __init__(self, unique: bool):
+        self.unique = unique
+        self.rows = []
+
+    def _slot(self, doc):
+        return (doc["doctor_id"], doc["date"], doc["time"], doc["status"])
+
+    async def find_one(self, query, projection=None):
+        return next((row for row in self.rows if self._slot(row) == self._slot(query)), None)
+
+    async def insert_one(self, doc):
+        if self.unique and await self.find_one(doc):
+            raise DuplicateKeyError("E11000 duplicate key")
+        self.rows.append(doc)
+
+
+@pytest.fixture
+def appointments(monkeypatch):
+    collection = FakeAppointments(unique=False)
+
+    async def get_doctor_by_name(name):
+        return DOCTOR
+
+    async def upsert_patient(name, phone):
+        return "patient-1"
+
+    monkeypatch.setattr(appointment.DirectoryCache, "get_doctor_by_name", get_doctor_by_name)
+    monkeypatch.setattr(appointment, "_upsert_patient", upsert_patient)
+    monkeypatch.setattr(appointment, "get_appointments_collection", lambda: collection)
+    return collection
+
+
+def book(time="10:00"):
+    context = SimpleNamespace(session=SimpleNamespace(userdata=None))
+    return asyncio.run(appointment.book_appointment(
+        context, "Ali Raza", "229-213-9528", "Dr. Sarah Ahmed", "2099-01-28", time, "Checkup",
+    ))
+
+
+def test_unconfirmed_index_still_checks_for_an_existing_booking(appointments, monkeypatch):
+    monkeypatch.setattr(MongoDB, "slot_guard", None)
+    assert book().startswith("BOOKING CONFIRMED")
+    assert "already booked" in book()
+    assert len(appointments.rows) == 1
+
+
+def test_missing_index_refuses_bookings(appointments, monkeypatch):
+    monkeypatch.setattr(MongoDB, "slot_guard", False)
+    with pytest.raises(ToolError, match="unavailable"):
+        book()
+    assert appointments.rows == []
+
+
+def test_confirmed_index_relies_on_the_duplicate_key(appointments, monkeypatch):
+    monkeypatch.setattr(MongoDB, "slot_guard", True)
+    appointments.unique = True
+    assert book().startswith("BOOKING CONFIRMED")
+    assert "already booked" in book()
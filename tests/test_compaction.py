@@ -0,0 +1,81 @@
+import json
+
+from livekit.agents.llm import ChatContext, ChatMessage, FunctionCall, FunctionCallOutput
+
+from conversation.compaction import SUMMARY_ID, SUPERSEDED_OUTPUT, ContextCompactor
+
+
+def turn(index: int, text: str, calls=()):
+    items = [ChatMessage(id=f"user-{index}", role="user", content=[text])]
+    for n, (name, arguments, output) in enumerate(calls):
+        call_id = f"call-{index}-{n}"
+        items.append(FunctionCall(call_id=call_id, name=name, arguments=json.dumps(arguments)))
+        items.append(FunctionCallOutput(call_id=call_id, name=name, output=output, is_error=False))
+    items.append(ChatMessage(id=f"assistant-{index}", role="assistant", content=["Okay."]))
+    return items
+
+
+def context(*turns) -> ChatContext:
+    system = ChatMessage(id="system", role="system", content=["You are a receptionist."])
+    return ChatContext(items=[system] + [item for items in turns for item in items])
+
+
+def outputs(chat_ctx: ChatContext) -> dict:
+    return {item.call_id: item.output for item in chat_ctx.items if item.type == "function_call_output"}
+
+
+def schedule(doctor: str, output: str):
+    return ("check_doctor_availability", {"doctor_name": doctor, "date": "2026-10-20", "time": "10:00"}, output)
+
+
+def test_other_arguments_are_not_superseded():
+    compactor = ContextCompactor(keep_turns=6, max_tokens=10_000, protect_turns=0)
+    chat_ctx, _ = compactor.compact(context(
+        turn(0, "Is Dr. Khan free?", [schedule("Dr. Aisha Khan", "AVAILABLE: Khan")]),
+        turn(1, "And Dr. Chen?", [schedule("Dr. Michael Chen", "AVAILABLE: Chen")]),
+    ))
+    assert outputs(chat_ctx) == {"call-0-0": "AVAILABLE: Khan", "call-1-0": "AVAILABLE: Chen"}
+
+
+def test_repeated_call_supersedes_the_older_output():
+    compactor = ContextCompactor(keep_turns=6, max_tokens=10_000, protect_turns=0)
+    chat_ctx, result = compactor.compact(context(
+        turn(0, "Is Dr. Khan free?", [schedule("Dr. Aisha Khan", "AVAILABLE: Khan")]),
+        turn(1, "Check again please", [schedule("Dr. Aisha Khan", "Dr. Aisha Khan is booked")]),
+    ))
+    assert outputs(chat_ctx) == {"call-0-0": SUPERSEDED_OUTPUT, "call-1-0": "Dr. Aisha Khan is booked"}
+    assert result.changed
+
+
+def test_protected_turns_are_never_rewritten():
+    compactor = ContextCompactor(keep_turns=6, max_tokens=10_000, protect_turns=2)
+    chat_ctx, result = compactor.compact(context(
+        turn(0, "Is Dr. Khan free?", [schedule("Dr. Aisha Khan", "AVAILABLE: Khan")]),
+        turn(1, "Check again please", [schedule("Dr. Aisha Khan", "Dr. Aisha Khan is booked")]),
+    ))
+    assert outputs(chat_ctx) == {"call-0-0": "AVAILABLE: Khan", "call-1-0": "Dr. Aisha Khan is booked"}
+    assert not result.changed
+
+
+def test_old_turns_fold_into_the_summary():
+    compactor = ContextCompactor(keep_turns=1, max_tokens=10_000)
+    booking = ("book_appointment", {
+        "patient_name": "Ali Raza", "patient_phone": "+12292139528",
+        "doctor_name": "Dr. Aisha Khan", "date": "2026-10-20", "time": "10:00",
+    }, "BOOKING CONFIRMED\nID: abcd1234\n")
+    chat_ctx, result = compactor.compact(context(
+        turn(0, "Book me with Dr. Khan", [booking]),
+        turn(1, "Thanks, bye"),
+    ))
+    assert result.folded_turns == 1
+    summary = next(item for item in chat_ctx.items if item.id == SUMMARY_ID)
+    text = summary.text_content
+    assert "Ali Raza" in text and "booked Dr. Aisha Khan on 2026-10-20 at 10:00 (ID abcd1234)" in text
+    assert [item.id for item in chat_ctx.items if item.type == "message"] == ["system", SUMMARY_ID, "user-1", "assistant-1"]
+
+
+def test_token_ceiling_folds_more_but_keeps_the_last_turn():
+    compactor = ContextCompactor(keep_turns=6, max_tokens=1)
+    chat_ctx, result = compactor.compact(context(turn(0, "hello " * 50), turn(1, "hi " * 50)))
+    assert result.folded_turns == 1
+    assert "user-1" in {item.id for item in chat_ctx.items}
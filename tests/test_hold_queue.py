@@ -0,0 +1,96 @@
+import json
+import time
+
+import pytest
+
+from web import hold_queue
+from web.hold_queue import CapacitySignal, HoldQueue
+
+
+@pytest.fixture
+def capacity(tmp_path, monkeypatch):
+    path = tmp_path / "capacity"
+    path.write_text("0")
+    monkeypatch.setenv("AGENT_CAPACITY_FILE", str(path))
+    monkeypatch.delenv("HOLD_MUSIC_URL", raising=False)
+    monkeypatch.delenv("HOLD_QUEUE_ENABLED", raising=False)
+
+    def set_free(free: int):
+        path.write_text(str(free))
+
+    return set_free
+
+
+@pytest.fixture
+def queue(capacity):
+    return HoldQueue(CapacitySignal(cache_seconds=0))
+
+
+def test_dials_directly_with_room(queue, capacity):
+    capacity(2)
+    assert not queue.should_hold()
+
+
+def test_holds_when_full_and_leaves_in_order(queue, capacity):
+    assert queue.should_hold()
+    queue.enqueued()
+    assert queue.wait_response("1", "0", "2") == queue.announce_twiml
+    assert queue.wait_response("2", "5", "2") == queue.wait_twiml
+    assert queue.wait_response("1", "5", "2") == queue.front_twiml
+
+    capacity(1)
+    # Callers behind the front one keep waiting even with room
+    assert queue.wait_response("2", "8", "2") == queue.wait_twiml
+    assert queue.wait_response("1", "8", "2") == queue.leave_twiml
+    # That dial uses up the free session until the next status write
+    assert queue.wait_response("1", "9", "1") == queue.front_twiml
+
+
+def test_new_calls_queue_behind_waiting_callers(queue, capacity):
+    queue.enqueued()
+    capacity(5)
+    assert queue.should_hold()
+    queue.left("leave", "12")
+    assert not queue.should_hold()
+
+
+def test_lost_done_callback_does_not_hold_forever(queue, capacity, monkeypatch):
+    queue.enqueued()
+    queue.wait_response("1", "3", "1")
+    capacity(5)
+    assert queue.should_hold()
+    # /hold/done never arrives; the reported size expires
+    now = time.time() + hold_queue.STATUS_MAX_AGE + 1
+    monkeypatch.setattr(hold_queue.time, "time", lambda: now)
+    assert not queue.should_hold()
+
+
+def test_front_caller_polls_on_a_short_pause(capacity, monkeypatch):
+    monkeypatch.setenv("HOLD_MUSIC_URL", "https://example.com/hold.mp3")
+    monkeypatch.setenv("HOLD_POLL_SECONDS", "2")
+    queue = HoldQueue(CapacitySignal(cache_seconds=0))
+    assert b"hold.mp3" in queue.wait_twiml
+    assert b"hold.mp3" not in queue.front_twiml
+    assert b'<Pause length="2"' in queue.front_twiml
+
+
+def test_no_capacity_signal_never_holds(tmp_path, monkeypatch):
+    monkeypatch.delenv("AGENT_CAPACITY_FILE", raising=False)
+    monkeypatch.setenv("AGENT_STATUS_DIR", str(tmp_path / "missing"))
+    queue = HoldQueue(CapacitySignal(cache_seconds=0))
+    assert queue.capacity.free() is None
+    assert not queue.should_hold()
+
+
+def test_disabled_queue_never_holds(capacity, monkeypatch):
+    monkeypatch.setenv("HOLD_QUEUE_ENABLED", "0")
+    assert not HoldQueue(CapacitySignal(cache_seconds=0)).should_hold()
+
+
+def test_worker_status_files(tmp_path, monkeypatch):
+    monkeypatch.delenv("AGENT_CAPACITY_FILE", raising=False)
+    monkeypatch.setenv("AGENT_STATUS_DIR", str(tmp_path))
+    status = {"threshold": 0.7, "max_sessions": 10, "history": [{"load": 0.5, "sessions": 5}]}
+    (tmp_path / "worker-1.json").write_text(json.dumps(status))
+    (tmp_path / "worker-2.json").write_text(json.dumps({**status, "history": [{"load": 0.9, "sessions": 9}]}))
+    assert CapacitySignal(cache_seconds=0).free() == 2
@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+from pymongo.errors import OperationFailure
+
+from database.indexes import INDEX_MISSING, INDEXES, MissingIndexError, check_required_indexes, ensure_indexes
+from database import indexes
+from database.mongodb import MongoDB
+
+
+class FakeCollection:
+    def __init__(self, error=None):
+        self.error = error
+
+    async def create_indexes(self, models):
+        if self.error:
+            raise self.error
+        return [model.document["name"] for model in models]
+
+
+class FakeDB(dict):
+    def __missing__(self, name):
+        return FakeCollection()
+
+
+def missing(collection, index):
+    return INDEX_MISSING.labels(collection=collection, index=index)._value.get()
+
+
+def test_all_indexes_created():
+    asyncio.run(ensure_indexes(FakeDB()))
+    assert all(missing(name, model.document["name"]) == 0 for name, models in INDEXES.items() for model in models)
+
+
+def test_optional_index_failure_is_only_reported():
+    db = FakeDB(patients=FakeCollection(OperationFailure("E11000 duplicate key")))
+    asyncio.run(ensure_indexes(db))
+    assert missing("patients", "phone_unique") == 1
+
+
+def test_slot_index_failure_fails_startup():
+    db = FakeDB(appointments=FakeCollection(OperationFailure("E11000 duplicate key")))
+    with pytest.raises(MissingIndexError, match="doctor_slot_scheduled_unique"):
+        asyncio.run(ensure_indexes(db))
+    assert missing("appointments", "doctor_slot_scheduled_unique") == 1
+
+
+def test_missing_slot_index_is_found_when_creation_is_disabled():
+    class Existing(FakeCollection):
+        async def index_information(self):
+            return {"_id_": {}, "appointment_id_unique": {}}
+
+    with pytest.raises(MissingIndexError, match="doctor_slot_scheduled_unique"):
+        asyncio.run(check_required_indexes(FakeDB(appointments=Existing())))
+    assert missing("appointments", "doctor_slot_scheduled_unique") == 1
+
+
+class FakeClient:
+    class admin:
+        @staticmethod
+        async def command(name):
+            return {"ok": 1}
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def mongodb(monkeypatch):
+    db = FakeDB(appointments=FakeCollection(OperationFailure("E11000 duplicate key")))
+    db.name = "test"
+    monkeypatch.setenv("MONGODB_ENSURE_INDEXES", "1")
+    monkeypatch.setattr(MongoDB, "_client", FakeClient())
+    monkeypatch.setattr(MongoDB, "_db", db)
+    monkeypatch.setattr(MongoDB, "_connected", False)
+    monkeypatch.setattr(MongoDB, "slot_guard", None)
+    return db
+
+
+def test_connect_keeps_checking_until_the_slot_index_exists(mongodb):
+    for _ in range(2):
+        with pytest.raises(MissingIndexError):
+            asyncio.run(MongoDB.connect())
+        assert not MongoDB._connected
+        assert MongoDB.slot_guard is False
+
+    # Duplicates cleaned up: the next connect builds the index
+    mongodb["appointments"] = FakeCollection()
+
+    async def connect():
+        await MongoDB.connect()
+        MongoDB._report_task.cancel()
+
+    asyncio.run(connect())
+    assert MongoDB._connected
+    assert MongoDB.slot_guard is True
+
+
+def test_cli_creates_indexes_and_explains_once(monkeypatch, capsys):
+    calls = {"create_indexes": 0, "explain": 0}
+
+    class Counting(FakeCollection):
+        async def create_indexes(self, models):
+            calls["create_indexes"] += 1
+            return await super().create_indexes(models)
+
+    class CountingDB(FakeDB):
+        name = "test"
+
+        def __missing__(self, name):
+            return Counting()
+
+        async def command(self, command):
+            calls["explain"] += 1
+            return {"queryPlanner": {"winningPlan": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}}}}
+
+    monkeypatch.setenv("MONGODB_ENSURE_INDEXES", "1")
+    monkeypatch.setattr(MongoDB, "init", classmethod(lambda cls: None))
+    monkeypatch.setattr(MongoDB, "_client", FakeClient())
+    monkeypatch.setattr(MongoDB, "_db", CountingDB())
+    monkeypatch.setattr(MongoDB, "_connected", False)
+
+    asyncio.run(indexes.main())
+
+    assert calls == {"create_indexes": len(INDEXES), "explain": len(indexes.TOOL_QUERIES)}
+    assert "COLLSCAN" not in capsys.readouterr().out
+    assert MongoDB._client is None
@@ -0,0 +1,24 @@
+import pytest
+
+from conversation.intent_router import IntentRouter
+
+
+@pytest.mark.parametrize("transcript, intent", [
+    ("What are your visiting hours?", "visiting_hours"),
+    ("Where is the emergency room?", "emergency_info"),
+    ("What's the ambulance number?", "ambulance_service"),
+])
+def test_faq_questions_are_answered(transcript, intent):
+    match = IntentRouter(threshold=0.85).classify(transcript)
+    assert match is not None and match.intent == intent
+
+
+@pytest.mark.parametrize("transcript", [
+    "My husband collapsed, send an ambulance",
+    "I need an ambulance",
+    "Please call an ambulance",
+    "What's the ambulance number, my father passed out",
+    "I'd like to book an appointment",
+])
+def test_requests_and_emergencies_go_to_the_llm(transcript):
+    assert IntentRouter(threshold=0.85).classify(transcript) is None
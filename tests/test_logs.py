@@ -0,0 +1,49 @@
+import asyncio
+import logging
+
+from observability import logs
+from observability.tool_metrics import instrumented
+
+
+class Capture(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_setup_keeps_foreign_handlers(monkeypatch):
+    root = logging.getLogger()
+    foreign = Capture()
+    stale = logs.DroppingQueueHandler(None)
+    monkeypatch.setattr(root, "handlers", [foreign, stale])
+    monkeypatch.setattr(root, "level", root.level)
+    monkeypatch.setattr(logs, "_listener", None)
+    monkeypatch.setattr(logs.atexit, "register", lambda func: None)
+    try:
+        logs.setup_logging("INFO")
+        assert foreign in root.handlers
+        assert stale not in root.handlers
+        assert sum(isinstance(handler, logs.DroppingQueueHandler) for handler in root.handlers) == 1
+    finally:
+        if logs._listener is not None:
+            logs._listener.stop()
+
+
+def test_tool_outputs_are_not_logged(monkeypatch):
+    capture = Capture()
+    tools_logger = logging.getLogger("tools")
+    monkeypatch.setattr(tools_logger, "handlers", [capture])
+    monkeypatch.setattr(tools_logger, "level", logging.INFO)
+
+    @instrumented
+    async def check_patient_appointments(context) -> str:
+        return "Appointments for +12292139528: Ali Raza"
+
+    asyncio.run(check_patient_appointments(None))
+    [record] = capture.records
+    rendered = logs.JsonFormatter().format(record)
+    assert "Ali Raza" not in rendered and "+12292139528" not in rendered
+    assert record.output_bytes > 0
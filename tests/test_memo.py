@@ -0,0 +1,76 @@
+import asyncio
+from types import SimpleNamespace
+
+from conversation.memo import ToolMemo, Uncached, invalidates, memoized
+
+
+def make_context(caller_phone=None):
+    return SimpleNamespace(userdata=SimpleNamespace(memo=ToolMemo(ttl_seconds=60), caller_phone=caller_phone))
+
+
+calls = []
+
+
+@memoized("appointments")
+async def lookup(context, patient_phone: str = "", page: int = 1) -> str:
+    calls.append(patient_phone)
+    if not patient_phone and context.userdata.caller_phone is None:
+        return Uncached("The caller's number is not known.")
+    if patient_phone and len(patient_phone) < 8:
+        return Uncached(f"{patient_phone} is incomplete.")
+    return f"appointments for {patient_phone or context.userdata.caller_phone}"
+
+
+@invalidates("appointments")
+async def cancel(context) -> str:
+    return "CANCELLED"
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_same_normalized_phone_is_served_from_the_memo():
+    calls.clear()
+    context = make_context()
+    first = run(lookup(context, "229-213-9528"))
+    assert run(lookup(context, "+1 (229) 213 9528")) == first
+    assert len(calls) == 1
+
+
+def test_empty_phone_shares_the_callers_entry():
+    calls.clear()
+    context = make_context(caller_phone="+12292139528")
+    run(lookup(context, ""))
+    run(lookup(context, "229 213 9528"))
+    assert calls == [""]
+
+
+def test_failure_replies_are_not_cached():
+    calls.clear()
+    context = make_context()
+    assert run(lookup(context, "")) == "The caller's number is not known."
+    assert run(lookup(context, "555")) == "555 is incomplete."
+    assert run(lookup(context, "555")) == "555 is incomplete."
+    # The caller then gives a number; nothing stale is replayed
+    context.userdata.caller_phone = "+12292139528"
+    assert run(lookup(context, "")) == "appointments for +12292139528"
+    assert calls == ["", "555", "555", ""]
+
+
+def test_write_tools_invalidate_their_topics():
+    calls.clear()
+    context = make_context()
+    run(lookup(context, "2292139528"))
+    run(cancel(context))
+    run(lookup(context, "2292139528"))
+    assert len(calls) == 2
+    assert context.userdata.memo.stats()["hits"] == {}
+
+
+def test_without_userdata_the_tool_always_runs():
+    calls.clear()
+    context = SimpleNamespace()
+    run(lookup(context, "2292139528"))
+    run(lookup(context, "2292139528"))
+    assert len(calls) == 2
@@ -0,0 +1,91 @@
+import pytest
+
+from database.directory import DirectoryCache
+from database.name_resolver import NameResolver, phonetic_key, strip_honorifics
+
+DOCTORS = ["Dr. Sarah Ahmed", "Dr. Michael Chen", "Dr. Emily Rodriguez", "Dr. James Wilson", "Dr. Aisha Khan"]
+
+
+@pytest.fixture
+def doctors(monkeypatch):
+    resolver = NameResolver()
+    for i, name in enumerate(DOCTORS):
+        resolver.add(i, name, {"name": name})
+    monkeypatch.setattr(DirectoryCache, "_doctor_resolver", resolver)
+    monkeypatch.delenv("NAME_RESOLVER_MIN_CONFIDENCE", raising=False)
+    monkeypatch.delenv("NAME_RESOLVER_MIN_MARGIN", raising=False)
+    return resolver
+
+
+def test_strip_honorifics():
+    assert strip_honorifics("Dr. Aisha Khan") == ["aisha", "khan"]
+    assert strip_honorifics("doctor   WILSON") == ["wilson"]
+
+
+def test_sound_alike_spellings_share_a_key():
+    assert phonetic_key("Khan") == phonetic_key("Kahn")
+    assert phonetic_key("Aisha") == phonetic_key("Aysha")
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("Dr Aisha Kahn", "Dr. Aisha Khan"),
+    ("Aysha Khan", "Dr. Aisha Khan"),
+    ("Sara Ahmad", "Dr. Sarah Ahmed"),
+    ("Micheal Chen", "Dr. Michael Chen"),
+    ("James Willson", "Dr. James Wilson"),
+    ("Dr. Chen", "Dr. Michael Chen"),
+    ("doctor wilson", "Dr. James Wilson"),
+])
+def test_noisy_names_resolve(doctors, query, expected):
+    match = DirectoryCache._resolve(doctors, query)
+    assert match is not None and match.name == expected
+
+
+@pytest.mark.parametrize("query", [
+    "Dr. Ahmed Ali",
+    "Dr. Sarah Khan",
+    "Dr. Michael Jordan",
+    "Dr. Smith",
+])
+def test_unknown_names_do_not_resolve(doctors, query):
+    assert DirectoryCache._resolve(doctors, query) is None
+
+
+def test_runner_up_is_reported(doctors):
+    match = doctors.resolve("Dr. Sarah Khan")
+    assert match.name == "Dr. Sarah Ahmed"
+    assert match.confidence - match.runner_up < DirectoryCache.min_margin()
+    assert not match.is_clear(DirectoryCache.min_confidence(), DirectoryCache.min_margin())
+
+
+def test_suggestions_for_ambiguous_names(doctors):
+    assert DirectoryCache.suggest_doctors("Dr. Sarah Khan") == ["Dr. Sarah Ahmed", "Dr. Aisha Khan"]
+    assert DirectoryCache.suggest_doctors("Dr. Michael Jordan") == ["Dr. Michael Chen"]
+    assert DirectoryCache.suggest_doctors("Dr. Smith") == []
+
+
+def test_identical_names_are_ambiguous():
+    resolver = NameResolver()
+    resolver.add("a", "Dr. Omar Khan")
+    resolver.add("b", "Dr. Omar Khan")
+    assert DirectoryCache._resolve(resolver, "Omar Kahn") is None
+
+
+def test_add_and_remove_update_the_index():
+    resolver = NameResolver()
+    resolver.add(1, "Dr. Aisha Khan")
+    resolver.add(1, "Dr. Aisha Malik")
+    assert resolver.resolve("Malik").entry_id == 1
+    assert resolver.resolve("Khan") is None
+    resolver.remove(1)
+    assert len(resolver) == 0
+    assert resolver.resolve("Malik") is None
+
+
+def test_sync_touches_only_changes():
+    resolver = NameResolver()
+    resolver.sync({1: ("Dr. Aisha Khan", "a"), 2: ("Dr. James Wilson", "b")})
+    resolver.sync({2: ("Dr. James Wilson", "c"), 3: ("Dr. Emily Rodriguez", "d")})
+    assert len(resolver) == 2
+    assert resolver.resolve("James Wilson").payload == "c"
+    assert resolver.resolve("Emily Rodriguez").entry_id == 3
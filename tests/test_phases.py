@@ -0,0 +1,77 @@
+import pytest
+
+from conversation.phases import PHASE_TOOLS, PhaseTracker, detect_phase
+from tools import book_appointment, cancel_appointment, check_patient_appointments, get_schedule_range
+
+
+@pytest.mark.parametrize("transcript, phase", [
+    ("My husband collapsed, send an ambulance", "emergency"),
+    ("I have chest pain and trouble breathing", "emergency"),
+    ("I was in an accident, my leg is bleeding badly", "emergency"),
+    ("I'd like to book an appointment", "booking"),
+    ("I need to cancel my appointment", "booking"),
+    ("Is Dr. Chen available next week?", "scheduling"),
+    ("Can I see a doctor tomorrow?", "scheduling"),
+    ("Which department treats back pain?", "triage"),
+    ("Okay, thank you", None),
+])
+def test_detect_phase(transcript, phase):
+    assert detect_phase(transcript) == phase
+
+
+@pytest.mark.parametrize("transcript", [
+    "I had an accident last month and need a follow up",
+    "My father had a stroke two years ago, which doctor should he see?",
+])
+def test_past_events_are_not_emergencies(transcript):
+    assert detect_phase(transcript) != "emergency"
+
+
+def test_weak_cues_do_not_leave_booking():
+    tracker = PhaseTracker()
+    assert tracker.update("I want to cancel an appointment")
+    assert tracker.phase == "booking"
+    assert not tracker.update("It's the one on Monday with Dr. Khan")
+    assert not tracker.update("Tomorrow at 10 works")
+    assert tracker.phase == "booking"
+    assert cancel_appointment in tracker.tools
+
+
+def test_strong_cue_leaves_booking_but_keeps_write_tools():
+    tracker = PhaseTracker()
+    tracker.update("I'd like to book with Dr. Khan")
+    assert tracker.update("Actually, what is her schedule next week?")
+    assert tracker.phase == "scheduling"
+    tools = tracker.tools
+    assert get_schedule_range in tools
+    for tool in (book_appointment, check_patient_appointments, cancel_appointment):
+        assert tools.count(tool) == 1
+    assert "BOOK OR CANCEL" in tracker.instructions
+    assert "DOCTOR AVAILABILITY" in tracker.instructions
+
+
+def test_read_only_phases_before_booking():
+    tracker = PhaseTracker()
+    tracker.update("Is Dr. Chen available on Monday?")
+    assert tracker.tools == PHASE_TOOLS["scheduling"]
+    assert cancel_appointment not in tracker.tools
+    assert "BOOK OR CANCEL" not in tracker.instructions
+
+
+def test_emergency_drops_booking_and_restores_it_after():
+    tracker = PhaseTracker()
+    tracker.update("Book me with Dr. Khan")
+    assert tracker.update("Wait, my son is not breathing")
+    assert tracker.tools == PHASE_TOOLS["emergency"]
+    assert "BOOK OR CANCEL" not in tracker.instructions
+    tracker.update("He's fine now. Which department is Dr. Khan in?")
+    assert tracker.phase == "triage"
+    assert cancel_appointment in tracker.tools
+
+
+def test_stats_count_turns_per_phase():
+    tracker = PhaseTracker()
+    tracker.update("hello")
+    tracker.update("I'd like to book an appointment")
+    tracker.update("Monday please")
+    assert tracker.stats() == {"phase": "booking", "transitions": 1, "turns": {"triage": 1, "booking": 2}}
@@ -0,0 +1,53 @@
+import pytest
+
+from database.phone import normalize_phone
+
+
+@pytest.fixture(autouse=True)
+def north_american_default(monkeypatch):
+    monkeypatch.delenv("PHONE_DEFAULT_COUNTRY_CODE", raising=False)
+
+
+@pytest.mark.parametrize("raw", [
+    "229-213-9528",
+    "(229) 213-9528",
+    "229 213 9528",
+    "1 229 213 9528",
+    "+1 229 213 9528",
+    "001 229 213 9528",
+])
+def test_north_american_formats(raw):
+    assert normalize_phone(raw) == "+12292139528"
+
+
+@pytest.mark.parametrize("raw", [
+    "555-1234",
+    "213 9528",
+    "(229) 213-95",
+    "229 213 95281",
+    "+1 229 213 952",
+    "+1 129 213 9528",
+    "+1 229 113 9528",
+    "",
+    "not a number",
+])
+def test_incomplete_or_impossible_numbers(raw):
+    assert normalize_phone(raw) is None
+
+
+def test_national_format_uses_the_country_code():
+    assert normalize_phone("0300 1234567", country_code="92") == "+923001234567"
+    assert normalize_phone("0300 12345", country_code="92") is None
+
+
+def test_default_country_from_the_environment(monkeypatch):
+    monkeypatch.setenv("PHONE_DEFAULT_COUNTRY_CODE", "+44")
+    assert normalize_phone("020 7946 0958") == "+442079460958"
+
+
+def test_international_numbers():
+    assert normalize_phone("0044 20 7946 0958") == "+442079460958"
+    assert normalize_phone("+971 50 123 4567") == "+971501234567"
+    assert normalize_phone("+971 50 123") is None
+    # No length table for this code; only the E.164 bounds apply
+    assert normalize_phone("+49 30 901820") == "+4930901820"
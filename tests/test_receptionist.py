@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+from livekit.agents import StopResponse
+from livekit.agents.llm import ChatMessage
+from livekit.agents.voice.generation import INSTRUCTIONS_MESSAGE_ID, update_instructions
+
+from conversation.phases import PHASE_TOOLS
+from conversation.receptionist import HospitalReceptionist
+from conversation.state import CallState
+
+
+def turn(agent, text):
+    """Run one user turn the way AgentActivity does and return its turn_ctx."""
+    turn_ctx = agent.chat_ctx.copy()
+    update_instructions(turn_ctx, instructions=agent.instructions, add_if_missing=True)
+    message = ChatMessage(role="user", content=[text])
+    asyncio.run(agent.on_user_turn_completed(turn_ctx, new_message=message))
+    return turn_ctx
+
+
+def prompt(turn_ctx):
+    return turn_ctx.get_by_id(INSTRUCTIONS_MESSAGE_ID).text_content
+
+
+def test_phase_change_updates_this_turns_prompt_with_its_tools():
+    agent = HospitalReceptionist(utterances=None, state=CallState())
+    triage_prompt = agent.instructions
+    
+    turn_ctx = turn(agent, "I have chest pain and trouble breathing")
+    
+    assert agent.phases.phase == "emergency"
+    assert set(agent.tools) == set(PHASE_TOOLS["emergency"])
+    # The reply to this turn must not pair emergency tools with the triage rules
+    assert prompt(turn_ctx) == agent.instructions != triage_prompt
+
+
+def test_unchanged_phase_leaves_the_prompt_alone():
+    agent = HospitalReceptionist(utterances=None, state=CallState())
+    before = agent.instructions
+    
+    turn_ctx = turn(agent, "Okay, thank you")
+    
+    assert prompt(turn_ctx) == before
+
+
+class FakeSession:
+    def __init__(self):
+        self.history = []
+
+    def _conversation_item_added(self, item):
+        self.history.append(item)
+
+
+class FakeUtterances:
+    def __init__(self):
+        self.said = []
+
+    def say(self, session, text):
+        self.said.append(text)
+
+
+def test_routed_answer_keeps_the_callers_question(monkeypatch):
+    session = FakeSession()
+    monkeypatch.setattr(HospitalReceptionist, "session", property(lambda self: session))
+    utterances = FakeUtterances()
+    agent = HospitalReceptionist(utterances=utterances, state=CallState())
+    
+    with pytest.raises(StopResponse):
+        turn(agent, "What are the visiting hours?")
+    
+    assert len(utterances.said) == 1
+    question = agent.chat_ctx.items[-1]
+    assert question.role == "user" and question.text_content == "What are the visiting hours?"
+    assert session.history == [question]
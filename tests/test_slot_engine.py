@@ -0,0 +1,50 @@
+from datetime import datetime
+
+from tools.doctor_schedule import closed_reason, free_summary
+from tools.slot_engine import build_day_slots
+
+# 09:00-17:10 in 30-minute slots: 16 slots, the last ending at 17:00
+DOCTOR = {
+    "doctor_id": "doc_001",
+    "name": "Sarah Ahmed",
+    "consultation_duration": 30,
+    "working_hours": [{"day": "Wednesday", "start_time": "09:00", "end_time": "17:10", "is_available": True}],
+}
+DATE = "2026-01-28"  # a Wednesday
+
+
+def slots_at(now: str, booked=()):
+    return build_day_slots(DOCTOR, DATE, {("doc_001", DATE): set(booked)}, datetime.strptime(now, "%Y-%m-%d %H:%M"))
+
+
+def test_reports_real_end_of_hours():
+    slots = slots_at("2026-01-27 12:00")
+    assert slots.end == 17 * 60 + 10
+    assert slots.count == 16
+
+
+def test_future_day_counts_every_slot():
+    slots = slots_at("2026-01-27 12:00", booked={"09:00", "09:30"})
+    assert closed_reason(slots) is None
+    assert free_summary(slots) == "14 of 16 slots free"
+
+
+def test_elapsed_part_of_today_is_not_counted_as_booked():
+    slots = slots_at("2026-01-28 12:10", booked={"14:00"})
+    assert slots.elapsed == 7
+    assert closed_reason(slots) is None
+    assert free_summary(slots) == "8 of 9 remaining slots free"
+    assert next(slots.free_times()) == "12:30"
+
+
+def test_past_day_is_past_not_fully_booked():
+    slots = slots_at("2026-01-29 08:00")
+    assert slots.free == 0
+    assert closed_reason(slots) == "past"
+
+
+def test_fully_booked_day_is_not_reported_closed():
+    times = {f"{9 + i // 2:02d}:{30 * (i % 2):02d}" for i in range(16)}
+    slots = slots_at("2026-01-27 12:00", booked=times)
+    assert slots.free == 0
+    assert closed_reason(slots) is None
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from conversation import state as state_module
+from conversation.state import CallState
+
+APPOINTMENT = {"date": "2026-10-20", "time": "10:00", "doctor_name": "Aisha Khan", "appointment_id": "abcd1234-0000"}
+
+
+@pytest.fixture
+def records(monkeypatch):
+    """Patient record and appointments the prefetch will see."""
+    data = {"patient": {"patient_id": "p1", "name": "Ali Raza"}, "appointments": [APPOINTMENT]}
+
+    class Patients:
+        async def find_one(self, query, projection):
+            return data["patient"]
+
+    async def fetch_patient_appointments(phone, page=1):
+        return list(data["appointments"]), False
+
+    monkeypatch.setattr(state_module, "get_patients_collection", lambda: Patients())
+    monkeypatch.setattr("tools.appointment.fetch_patient_appointments", fetch_patient_appointments)
+    return data
+
+
+def prefetched(records) -> CallState:
+    state = CallState()
+
+    async def run():
+        await state.start_prefetch("+1 229 213 9528")
+
+    asyncio.run(run())
+    return state
+
+
+def test_details_stay_out_of_the_prompt_until_confirmed(records):
+    state = prefetched(records)
+    note = state.prompt_note()
+    assert "+12292139528" in note
+    assert "verify_caller_identity" in note
+    assert "Ali Raza" not in note and "2026-10-20" not in note
+
+    assert not state.confirm_identity("Ali")
+    assert not state.confirm_identity("Sara Raza")
+    assert state.confirm_identity("Dr. Aly Raza")
+    note = state.prompt_note()
+    assert "Ali Raza" in note and "2026-10-20 at 10:00" in note
+
+
+def test_unknown_number_gets_no_identity_step():
+    state = CallState(caller_phone="+12292139528")
+    assert "verify_caller_identity" not in state.prompt_note()
+    assert not state.confirm_identity("Ali Raza")
+    assert CallState().prompt_note() == ""
+
+
+def test_booking_refreshes_appointments_and_instructions(records):
+    state = prefetched(records)
+    state.confirm_identity("Ali Raza")
+    prompts = []
+
+    async def on_change():
+        prompts.append(state.prompt_note())
+
+    state.on_change = on_change
+    booked = {**APPOINTMENT, "date": "2026-10-22", "appointment_id": "ef567890-0000"}
+    records["appointments"].append(booked)
+
+    async def run():
+        state.appointments_changed("+12292139528")
+        assert state.upcoming is None
+        return await state.prefetched_appointments("+12292139528")
+
+    appointments, _ = asyncio.run(run())
+    assert appointments == [APPOINTMENT, booked]
+    assert len(prompts) == 1 and "2026-10-22" in prompts[0]
+
+
+def test_other_numbers_do_not_touch_the_caller(records):
+    state = prefetched(records)
+    state.appointments_changed("+12292130000")
+    assert state.upcoming == [APPOINTMENT]
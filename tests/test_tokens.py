@@ -0,0 +1,32 @@
+import jwt
+import pytest
+
+from web.tokens import TokenCache
+
+
+def cache(**kwargs) -> TokenCache:
+    return TokenCache("AC" + "0" * 32, "SK" + "0" * 32, "s" * 32, "AP" + "0" * 32, **kwargs)
+
+
+def test_only_configured_identities_are_signed(monkeypatch):
+    monkeypatch.setenv("TWILIO_TOKEN_IDENTITIES", "browser-user, qa-1")
+    tokens = cache()
+    assert tokens.identities == ("browser-user", "qa-1")
+    assert tokens.allows("qa-1")
+    assert not tokens.allows("attacker")
+    with pytest.raises(KeyError):
+        tokens.get("attacker")
+
+
+def test_tokens_are_reused_until_near_expiry():
+    tokens = cache(ttl_seconds=3600, refresh_seconds=300, identities=["browser-user"])
+    first = tokens.get("browser-user")
+    assert tokens.get("browser-user") == first
+    assert (tokens.hits, tokens.misses) == (1, 1)
+    claims = jwt.decode(first, options={"verify_signature": False})
+    assert claims["grants"]["identity"] == "browser-user"
+
+    tokens = cache(ttl_seconds=300, refresh_seconds=300, identities=["browser-user"])
+    tokens.get("browser-user")
+    tokens.get("browser-user")
+    assert tokens.misses == 2
@@ -0,0 +1,74 @@
+import asyncio
+from types import SimpleNamespace
+
+from livekit import rtc
+
+from conversation.utterance_cache import UtteranceCache
+
+
+class FakeTTS:
+    sample_rate = 16000
+    num_channels = 1
+
+    def __init__(self):
+        self.synthesized = []
+
+    def synthesize(self, text):
+        self.synthesized.append(text)
+        frame = rtc.AudioFrame(data=b"\x01\x00" * 320, sample_rate=16000, num_channels=1, samples_per_channel=320)
+
+        class Stream:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            def __aiter__(self):
+                async def gen():
+                    for _ in range(5):
+                        await asyncio.sleep(0)
+                        yield SimpleNamespace(frame=frame)
+                return gen()
+
+        return Stream()
+
+
+class FakeSession:
+    def __init__(self):
+        self.said = []
+
+    def say(self, text, audio=None, **kwargs):
+        self.said.append((text, audio))
+
+
+def test_cold_cache_speaks_live_and_fills_the_cache(tmp_path):
+    tts = FakeTTS()
+    cache = UtteranceCache(tts, voice="v", model="m", cache_dir=str(tmp_path))
+    session = FakeSession()
+
+    async def run():
+        cache.say(session, "Hello")
+        # Live TTS: no cached audio handed to the session
+        assert session.said == [("Hello", None)]
+        await asyncio.gather(*cache._pending.values())
+        cache.say(session, "Hello")
+        frames = [frame async for frame in session.said[1][1]]
+        return frames
+
+    frames = asyncio.run(run())
+    assert cache.path_for("Hello").exists()
+    assert tts.synthesized == ["Hello"]
+    assert len(frames) == 5
+
+
+def test_concurrent_misses_synthesize_once(tmp_path):
+    tts = FakeTTS()
+    cache = UtteranceCache(tts, voice="v", model="m", cache_dir=str(tmp_path))
+
+    async def run():
+        cache.say(FakeSession(), "Please hold")
+        await cache.prewarm(["Please hold", "Please hold"])
+
+    asyncio.run(run())
+    assert tts.synthesized == ["Please hold"]
@@ -0,0 +1,89 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from livekit.agents import ToolError
+
+from benchmarks.voice_webhook import free_port
+from benchmarks.weather_stub import start_stub
+from tools import weather
+
+CONTEXT = SimpleNamespace(userdata=None, session=None)
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    """Run a test coroutine against the local stub upstream and return its upstream hit count."""
+    port = free_port()
+    monkeypatch.setenv("WEATHER_API_KEY", "stub")
+    monkeypatch.setattr(weather, "WEATHER_API_URL", f"http://127.0.0.1:{port}/data/2.5/weather")
+    weather._cache.clear()
+
+    def run(test, delay=0.05):
+        async def main():
+            runner, hits = await start_stub(port, delay, unknown={"Atlantis"})
+            try:
+                await test()
+            finally:
+                await weather.close_http_session()
+                await runner.cleanup()
+            return hits["count"]
+        return asyncio.run(main())
+
+    yield run
+    weather._cache.clear()
+
+
+def test_concurrent_calls_for_one_city_make_one_upstream_request(stub):
+    async def test():
+        replies = await asyncio.gather(*(weather.get_weather(CONTEXT, "London") for _ in range(20)))
+        assert len(set(replies)) == 1 and "clear sky" in replies[0]
+        # Spelling variants share the cache entry
+        await weather.get_weather(CONTEXT, "  london ")
+
+    assert stub(test) == 1
+    assert not weather._inflight
+
+
+def test_session_is_shared_and_reopened_after_close(stub):
+    async def test():
+        session = weather._get_session()
+        await weather.get_weather(CONTEXT, "Paris")
+        assert weather._get_session() is session
+        await weather.close_http_session()
+        assert weather._get_session() is not session
+
+    stub(test)
+
+
+def test_cached_conditions_expire(stub, monkeypatch):
+    monkeypatch.setattr(weather, "CACHE_TTL_SECONDS", 0.1)
+
+    async def test():
+        await weather.get_weather(CONTEXT, "Oslo")
+        await weather.get_weather(CONTEXT, "Oslo")
+        await asyncio.sleep(0.15)
+        await weather.get_weather(CONTEXT, "Oslo")
+
+    assert stub(test, delay=0) == 2
+
+
+def test_least_recently_used_city_is_evicted(stub, monkeypatch):
+    monkeypatch.setattr(weather, "CACHE_MAX_ENTRIES", 2)
+
+    async def test():
+        for city in ("Rome", "Lima", "Rome", "Cairo"):
+            await weather.get_weather(CONTEXT, city)
+        assert list(weather._cache) == ["rome", "cairo"]
+
+    assert stub(test, delay=0) == 3
+
+
+def test_errors_are_not_cached(stub):
+    async def test():
+        for _ in range(2):
+            with pytest.raises(ToolError):
+                await weather.get_weather(CONTEXT, "Atlantis")
+        assert "atlantis" not in weather._cache
+
+    assert stub(test, delay=0) == 2
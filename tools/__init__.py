@@ -2,8 +2,8 @@
 
 from .weather import get_weather
 from .datetime_tool import get_current_datetime, get_current_date, get_current_time
-from .doctor_schedule import get_doctor_schedule, check_doctor_availability, list_all_departments
-from .appointment import book_appointment, check_patient_appointments, cancel_appointment
+from .doctor_schedule import get_doctor_schedule, check_doctor_availability, find_available_slots, get_schedule_range, list_all_departments
+from .appointment import book_appointment, check_patient_appointments, cancel_appointment, verify_caller_identity
 from .department_info import get_department_info, get_visiting_hours
 from .emergency import get_emergency_info, get_ambulance_service
 
@@ -17,12 +17,15 @@ __all__ = [
     # Doctor & Schedule
     "get_doctor_schedule",
     "check_doctor_availability",
+    "find_available_slots",
+    "get_schedule_range",
     "list_all_departments",
     
     # Appointments
     "book_appointment",
     "check_patient_appointments",
     "cancel_appointment",
+    "verify_caller_identity",
     
     # Department Info
     "get_department_info",
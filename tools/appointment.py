@@ -1,12 +1,60 @@
 """Tools for booking and managing appointments."""
 
 from livekit.agents import function_tool, RunContext, ToolError
-from database.mongodb import get_appointments_collection, get_doctors_collection, get_patients_collection
+from observability.tool_metrics import instrumented
+from conversation.memo import Uncached, invalidates, memoized
+from database.mongodb import MongoDB, get_appointments_collection, get_patients_collection
+from database.directory import DirectoryCache
+from database.phone import normalize_phone
+from conversation.state import call_state
+from conversation.utterance_cache import hold_if_slow
+from prompts import HOLD_TEXT
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from datetime import datetime
+from typing import List, Tuple
+import asyncio
+import os
+import re
 import uuid
 
+from .doctor_schedule import doctor_not_found
+from .slot_engine import build_day_slots
+
+APPOINTMENTS_PAGE_SIZE = int(os.getenv("APPOINTMENTS_PAGE_SIZE", "5"))
+
+# Only what check_patient_appointments reads back to the caller
+APPOINTMENT_SUMMARY_FIELDS = {
+    "_id": 0, "appointment_id": 1, "date": 1, "time": 1,
+    "doctor_name": 1, "department": 1, "reason": 1,
+}
+
+
+def _invalid_phone(phone: str) -> str:
+    return Uncached(f"{phone} doesn't look like a complete phone number. Please ask the patient to repeat it with the area code.")
+
+
+async def _upsert_patient(name: str, phone: str) -> str:
+    """Return the patient_id for a phone number, creating the patient if needed."""
+    patients_collection = get_patients_collection()
+    query = {"phone": phone}
+    update = {"$setOnInsert": {"patient_id": str(uuid.uuid4()), "name": name, "phone": phone}}
+    
+    try:
+        patient = await patients_collection.find_one_and_update(
+            query, update, projection={"patient_id": 1},
+            upsert=True, return_document=ReturnDocument.AFTER,
+        )
+    except DuplicateKeyError:
+        # Lost an insert race on the unique phone index; the winner's record exists now
+        patient = await patients_collection.find_one(query, {"patient_id": 1})
+    
+    return patient["patient_id"]
+
 
 @function_tool()
+@instrumented
+@invalidates("availability", "appointments")
 async def book_appointment(
     context: RunContext,
     patient_name: str,
@@ -28,59 +76,66 @@ async def book_appointment(
     """
     try:
         datetime.strptime(date, "%Y-%m-%d")
-        datetime.strptime(time, "%H:%M")
+        time = datetime.strptime(time, "%H:%M").strftime("%H:%M")
         
-        doctors_collection = get_doctors_collection()
-        appointments_collection = get_appointments_collection()
-        patients_collection = get_patients_collection()
+        phone = normalize_phone(patient_phone)
+        if phone is None:
+            return _invalid_phone(patient_phone)
         
-        doctor = await doctors_collection.find_one({
-            "name": {"$regex": f"^{doctor_name}$", "$options": "i"}
-        })
+        doctor = await DirectoryCache.get_doctor_by_name(doctor_name)
         
         if not doctor:
-            return f"Doctor {doctor_name} not found. Please check the name."
+            return doctor_not_found(doctor_name)
         
-        existing = await appointments_collection.find_one({
-            "doctor_id": doctor["doctor_id"],
-            "date": date,
-            "time": time,
-            "status": "scheduled"
-        })
+        # Slot shape comes from the cached directory, so this costs no round trip
+        slots = build_day_slots(doctor, date, {})
+        index = slots.index_of(time) if slots else None
         
-        if existing:
-            return f"Time slot {time} on {date} is already booked. Please choose a different time."
+        if index is None or not slots.is_free(index):
+            return f"{time} on {date} is not a bookable slot for Dr. {doctor['name']}. Use find_available_slots to get valid times."
         
-        patient = await patients_collection.find_one({"phone": patient_phone})
+        if MongoDB.slot_guard is False:
+            raise ToolError("Booking is unavailable right now. Please ask the caller to call back later.")
         
-        if not patient:
-            patient_id = str(uuid.uuid4())
-            patient = {
+        async with hold_if_slow(context, HOLD_TEXT):
+            if not MongoDB.slot_guard:
+                # The unique slot index isn't confirmed yet; check for an existing booking first
+                existing = await get_appointments_collection().find_one({
+                    "doctor_id": doctor["doctor_id"],
+                    "date": date,
+                    "time": time,
+                    "status": "scheduled",
+                }, {"_id": 1})
+                if existing:
+                    return f"Time slot {time} on {date} is already booked. Please choose a different time."
+            
+            patient_id = await _upsert_patient(patient_name, phone)
+            
+            appointment_id = str(uuid.uuid4())
+            appointment = {
+                "appointment_id": appointment_id,
                 "patient_id": patient_id,
-                "name": patient_name,
-                "phone": patient_phone,
+                "patient_name": patient_name,
+                "patient_phone": phone,
+                "doctor_id": doctor["doctor_id"],
+                "doctor_name": doctor["name"],
+                "department": doctor["department"],
+                "date": date,
+                "time": time,
+                "reason": reason,
+                "status": "scheduled",
+                "created_at": datetime.now().isoformat()
             }
-            await patients_collection.insert_one(patient)
-        else:
-            patient_id = patient["patient_id"]
-        
-        appointment_id = str(uuid.uuid4())
-        appointment = {
-            "appointment_id": appointment_id,
-            "patient_id": patient_id,
-            "patient_name": patient_name,
-            "patient_phone": patient_phone,
-            "doctor_id": doctor["doctor_id"],
-            "doctor_name": doctor["name"],
-            "department": doctor["department"],
-            "date": date,
-            "time": time,
-            "reason": reason,
-            "status": "scheduled",
-            "created_at": datetime.now().isoformat()
-        }
-        
-        await appointments_collection.insert_one(appointment)
+            
+            try:
+                await get_appointments_collection().insert_one(appointment)
+            except DuplicateKeyError:
+                # Unique partial index on scheduled (doctor_id, date, time)
+                return f"Time slot {time} on {date} is already booked. Please choose a different time."
+        
+        state = call_state(context)
+        if state is not None:
+            state.appointments_changed(phone)
         
         # More concise, conversational response
         return f"""BOOKING CONFIRMED
@@ -98,45 +153,116 @@ Note: Please arrive 15 minutes early with ID and insurance card."""
 
 
 @function_tool()
-async def check_patient_appointments(
+@instrumented
+async def verify_caller_identity(
     context: RunContext,
-    patient_phone: str,
+    patient_name: str,
 ) -> str:
-    """Check all appointments for a patient using their phone number.
+    """Confirm the caller is the patient on file for the number they are calling from.
+    
+    Call this with the name the caller gives before discussing a returning patient's details or appointments.
     
     Args:
-        patient_phone: Patient's phone number
+        patient_name: Full name exactly as the caller said it
     """
     try:
-        appointments_collection = get_appointments_collection()
+        state = call_state(context)
+        if state is None or state.caller_phone is None:
+            return "The caller's number is not known. Please ask for their phone number."
         
-        appointments_cursor = appointments_collection.find({
-            "patient_phone": patient_phone,
-            "status": "scheduled"
-        }).sort("date", 1)
+        if state.prefetch_task is not None and not state.prefetch_task.done():
+            await asyncio.shield(state.prefetch_task)
+        
+        if not state.patient:
+            return "No patient is on file for this number. Treat the caller as a new patient."
         
-        appointments = []
-        async for apt in appointments_cursor:
-            appointments.append(apt)
+        if not state.confirm_identity(patient_name):
+            return "That name does not match the patient on file for this number. Do not share their details; ask for the patient's own phone number instead."
         
-        if not appointments:
-            return f"No scheduled appointments found for {patient_phone}."
+        # Name and upcoming appointments go into the instructions from here on
+        await state.refresh_prompt()
+        return f"Identity confirmed: {state.patient['name']}."
         
-        # More concise format
-        response = f"Appointments for {patient_phone}:\n"
+    except Exception as e:
+        raise ToolError(f"Failed to verify the caller: {str(e)}")
+
+
+@function_tool()
+@instrumented
+@memoized("appointments")
+async def check_patient_appointments(
+    context: RunContext,
+    patient_phone: str = "",
+    page: int = 1,
+) -> str:
+    """Check scheduled appointments for a patient using their phone number.
+    
+    Args:
+        patient_phone: Patient's phone number (leave empty to use the number the caller is calling from)
+        page: Page of results to show, starting at 1 (a few appointments per page)
+    """
+    try:
+        state = call_state(context)
+        if not patient_phone:
+            if state is None or state.caller_phone is None:
+                return Uncached("The caller's number is not known. Please ask for their phone number.")
+            patient_phone = state.caller_phone
+        
+        phone = normalize_phone(patient_phone)
+        if phone is None:
+            return _invalid_phone(patient_phone)
         
-        for i, apt in enumerate(appointments, 1):
-            response += f"\n{i}. {apt['date']} at {apt['time']}\n"
-            response += f"   Dr. {apt['doctor_name']} ({apt['department']})\n"
-            response += f"   ID: {apt['appointment_id'][:8]} | Reason: {apt['reason']}\n"
+        page = max(page, 1)
         
-        return response.strip()
+        # The caller's own first page was prefetched when the call started
+        prefetched = await state.prefetched_appointments(phone) if state and page == 1 else None
+        if prefetched is not None:
+            appointments, has_more = prefetched
+        else:
+            appointments, has_more = await fetch_patient_appointments(phone, page)
+        
+        return format_appointments(phone, appointments, page, has_more)
         
     except Exception as e:
         raise ToolError(f"Failed to check appointments: {str(e)}")
 
 
+async def fetch_patient_appointments(phone: str, page: int = 1) -> Tuple[List[dict], bool]:
+    """One page of a patient's scheduled appointments and whether more exist."""
+    # Served by the patient_phone_status_date index; one extra row tells us if there's more
+    appointments_cursor = get_appointments_collection().find(
+        {"patient_phone": phone, "status": "scheduled"},
+        APPOINTMENT_SUMMARY_FIELDS,
+    ).sort([("date", 1), ("time", 1)]).skip((page - 1) * APPOINTMENTS_PAGE_SIZE).limit(APPOINTMENTS_PAGE_SIZE + 1)
+    
+    appointments = await appointments_cursor.to_list(length=APPOINTMENTS_PAGE_SIZE + 1)
+    return appointments[:APPOINTMENTS_PAGE_SIZE], len(appointments) > APPOINTMENTS_PAGE_SIZE
+
+
+def format_appointments(phone: str, appointments: List[dict], page: int, has_more: bool) -> str:
+    if not appointments:
+        if page > 1:
+            return f"No more scheduled appointments for {phone}."
+        return f"No scheduled appointments found for {phone}."
+    
+    # More concise format
+    response = f"Appointments for {phone}:\n"
+    
+    first = (page - 1) * APPOINTMENTS_PAGE_SIZE + 1
+    for i, apt in enumerate(appointments, first):
+        response += f"\n{i}. {apt['date']} at {apt['time']}\n"
+        response += f"   Dr. {apt['doctor_name']} ({apt['department']})\n"
+        response += f"   ID: {apt['appointment_id'][:8]} | Reason: {apt['reason']}\n"
+    
+    if has_more:
+        response += f"\nMore appointments exist; call again with page={page + 1} to hear them."
+    
+    return response.strip()
+
+
 @function_tool()
+@instrumented
+@invalidates("availability", "appointments")
 async def cancel_appointment(
     context: RunContext,
     appointment_id: str,
@@ -149,22 +275,30 @@ async def cancel_appointment(
         patient_phone: Patient's phone number for verification
     """
     try:
+        phone = normalize_phone(patient_phone)
+        if phone is None:
+            return _invalid_phone(patient_phone)
+        
         appointments_collection = get_appointments_collection()
         
         appointment = await appointments_collection.find_one({
-            "appointment_id": {"$regex": f"^{appointment_id}"},
-            "patient_phone": patient_phone,
+            "appointment_id": {"$regex": f"^{re.escape(appointment_id.strip().lower())}"},
+            "patient_phone": phone,
             "status": "scheduled"
         })
         
         if not appointment:
-            return f"No appointment found with ID {appointment_id} for {patient_phone}."
+            return f"No appointment found with ID {appointment_id} for {phone}."
         
         await appointments_collection.update_one(
             {"appointment_id": appointment["appointment_id"]},
             {"$set": {"status": "cancelled"}}
         )
         
+        state = call_state(context)
+        if state is not None:
+            state.appointments_changed(phone)
+        
         # More concise response
         return f"""CANCELLED
 ID: {appointment_id}
@@ -1,11 +1,13 @@
 """DateTime tools for getting current date and time information."""
 
 from livekit.agents import function_tool, RunContext, ToolError
+from observability.tool_metrics import instrumented
 from datetime import datetime
 import pytz
 
 
 @function_tool()
+@instrumented
 async def get_current_datetime(
     context: RunContext,
     timezone: str = "UTC",
@@ -27,6 +29,7 @@ async def get_current_datetime(
 
 
 @function_tool()
+@instrumented
 async def get_current_date(
     context: RunContext,
     dummy: str = "",  # ← ADD a dummy parameter
@@ -41,6 +44,7 @@ async def get_current_date(
 
 
 @function_tool()
+@instrumented
 async def get_current_time(
     context: RunContext,
     timezone: str = "UTC",
@@ -1,10 +1,28 @@
 """Tools for department information."""
 
 from livekit.agents import function_tool, RunContext, ToolError
-from database.mongodb import get_departments_collection
+from observability.tool_metrics import instrumented
+from database.directory import DirectoryCache
+
+VISITING_HOURS_INFO = """Visiting Hours:
+General Wards: 10 AM-12 PM, 4 PM-7 PM
+ICU: 11-11:30 AM, 5-5:30 PM (max 2 visitors)
+Emergency: 24/7 (one guardian)
+
+Rules: Hand sanitization required, phones on silent, max 2 visitors per patient, children under 12 not allowed in ICU."""
+
+# Same facts phrased for speech, used when the answer skips the LLM
+VISITING_HOURS_SPOKEN = (
+    "Our general ward visiting hours are 10 AM to 12 noon, and 4 PM to 7 PM. "
+    "The ICU allows visits from 11 to 11:30 in the morning and 5 to 5:30 in the evening, with at most two visitors. "
+    "In the emergency department, one guardian can stay at any time. "
+    "We ask visitors to sanitize their hands and keep phones on silent, and children under 12 can't visit the ICU. "
+    "Is there anything else I can help you with?"
+)
 
 
 @function_tool()
+@instrumented
 async def get_department_info(
     context: RunContext,
     department_name: str,
@@ -15,11 +33,7 @@ async def get_department_info(
         department_name: Name of the department (e.g., "Cardiology", "Emergency")
     """
     try:
-        departments_collection = get_departments_collection()
-        
-        department = await departments_collection.find_one({
-            "name": {"$regex": f"^{department_name}$", "$options": "i"}
-        })
+        department = await DirectoryCache.get_department(department_name)
         
         if not department:
             return f"Department {department_name} not found. Use list_all_departments to see available departments."
@@ -39,6 +53,7 @@ async def get_department_info(
 
 
 @function_tool()
+@instrumented
 async def get_visiting_hours(
     context: RunContext,
     dummy: str = "",
@@ -48,9 +63,4 @@ async def get_visiting_hours(
     Args:
         dummy: Unused parameter (ignore this)
     """
-    return """Visiting Hours:
-General Wards: 10 AM-12 PM, 4 PM-7 PM
-ICU: 11-11:30 AM, 5-5:30 PM (max 2 visitors)
-Emergency: 24/7 (one guardian)
-
-Rules: Hand sanitization required, phones on silent, max 2 visitors per patient, children under 12 not allowed in ICU."""
\ No newline at end of file
+    return VISITING_HOURS_INFO
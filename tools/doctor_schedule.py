@@ -1,18 +1,57 @@
 """Tools for checking doctor schedules and availability."""
 
 from livekit.agents import function_tool, RunContext, ToolError
-from database.mongodb import get_doctors_collection, get_appointments_collection
+from observability.tool_metrics import instrumented
+from conversation.memo import Uncached, memoized
+from database.directory import DirectoryCache
+from conversation.utterance_cache import hold_if_slow
+from prompts import HOLD_TEXT
+from .slot_engine import (
+    build_day_slots,
+    date_range,
+    fetch_booked_times,
+    format_minutes,
+    load_slots,
+    next_free_slots,
+    today,
+    working_window,
+)
 from datetime import datetime
-import re
+from itertools import groupby
+from typing import Optional
+
+
+def doctor_not_found(doctor_name: str) -> str:
+    """Reply for a doctor name that didn't resolve, offering the closest names."""
+    suggestions = DirectoryCache.suggest_doctors(doctor_name)
+    if not suggestions:
+        return Uncached(f"Doctor {doctor_name} not found. Please check the name.")
+    return Uncached(f"Doctor {doctor_name} not found. Did you mean {' or '.join(suggestions)}? Confirm the name with the caller before using it.")
+
+
+def closed_reason(slots) -> Optional[str]:
+    """"past" or "closed for the rest of today" once every slot has started, else None."""
+    if not slots.elapsed or slots.open_count() > 0:
+        return None
+    return "past" if slots.date < today() else "closed for the rest of today"
+
+
+def free_summary(slots) -> str:
+    """Free slots out of those not yet started."""
+    if slots.elapsed:
+        return f"{slots.free_count()} of {slots.open_count()} remaining slots free"
+    return f"{slots.free_count()} of {slots.count} slots free"
 
 
 @function_tool()
+@instrumented
+@memoized("availability")
 async def get_doctor_schedule(
     context: RunContext,
     department: str,
     date: str,
 ) -> str:
-    """Get all doctors available in a department on a specific date.
+    """Get the doctors working in a department on a date, with their free slots.
     
     Args:
         department: Department name (e.g., "Cardiology", "Neurology", "General Medicine")
@@ -22,45 +61,41 @@ async def get_doctor_schedule(
         datetime.strptime(date, "%Y-%m-%d")
         day_of_week = datetime.strptime(date, "%Y-%m-%d").strftime("%A")
         
-        doctors_collection = get_doctors_collection()
-        doctors_cursor = doctors_collection.find({
-            "department": {"$regex": f"^{department}$", "$options": "i"}
-        })
-        
-        doctors_list = []
-        async for doctor in doctors_cursor:
-            doctors_list.append(doctor)
+        doctors_list = await DirectoryCache.get_doctors_by_department(department)
         
         if not doctors_list:
-            return f"No doctors found in {department} department. Available departments: Cardiology, Neurology, General Medicine, Pediatrics, Orthopedics."
-        
-        # More concise, conversational format
-        available_doctors = []
-        unavailable_doctors = []
-        
-        for doc in doctors_list:
-            working_hours = [wh for wh in doc.get("working_hours", []) 
-                           if wh["day"] == day_of_week and wh["is_available"]]
-            
-            if working_hours:
-                wh = working_hours[0]
-                available_doctors.append({
-                    'name': doc['name'],
-                    'specialization': doc['specialization'],
-                    'start': wh['start_time'],
-                    'end': wh['end_time']
-                })
-            else:
-                unavailable_doctors.append(doc['name'])
+            return Uncached(f"No doctors found in {department} department. Available departments: Cardiology, Neurology, General Medicine, Pediatrics, Orthopedics.")
+        
+        department = doctors_list[0]["department"]
         
-        if not available_doctors:
+        # Working hours come from the directory cache; bookings for every
+        # doctor in the department are one aggregation
+        async with hold_if_slow(context, HOLD_TEXT):
+            day_slots = await load_slots(doctors_list, [date])
+        
+        if not day_slots:
             return f"No doctors are available in {department} on {day_of_week}. Please try a different day or department."
         
         # Build concise response
-        response = f"{department} doctors available on {day_of_week}, {date}:\n"
+        response = f"{department} doctors on {day_of_week}, {date}:\n"
         
-        for doc in available_doctors:
-            response += f"- Dr. {doc['name']} ({doc['specialization']}): {doc['start']}-{doc['end']}\n"
+        for slots in day_slots:
+            doc = slots.doctor
+            hours = f"{format_minutes(slots.start)}-{format_minutes(slots.end)}"
+            first_free = next(iter(slots.free_times()), None)
+            closed = closed_reason(slots)
+            if closed:
+                capacity = closed
+            elif first_free is None:
+                capacity = "fully booked"
+            else:
+                capacity = f"{free_summary(slots)}, first free at {first_free}"
+            response += f"- Dr. {doc['name']} ({doc['specialization']}): {hours}, {capacity}\n"
+        
+        if all(closed_reason(slots) for slots in day_slots):
+            response += "That day is over for booking. Use find_available_slots for the next free times.\n"
+        elif not any(slots.free for slots in day_slots):
+            response += "Everyone is fully booked that day. Use find_available_slots for the next free times.\n"
         
         return response.strip()
         
@@ -71,6 +106,8 @@ async def get_doctor_schedule(
 
 
 @function_tool()
+@instrumented
+@memoized("availability")
 async def check_doctor_availability(
     context: RunContext,
     doctor_name: str,
@@ -86,40 +123,41 @@ async def check_doctor_availability(
     """
     try:
         datetime.strptime(date, "%Y-%m-%d")
-        datetime.strptime(time, "%H:%M")
+        time = datetime.strptime(time, "%H:%M").strftime("%H:%M")
         
         day_of_week = datetime.strptime(date, "%Y-%m-%d").strftime("%A")
         
-        doctors_collection = get_doctors_collection()
-        appointments_collection = get_appointments_collection()
-        
-        doctor = await doctors_collection.find_one({
-            "name": {"$regex": f"^{doctor_name}$", "$options": "i"}
-        })
+        doctor = await DirectoryCache.get_doctor_by_name(doctor_name)
         
         if not doctor:
-            return f"Doctor {doctor_name} not found. Please check the name."
+            return doctor_not_found(doctor_name)
         
-        working_hours = [wh for wh in doctor.get("working_hours", []) 
-                        if wh["day"] == day_of_week and wh["is_available"]]
+        window = working_window(doctor, day_of_week)
         
-        if not working_hours:
+        if window is None:
             return f"Dr. {doctor['name']} is not available on {day_of_week}s."
         
-        wh = working_hours[0]
+        start, end = (format_minutes(m) for m in window)
+        
+        if not (start <= time < end):
+            return f"Dr. {doctor['name']} works {start}-{end} on {day_of_week}s. {time} is outside working hours."
         
-        if not (wh["start_time"] <= time <= wh["end_time"]):
-            return f"Dr. {doctor['name']} works {wh['start_time']}-{wh['end_time']} on {day_of_week}s. {time} is outside working hours."
+        booked = await fetch_booked_times([doctor["doctor_id"]], date, date)
+        slots = build_day_slots(doctor, date, booked)
+        index = slots.index_of(time)
         
-        existing_appointment = await appointments_collection.find_one({
-            "doctor_id": doctor["doctor_id"],
-            "date": date,
-            "time": time,
-            "status": "scheduled"
-        })
+        if closed_reason(slots):
+            return f"{date} is over for booking with Dr. {doctor['name']}. Try a later day."
         
-        if existing_appointment:
-            return f"Dr. {doctor['name']} is booked at {time} on {date}. Try a different time."
+        if index is not None and index < slots.elapsed:
+            return f"{time} on {date} has already passed. Free times later that day: {', '.join(list(slots.free_times())[:4]) or 'none'}."
+        
+        if index is None or not slots.is_free(index):
+            free_times = list(slots.free_times())
+            if not free_times:
+                return f"Dr. {doctor['name']} is fully booked on {date}. Try a different day."
+            reason = "is booked" if index is not None else f"sees patients in {slots.duration}-minute slots and is not free"
+            return f"Dr. {doctor['name']} {reason} at {time} on {date}. Free times that day: {', '.join(free_times[:4])}."
         
         return f"AVAILABLE: Dr. {doctor['name']} is free at {time} on {date}."
         
@@ -130,6 +168,141 @@ async def check_doctor_availability(
 
 
 @function_tool()
+@instrumented
+@memoized("availability")
+async def find_available_slots(
+    context: RunContext,
+    doctor_name: str = "",
+    department: str = "",
+    start_date: str = "",
+    days: int = 7,
+    count: int = 3,
+) -> str:
+    """Find the next free appointment slots for a doctor or a whole department.
+    
+    Use this when the patient asks when they can be seen, instead of checking times one by one.
+    
+    Args:
+        doctor_name: Full name of the doctor (leave empty to search a department)
+        department: Department name (used when doctor_name is empty)
+        start_date: First date to search in YYYY-MM-DD format (defaults to today)
+        days: Number of days to search, 1-14 (default 7)
+        count: Number of slots to return, 1-10 (default 3)
+    """
+    try:
+        start_date = start_date or today()
+        datetime.strptime(start_date, "%Y-%m-%d")
+        days = min(max(days, 1), 14)
+        count = min(max(count, 1), 10)
+        
+        if doctor_name:
+            doctor = await DirectoryCache.get_doctor_by_name(doctor_name)
+            if not doctor:
+                return doctor_not_found(doctor_name)
+            doctors = [doctor]
+            subject = f"Dr. {doctor['name']}"
+        elif department:
+            doctors = await DirectoryCache.get_doctors_by_department(department)
+            if not doctors:
+                return Uncached(f"No doctors found in {department} department. Use list_all_departments to see available departments.")
+            subject = department
+        else:
+            return Uncached("Please provide a doctor name or a department.")
+        
+        dates = date_range(start_date, days)
+        async with hold_if_slow(context, HOLD_TEXT):
+            found = next_free_slots(await load_slots(doctors, dates), count)
+        
+        if not found:
+            return f"No free slots for {subject} between {dates[0]} and {dates[-1]}. Try later dates."
+        
+        response = f"Next free slots for {subject}:\n"
+        for date, hhmm, doctor in found:
+            day_of_week = datetime.strptime(date, "%Y-%m-%d").strftime("%A")
+            response += f"- {day_of_week} {date} at {hhmm} with Dr. {doctor['name']}\n"
+        
+        return response.strip()
+        
+    except ValueError:
+        raise ToolError("Invalid date format. Please use YYYY-MM-DD format (e.g., 2026-01-28)")
+    except Exception as e:
+        raise ToolError(f"Failed to find available slots: {str(e)}")
+
+
+@function_tool()
+@instrumented
+@memoized("availability")
+async def get_schedule_range(
+    context: RunContext,
+    department: str = "",
+    doctor_name: str = "",
+    start_date: str = "",
+    days: int = 7,
+) -> str:
+    """Get a day-by-day schedule summary for a department or doctor over several days.
+    
+    Use this for requests like "sometime next week" instead of checking one day at a time.
+    
+    Args:
+        department: Department name (leave empty when giving a doctor)
+        doctor_name: Full name of the doctor (leave empty to cover a whole department)
+        start_date: First date in YYYY-MM-DD format (defaults to today)
+        days: Number of days to cover, 1-14 (default 7)
+    """
+    try:
+        start_date = start_date or today()
+        datetime.strptime(start_date, "%Y-%m-%d")
+        days = min(max(days, 1), 14)
+        
+        if doctor_name:
+            doctor = await DirectoryCache.get_doctor_by_name(doctor_name)
+            if not doctor:
+                return doctor_not_found(doctor_name)
+            doctors = [doctor]
+            subject = f"Dr. {doctor['name']}"
+        elif department:
+            doctors = await DirectoryCache.get_doctors_by_department(department)
+            if not doctors:
+                return Uncached(f"No doctors found in {department} department. Use list_all_departments to see available departments.")
+            subject = doctors[0]["department"]
+        else:
+            return Uncached("Please provide a department or a doctor name.")
+        
+        dates = date_range(start_date, days)
+        async with hold_if_slow(context, HOLD_TEXT):
+            day_slots = await load_slots(doctors, dates)
+        
+        response = f"{subject} schedule, {dates[0]} to {dates[-1]}:\n"
+        for date, same_day in groupby(day_slots, key=lambda slots: slots.date):
+            day_of_week = datetime.strptime(date, "%Y-%m-%d").strftime("%A")
+            parts = []
+            for slots in same_day:
+                hours = f"{format_minutes(slots.start)}-{format_minutes(slots.end)}"
+                closed = closed_reason(slots)
+                parts.append(
+                    f"Dr. {slots.doctor['name']} {hours}, {closed}" if closed
+                    else f"Dr. {slots.doctor['name']} {hours}, {slots.booked} booked, {free_summary(slots)}"
+                )
+            response += f"- {day_of_week} {date}: {'; '.join(parts)}\n"
+        
+        working_dates = {slots.date for slots in day_slots}
+        closed = [
+            datetime.strptime(date, "%Y-%m-%d").strftime("%A")
+            for date in dates if date not in working_dates
+        ]
+        if closed:
+            response += f"No doctors working on: {', '.join(closed)}\n"
+        
+        return response.strip()
+        
+    except ValueError:
+        raise ToolError("Invalid date format. Please use YYYY-MM-DD format (e.g., 2026-01-28)")
+    except Exception as e:
+        raise ToolError(f"Failed to get schedule range: {str(e)}")
+
+
+@function_tool()
+@instrumented
 async def list_all_departments(
     context: RunContext,
     dummy: str = "",
@@ -140,13 +313,7 @@ async def list_all_departments(
         dummy: Unused parameter (ignore this)
     """
     try:
-        from database.mongodb import get_departments_collection
-        departments_collection = get_departments_collection()
-        departments_cursor = departments_collection.find()
-        
-        departments_list = []
-        async for dept in departments_cursor:
-            departments_list.append(dept)
+        departments_list = await DirectoryCache.list_departments()
         
         if not departments_list:
             return "No departments found in the system."
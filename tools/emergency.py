@@ -1,9 +1,45 @@
 """Emergency handling tools."""
 
 from livekit.agents import function_tool, RunContext
+from observability.tool_metrics import instrumented
+
+EMERGENCY_INFO = """EMERGENCY INFO:
+For life-threatening emergencies: Call 911 IMMEDIATELY
+
+Hospital Emergency Department:
+- Phone: +1-229-213-9528
+- Location: Building A, Ground Floor
+- Open: 24/7
+
+Urgent situations: Chest pain, difficulty breathing, severe bleeding, loss of consciousness, severe burns, stroke symptoms, severe allergic reactions
+
+Non-emergencies: Walk-in clinic (8 AM-10 PM daily, 30-45 min wait)"""
+
+AMBULANCE_SERVICE_INFO = """Ambulance Service:
+Hospital Ambulance: +1-229-213-9999 (24/7)
+Coverage: 50 km radius
+Services: Basic & Advanced Life Support, Cardiac, Neonatal
+Response time: 15-20 minutes average
+
+For life-threatening emergencies, also call 911."""
+
+# Same facts phrased for speech, used when the answer skips the LLM
+EMERGENCY_INFO_SPOKEN = (
+    "If this is life-threatening, please hang up and call 911 right away. "
+    "Our emergency department is open 24 hours a day, on the ground floor of Building A, "
+    "and you can reach it at +1-229-213-9528. "
+    "For anything that isn't an emergency, our walk-in clinic is open 8 AM to 10 PM every day."
+)
+
+AMBULANCE_SERVICE_SPOKEN = (
+    "Our hospital ambulance is available 24 hours a day at +1-229-213-9999. "
+    "It covers a 50 kilometer radius and usually arrives within 15 to 20 minutes. "
+    "If it's life-threatening, please also call 911."
+)
 
 
 @function_tool()
+@instrumented
 async def get_emergency_info(
     context: RunContext,
     dummy: str = "",
@@ -13,20 +49,11 @@ async def get_emergency_info(
     Args:
         dummy: Unused parameter (ignore this)
     """
-    return """EMERGENCY INFO:
-For life-threatening emergencies: Call 911 IMMEDIATELY
-
-Hospital Emergency Department:
-- Phone: +1-229-213-9528
-- Location: Building A, Ground Floor
-- Open: 24/7
-
-Urgent situations: Chest pain, difficulty breathing, severe bleeding, loss of consciousness, severe burns, stroke symptoms, severe allergic reactions
-
-Non-emergencies: Walk-in clinic (8 AM-10 PM daily, 30-45 min wait)"""
+    return EMERGENCY_INFO
 
 
 @function_tool()
+@instrumented
 async def get_ambulance_service(
     context: RunContext,
     dummy: str = "",
@@ -36,10 +63,4 @@ async def get_ambulance_service(
     Args:
         dummy: Unused parameter (ignore this)
     """
-    return """Ambulance Service:
-Hospital Ambulance: +1-229-213-9999 (24/7)
-Coverage: 50 km radius
-Services: Basic & Advanced Life Support, Cardiac, Neonatal
-Response time: 15-20 minutes average
-
-For life-threatening emergencies, also call 911."""
\ No newline at end of file
+    return AMBULANCE_SERVICE_INFO
\ No newline at end of file
@@ -0,0 +1,195 @@
+"""Appointment slot engine.
+
+Each doctor-day is expanded from ``working_hours`` into slots aligned to
+``consultation_duration`` and kept as an int bitmap (bit ``i`` set means
+slot ``i`` is free). Slots that have already started are tracked
+separately as ``elapsed``, so a past day reads as past rather than as
+fully booked. Booked appointments for any number of doctors and
+days are fetched with a single aggregation that groups them per
+doctor-day.
+"""
+
+from datetime import date as date_cls, datetime, timedelta
+from itertools import groupby
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from database.mongodb import get_appointments_collection
+
+DATE_FORMAT = "%Y-%m-%d"
+
+
+def to_minutes(hhmm: str) -> int:
+    hours, minutes = hhmm.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def format_minutes(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def working_window(doctor: dict, day_of_week: str) -> Optional[Tuple[int, int]]:
+    """Return the doctor's (start, end) minutes on a weekday, or None."""
+    for wh in doctor.get("working_hours", []):
+        if wh["day"] == day_of_week and wh["is_available"]:
+            return to_minutes(wh["start_time"]), to_minutes(wh["end_time"])
+    return None
+
+
+class DaySlots:
+    """Slots for one doctor on one date."""
+
+    __slots__ = ("doctor", "date", "start", "end", "duration", "count", "free", "booked", "elapsed")
+
+    def __init__(self, doctor: dict, date: str, start: int, end: int):
+        self.doctor = doctor
+        self.date = date
+        self.start = start
+        # The doctor's real end of hours; the last slot may finish earlier
+        self.end = end
+        self.duration = doctor.get("consultation_duration", 30)
+        self.count = max(0, (end - start) // self.duration)
+        self.free = (1 << self.count) - 1
+        self.booked = 0
+        # Leading slots that have already started
+        self.elapsed = 0
+
+    def time_of(self, index: int) -> str:
+        return format_minutes(self.start + index * self.duration)
+
+    def index_of(self, hhmm: str) -> Optional[int]:
+        """Slot index starting exactly at ``hhmm``, or None if misaligned."""
+        offset = to_minutes(hhmm) - self.start
+        if offset < 0 or offset % self.duration:
+            return None
+        index = offset // self.duration
+        return index if index < self.count else None
+
+    def book(self, hhmm: str):
+        """Clear every slot overlapping an appointment that starts at ``hhmm``."""
+        self.booked += 1
+        begin = to_minutes(hhmm) - self.start
+        d = self.duration
+        first = max(0, -(-(begin - d + 1) // d))
+        last = min(self.count - 1, (begin + d - 1) // d)
+        for index in range(first, last + 1):
+            self.free &= ~(1 << index)
+
+    def block_before(self, hhmm: str):
+        """Clear slots starting before ``hhmm`` (e.g. already past today)."""
+        offset = to_minutes(hhmm) - self.start
+        if offset > 0:
+            passed = min(self.count, -(-offset // self.duration))
+            self.free &= ~((1 << passed) - 1)
+            self.elapsed = max(self.elapsed, passed)
+
+    def close(self):
+        """Mark every slot as elapsed (the whole date is past)."""
+        self.free = 0
+        self.elapsed = self.count
+
+    def open_count(self) -> int:
+        """Slots that haven't started yet, booked or not."""
+        return self.count - self.elapsed
+
+    def is_free(self, index: int) -> bool:
+        return bool(self.free >> index & 1)
+
+    def free_count(self) -> int:
+        return bin(self.free).count("1")
+
+    def free_times(self) -> Iterable[str]:
+        bits, index = self.free, 0
+        while bits:
+            if bits & 1:
+                yield self.time_of(index)
+            bits >>= 1
+            index += 1
+
+
+def date_range(start_date: str, days: int) -> List[str]:
+    start = datetime.strptime(start_date, DATE_FORMAT).date()
+    return [(start + timedelta(days=i)).strftime(DATE_FORMAT) for i in range(days)]
+
+
+async def fetch_booked_times(
+    doctor_ids: List[str], start_date: str, end_date: str
+) -> Dict[Tuple[str, str], Set[str]]:
+    """Scheduled appointment times keyed by (doctor_id, date), in one aggregation."""
+    cursor = get_appointments_collection().aggregate([
+        {"$match": {
+            "doctor_id": {"$in": doctor_ids},
+            "date": {"$gte": start_date, "$lte": end_date},
+            "status": "scheduled",
+        }},
+        {"$group": {
+            "_id": {"doctor_id": "$doctor_id", "date": "$date"},
+            "times": {"$addToSet": "$time"},
+        }},
+    ])
+    booked: Dict[Tuple[str, str], Set[str]] = {}
+    async for group in cursor:
+        key = group["_id"]
+        booked[(key["doctor_id"], key["date"])] = set(group["times"])
+    return booked
+
+
+def build_day_slots(
+    doctor: dict,
+    date: str,
+    booked: Dict[Tuple[str, str], Set[str]],
+    now: Optional[datetime] = None,
+) -> Optional[DaySlots]:
+    """Expand one doctor-day and subtract its booked appointments."""
+    day_of_week = datetime.strptime(date, DATE_FORMAT).strftime("%A")
+    window = working_window(doctor, day_of_week)
+    if window is None:
+        return None
+
+    slots = DaySlots(doctor, date, *window)
+    for hhmm in booked.get((doctor["doctor_id"], date), ()):
+        slots.book(hhmm)
+
+    now = now or datetime.now()
+    if date == now.strftime(DATE_FORMAT):
+        slots.block_before(now.strftime("%H:%M"))
+    elif date < now.strftime(DATE_FORMAT):
+        slots.close()
+    return slots
+
+
+async def load_slots(doctors: List[dict], dates: List[str]) -> List[DaySlots]:
+    """Slot bitmaps for every working doctor-day in ``dates``."""
+    if not doctors or not dates:
+        return []
+    booked = await fetch_booked_times([doc["doctor_id"] for doc in doctors], dates[0], dates[-1])
+    now = datetime.now()
+    days = []
+    for date in dates:
+        for doctor in doctors:
+            slots = build_day_slots(doctor, date, booked, now)
+            if slots is not None:
+                days.append(slots)
+    return days
+
+
+def next_free_slots(days: List[DaySlots], count: int) -> List[Tuple[str, str, dict]]:
+    """The earliest ``count`` free (date, time, doctor) triples across all days.
+
+    ``days`` must be ordered by date, as returned by ``load_slots``.
+    """
+    found = []
+    for _, same_day in groupby(days, key=lambda slots: slots.date):
+        day_found = [
+            (slots.date, hhmm, slots.doctor)
+            for slots in same_day
+            for hhmm in slots.free_times()
+        ]
+        day_found.sort(key=lambda item: (item[1], item[2]["name"]))
+        found.extend(day_found)
+        if len(found) >= count:
+            break
+    return found[:count]
+
+
+def today() -> str:
+    return date_cls.today().strftime(DATE_FORMAT)
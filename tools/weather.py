@@ -1,42 +1,124 @@
 """Weather tool for getting current weather information."""
 
 from livekit.agents import function_tool, RunContext, ToolError
+from observability.tool_metrics import instrumented
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import aiohttp
+import asyncio
 import os
+import time
+
+WEATHER_API_URL = os.getenv("WEATHER_API_URL", "http://api.openweathermap.org/data/2.5/weather")
+CACHE_TTL_SECONDS = float(os.getenv("WEATHER_CACHE_TTL_SECONDS", "600"))
+CACHE_MAX_ENTRIES = int(os.getenv("WEATHER_CACHE_MAX_ENTRIES", "256"))
+
+# (description, temperature, humidity)
+Conditions = Tuple[str, float, int]
+
+_session: Optional[aiohttp.ClientSession] = None
+_cache: "OrderedDict[str, Tuple[float, Conditions]]" = OrderedDict()
+_inflight: Dict[str, asyncio.Task] = {}
+
+
+def _get_session() -> aiohttp.ClientSession:
+    """Process-wide HTTP session so connections, DNS and TLS are reused."""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=5, connect=2),
+            connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=300, keepalive_timeout=30),
+        )
+    return _session
+
+
+async def close_http_session():
+    """Close the shared HTTP session."""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+def _cache_key(city: str) -> str:
+    return " ".join(city.lower().split())
+
+
+def _cache_get(key: str) -> Optional[Conditions]:
+    entry = _cache.get(key)
+    if entry is None:
+        return None
+    expires_at, conditions = entry
+    if expires_at < time.monotonic():
+        del _cache[key]
+        return None
+    _cache.move_to_end(key)
+    return conditions
+
+
+def _cache_put(key: str, conditions: Conditions):
+    _cache[key] = (time.monotonic() + CACHE_TTL_SECONDS, conditions)
+    _cache.move_to_end(key)
+    while len(_cache) > CACHE_MAX_ENTRIES:
+        _cache.popitem(last=False)
+
+
+async def _fetch_conditions(key: str, city: str, api_key: str) -> Conditions:
+    params = {"q": city, "appid": api_key, "units": "metric"}
+    try:
+        async with _get_session().get(WEATHER_API_URL, params=params) as resp:
+            if resp.status != 200:
+                raise ToolError(f"Could not fetch weather for {city}")
+            data = await resp.json()
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        raise ToolError(f"Failed to get weather data: {str(e)}")
+
+    conditions = (data['weather'][0]['description'], data['main']['temp'], data['main']['humidity'])
+    _cache_put(key, conditions)
+    return conditions
+
+
+async def _get_conditions(city: str, api_key: str) -> Conditions:
+    """Cached conditions for a city; concurrent misses share one upstream request."""
+    key = _cache_key(city)
+    conditions = _cache_get(key)
+    if conditions is not None:
+        return conditions
+
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_fetch_conditions(key, city, api_key))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    # Shield so one caller going away doesn't cancel the fetch for the others
+    return await asyncio.shield(task)
 
 
 @function_tool()
+@instrumented
 async def get_weather(
     context: RunContext,
     city: str,
 ) -> str:
     """Get the current weather for a specific city.
-    
+
     Args:
         city: Name of the city (e.g., "London", "New York", "Islamabad")
     """
-    # Mock response - replace with real API call
     # To use real weather data:
     # 1. Sign up at https://openweathermap.org/api
     # 2. Add WEATHER_API_KEY to your .env file
-    # 3. Uncomment the code below
-    
+
     WEATHER_API_KEY = os.getenv("WEATHER_API_KEY")
-    
+
     if WEATHER_API_KEY:
-        import aiohttp
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={WEATHER_API_KEY}&units=metric"
-                async with session.get(url) as resp:
-                    if resp.status != 200:
-                        raise ToolError(f"Could not fetch weather for {city}")
-                    data = await resp.json()
-                    temp = data['main']['temp']
-                    desc = data['weather'][0]['description']
-                    humidity = data['main']['humidity']
-                    return f"The weather in {city} is {desc} with a temperature of {temp} degrees Celsius and {humidity}% humidity"
+            desc, temp, humidity = await _get_conditions(city, WEATHER_API_KEY)
+            return f"The weather in {city} is {desc} with a temperature of {temp} degrees Celsius and {humidity}% humidity"
+        except ToolError:
+            raise
         except Exception as e:
             raise ToolError(f"Failed to get weather data: {str(e)}")
-    
+
     # Mock response when no API key
-    return f"The weather in {city} is sunny with a temperature of 25 degrees Celsius. This is a demo response. Add your weather API key to get real data."
\ No newline at end of file
+    return f"The weather in {city} is sunny with a temperature of 25 degrees Celsius. This is a demo response. Add your weather API key to get real data."
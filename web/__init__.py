@@ -0,0 +1 @@
+"""Request handling helpers for the FastAPI web app."""
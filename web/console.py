@@ -0,0 +1,324 @@
+"""Browser test console and its static assets.
+
+The console page only depends on settings, so it is rendered once at
+startup. Files in ``static/`` are loaded into memory with gzip (and
+brotli, when installed) variants and served under content-hashed URLs
+that can be cached forever; the page itself is revalidated by ETag.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+# Hashed asset URLs never change content, so browsers can keep them for a year
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+# The page and unhashed asset names must be revalidated
+REVALIDATE_CACHE = "no-cache"
+
+
+@dataclass(frozen=True)
+class Encoded:
+    """One response body with its precompressed variants."""
+
+    body: bytes
+    gzip: bytes
+    brotli: Optional[bytes]
+    digest: str
+    content_type: str
+
+    @classmethod
+    def build(cls, body: bytes, content_type: str) -> "Encoded":
+        return cls(
+            body=body,
+            gzip=gzip.compress(body, compresslevel=9, mtime=0),
+            brotli=brotli.compress(body) if brotli is not None else None,
+            digest=hashlib.sha256(body).hexdigest(),
+            content_type=content_type,
+        )
+
+    def negotiate(self, accept_encoding: str):
+        """Smallest body the client accepts, with its Content-Encoding (or None)."""
+        accepted = {part.split(";", 1)[0].strip() for part in accept_encoding.lower().split(",")}
+        if self.brotli is not None and "br" in accepted:
+            return self.brotli, "br"
+        if "gzip" in accepted:
+            return self.gzip, "gzip"
+        return self.body, None
+
+
+def encoded_response(request: Request, encoded: Encoded, cache_control: str) -> Response:
+    """Serve ``encoded`` in the best accepted encoding, or 304 if the client has it."""
+    body, encoding = encoded.negotiate(request.headers.get("accept-encoding", ""))
+    # Each encoding is a different representation, so it gets its own ETag
+    etag = f'"{encoded.digest[:16]}-{encoding}"' if encoding else f'"{encoded.digest[:16]}"'
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type=encoded.content_type, headers=headers)
+
+
+class StaticBundle:
+    """Static files kept in memory, addressable by original and hashed name."""
+
+    def __init__(self, directory: str = "static", prefix: str = "/static"):
+        self.prefix = prefix
+        # Original and hashed file names -> asset
+        self.assets: Dict[str, Encoded] = {}
+        # Original name -> hashed name
+        self.hashed: Dict[str, str] = {}
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if not os.path.isfile(path):
+                continue
+            with open(path, "rb") as f:
+                body = f.read()
+            content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            asset = Encoded.build(body, content_type)
+            stem, ext = os.path.splitext(name)
+            hashed_name = f"{stem}.{asset.digest[:10]}{ext}"
+            self.assets[name] = asset
+            self.assets[hashed_name] = asset
+            self.hashed[name] = hashed_name
+
+    def url(self, name: str) -> str:
+        """Content-hashed URL for ``name``."""
+        return f"{self.prefix}/{self.hashed[name]}"
+
+    def get(self, name: str):
+        """(asset, Cache-Control) for a requested file name, or None."""
+        asset = self.assets.get(name)
+        if asset is None:
+            return None
+        return asset, REVALIDATE_CACHE if name in self.hashed else IMMUTABLE_CACHE
+
+
+def render_console(phone_number: str, twilio_js_url: str) -> str:
+    """Browser interface for making calls"""
+    html = """
+<!DOCTYPE html>
+<html>
+<head>
+  <title>Twilio Browser → LiveKit Test</title>
+  <style>
+    body {
+      font-family: Arial, sans-serif;
+      max-width: 600px;
+      margin: 50px auto;
+      padding: 20px;
+      text-align: center;
+    }
+    button {
+      padding: 15px 30px;
+      font-size: 16px;
+      margin: 10px;
+      cursor: pointer;
+      border-radius: 5px;
+      border: none;
+    }
+    #callBtn {
+      background-color: #4CAF50;
+      color: white;
+    }
+    #hangupBtn {
+      background-color: #f44336;
+      color: white;
+    }
+    #status {
+      margin-top: 20px;
+      padding: 15px;
+      border-radius: 5px;
+      font-weight: bold;
+    }
+    .idle { background-color: #f0f0f0; }
+    .loading { background-color: #fff3cd; }
+    .calling { background-color: #d1ecf1; }
+    .connected { background-color: #d4edda; }
+    .error { background-color: #f8d7da; }
+  </style>
+</head>
+<body>
+  <h2>🎙️ Twilio Browser → LiveKit SIP Test</h2>
+  <p>Call your Twilio number from the browser (no phone needed)</p>
+  
+  <button id="callBtn" onclick="startCall()">📞 Call My Twilio Number</button>
+  <button id="hangupBtn" onclick="hangup()" disabled>❌ Hang Up</button>
+  
+  <div id="status" class="idle">Status: Idle</div>
+  <div id="logs" style="margin-top: 20px; text-align: left; font-family: monospace; font-size: 12px;"></div>
+
+  <script src=\"""" + twilio_js_url + """\"></script>
+  
+  <script>
+    let device;
+    let activeCall;
+    
+    function log(message) {
+      const logs = document.getElementById("logs");
+      const timestamp = new Date().toLocaleTimeString();
+      logs.innerHTML += "[" + timestamp + "] " + message + "<br>";
+      logs.scrollTop = logs.scrollHeight;
+      console.log(message);
+    }
+    
+    function updateStatus(text, className) {
+      const status = document.getElementById("status");
+      status.innerText = "Status: " + text;
+      status.className = className;
+    }
+
+    async function startCall() {
+      try {
+        document.getElementById("callBtn").disabled = true;
+        updateStatus("Getting token...", "loading");
+        log("🔑 Requesting access token...");
+
+        // Check if Twilio is loaded
+        if (typeof Twilio === 'undefined' || typeof Twilio.Device === 'undefined') {
+          throw new Error("Twilio SDK not loaded. Check /static/twilio.min.js");
+        }
+
+        const res = await fetch("/token");
+        if (!res.ok) {
+          throw new Error("Token request failed: " + res.status);
+        }
+        
+        const data = await res.json();
+        log("✅ Token received");
+        
+        updateStatus("Initializing device...", "loading");
+        log("🔧 Initializing Twilio Device (v2.x)...");
+        
+        // Initialize Twilio Device v2.x
+        device = new Twilio.Device(data.token, {
+          logLevel: 1,
+          codecPreferences: ['opus', 'pcmu'],
+          sounds: {
+            incoming: false,
+            outgoing: false,
+            disconnect: false
+          }
+        });
+
+        // Device registered and ready
+        device.on('registered', function() {
+          log("✅ Device registered");
+          updateStatus("Calling...", "calling");
+          log("📞 Placing call to """ + phone_number + """");
+          document.getElementById("hangupBtn").disabled = false;
+          
+          // Make the call
+          var params = {
+            To: '""" + phone_number + """'
+          };
+          
+          activeCall = device.connect({ params: params });
+          
+          // Setup call event handlers
+          setupCallHandlers(activeCall);
+        });
+
+        // Device error
+        device.on('error', function(error) {
+          updateStatus("Device Error: " + error.message, "error");
+          log("❌ Device Error: " + error.message);
+          console.error('Twilio Device Error:', error);
+          document.getElementById("callBtn").disabled = false;
+          document.getElementById("hangupBtn").disabled = true;
+        });
+
+        // Register the device
+        device.register();
+        
+      } catch (error) {
+        updateStatus("Error: " + error.message, "error");
+        log("❌ Exception: " + error.message);
+        console.error(error);
+        document.getElementById("callBtn").disabled = false;
+      }
+    }
+
+    function setupCallHandlers(call) {
+      call.on('accept', function() {
+        updateStatus("Connected ✓", "connected");
+        log("✅ Call connected!");
+      });
+
+      call.on('disconnect', function() {
+        updateStatus("Disconnected", "idle");
+        log("📴 Call ended");
+        document.getElementById("callBtn").disabled = false;
+        document.getElementById("hangupBtn").disabled = true;
+        activeCall = null;
+      });
+
+      call.on('cancel', function() {
+        updateStatus("Call cancelled", "idle");
+        log("📴 Call cancelled");
+        document.getElementById("callBtn").disabled = false;
+        document.getElementById("hangupBtn").disabled = true;
+        activeCall = null;
+      });
+
+      call.on('error', function(error) {
+        updateStatus("Call Error: " + error.message, "error");
+        log("❌ Call Error: " + error.message);
+        console.error('Call Error:', error);
+        document.getElementById("callBtn").disabled = false;
+        document.getElementById("hangupBtn").disabled = true;
+      });
+
+      call.on('reject', function() {
+        updateStatus("Call rejected", "error");
+        log("❌ Call rejected");
+        document.getElementById("callBtn").disabled = false;
+        document.getElementById("hangupBtn").disabled = true;
+      });
+    }
+
+    function hangup() {
+      log("📴 Hanging up...");
+      
+      if (activeCall) {
+        activeCall.disconnect();
+      }
+      
+      if (device) {
+        device.disconnectAll();
+      }
+      
+      updateStatus("Disconnected", "idle");
+      document.getElementById("callBtn").disabled = false;
+      document.getElementById("hangupBtn").disabled = true;
+      activeCall = null;
+    }
+
+    // Log when page loads
+    window.addEventListener('DOMContentLoaded', function() {
+      if (typeof Twilio !== 'undefined' && typeof Twilio.Device !== 'undefined') {
+        log("✅ Twilio Voice SDK v2.x loaded successfully");
+      } else {
+        log("❌ Twilio SDK failed to load - please check console");
+        updateStatus("Error: Twilio SDK not loaded", "error");
+      }
+    });
+  </script>
+</body>
+</html>
+"""
+    return html
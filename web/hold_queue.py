@@ -0,0 +1,214 @@
+"""Overflow hold queue for the voice webhook.
+
+When no agent worker has room for another call, ``/voice`` puts the caller
+in a Twilio queue instead of dialing LiveKit. Twilio polls ``/hold`` while
+they wait. The caller at the front is sent ``<Leave/>`` as soon as capacity
+frees up, so callers leave in FIFO order. ``/hold/done`` then dials them
+into LiveKit and records how long they waited.
+
+Twilio only polls ``/hold`` again once the previous response has finished
+playing. The front caller therefore gets a ``HOLD_POLL_SECONDS`` pause
+rather than the hold music, and ``HOLD_MUSIC_URL`` should be a short clip
+(it is replayed on every poll) so the callers behind are re-checked every
+few seconds.
+
+Whether new calls join the queue depends on the queue size Twilio last
+reported, which expires after ``STATUS_MAX_AGE``. Nothing is counted per
+process, so a ``/hold/done`` callback that fails or reaches another web
+worker can't leave new calls held forever.
+
+Capacity comes from the load history each agent worker writes to
+``AGENT_STATUS_DIR`` (see ``observability.worker_load``), cached for
+``CAPACITY_CACHE_SECONDS``. For local testing, ``AGENT_CAPACITY_FILE`` can
+hold a plain number of free sessions instead. With no fresh signal at all
+the webhook dials directly, so a web app that can't see the workers never
+holds callers.
+"""
+
+import json
+import math
+import os
+import time
+from collections import deque
+from typing import Deque, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+from twilio.twiml.voice_response import VoiceResponse
+
+HOLD_ANNOUNCEMENT = (
+    "Thank you for calling. All of our receptionists are helping other callers right now. "
+    "Please stay on the line and you will be connected in the order you called."
+)
+
+# Worker status files older than this are ignored (workers write every 5 s)
+STATUS_MAX_AGE = 15.0
+
+QUEUE_DEPTH = Gauge(
+    "hospital_hold_queue_depth",
+    "Callers waiting in the overflow hold queue",
+    multiprocess_mode="livesum",
+)
+QUEUE_WAIT = Histogram(
+    "hospital_hold_queue_wait_seconds",
+    "Time callers spent in the overflow hold queue, by how they left it",
+    ["result"],
+    buckets=(1, 5, 10, 20, 30, 60, 120, 300, 600),
+)
+QUEUE_CALLS = Counter(
+    "hospital_hold_queue_calls_total",
+    "Incoming calls by whether they were dialed directly or held",
+    ["route"],
+)
+
+
+class CapacitySignal:
+    """Free agent sessions on this host, re-read at most every ``cache_seconds``."""
+
+    def __init__(self, cache_seconds: Optional[float] = None):
+        self.cache_seconds = cache_seconds if cache_seconds is not None else float(os.getenv("CAPACITY_CACHE_SECONDS", "1"))
+        self.override_file = os.getenv("AGENT_CAPACITY_FILE")
+        self.status_dir = os.getenv("AGENT_STATUS_DIR", ".cache/agent-status")
+        self._free: Optional[int] = None
+        self._read_at = 0.0
+        # Newest worker status time, and calls sent to LiveKit since then
+        self._status_at = 0.0
+        self._dialed: Deque[float] = deque()
+
+    def _read_override(self) -> Optional[int]:
+        try:
+            self._status_at = os.path.getmtime(self.override_file)
+            with open(self.override_file) as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return None
+
+    def _read_workers(self) -> Optional[int]:
+        free, found, now = 0, False, time.time()
+        try:
+            names = os.listdir(self.status_dir)
+        except OSError:
+            return None
+        for name in names:
+            if not (name.startswith("worker-") and name.endswith(".json")):
+                continue
+            path = os.path.join(self.status_dir, name)
+            try:
+                mtime = os.path.getmtime(path)
+                if now - mtime > STATUS_MAX_AGE:
+                    continue
+                with open(path) as f:
+                    status = json.load(f)
+                latest = status["history"][-1]
+            except (OSError, ValueError, KeyError, IndexError):
+                continue
+            found = True
+            self._status_at = max(self._status_at, mtime)
+            if latest["load"] >= status["threshold"]:
+                continue
+            # Sessions the worker will still admit before hitting its threshold
+            free += max(0, math.floor(status["threshold"] * status["max_sessions"] + 1e-9) - latest["sessions"])
+        return free if found else None
+
+    def free(self) -> Optional[int]:
+        """Free sessions, or None when no worker status is available."""
+        now = time.time()
+        if now - self._read_at >= self.cache_seconds:
+            self._read_at = now
+            self._free = self._read_override() if self.override_file else self._read_workers()
+        if self._free is None:
+            return None
+        # Calls dialed after the last status write aren't counted in it yet
+        while self._dialed and self._dialed[0] <= self._status_at:
+            self._dialed.popleft()
+        return max(0, self._free - len(self._dialed))
+
+    def has_room(self) -> bool:
+        free = self.free()
+        return free is None or free > 0
+
+    def dialed(self):
+        """Count a call sent to LiveKit against capacity until the next status update."""
+        self._dialed.append(time.time())
+
+
+class HoldQueue:
+    """Precompiled queue TwiML and the FIFO dequeue decision."""
+
+    def __init__(self, capacity: Optional[CapacitySignal] = None):
+        self.capacity = capacity or CapacitySignal()
+        self.enabled = os.getenv("HOLD_QUEUE_ENABLED", "1") == "1"
+        # Queue size Twilio last reported (or we last enqueued into), trusted for STATUS_MAX_AGE
+        self.reported_size = 0
+        self.reported_at = 0.0
+        name = os.getenv("HOLD_QUEUE_NAME", "receptionist-overflow")
+        music_url = os.getenv("HOLD_MUSIC_URL")
+        poll_seconds = int(os.getenv("HOLD_POLL_SECONDS", "3"))
+
+        response = VoiceResponse()
+        response.enqueue(name, action="/hold/done", method="POST", wait_url="/hold", wait_url_method="POST")
+        self.enqueue_twiml = str(response).encode()
+
+        # Twilio requests /hold again each time the previous response finishes playing
+        self.announce_twiml = self._hold_twiml(music_url, poll_seconds, announce=True)
+        self.wait_twiml = self._hold_twiml(music_url, poll_seconds, announce=False)
+        # The front caller is the one waiting on capacity, so poll it on a short pause
+        self.front_twiml = self._hold_twiml(None, poll_seconds, announce=False)
+
+        response = VoiceResponse()
+        response.leave()
+        self.leave_twiml = str(response).encode()
+
+        response = VoiceResponse()
+        response.hangup()
+        self.hangup_twiml = str(response).encode()
+
+    @staticmethod
+    def _hold_twiml(music_url: Optional[str], poll_seconds: int, announce: bool) -> bytes:
+        response = VoiceResponse()
+        if announce:
+            response.say(HOLD_ANNOUNCEMENT)
+        if music_url:
+            response.play(music_url)
+        else:
+            response.pause(length=poll_seconds)
+        return str(response).encode()
+
+    def queue_size(self) -> int:
+        """Callers in the queue as last reported, or 0 once that report is stale."""
+        return self.reported_size if time.time() - self.reported_at < STATUS_MAX_AGE else 0
+
+    def should_hold(self) -> bool:
+        """Route a new call to the queue? Callers already waiting keep their place."""
+        if not self.enabled:
+            return False
+        return self.queue_size() > 0 or not self.capacity.has_room()
+
+    def enqueued(self):
+        QUEUE_CALLS.labels(route="held").inc()
+        QUEUE_DEPTH.inc()
+        # Hold calls arriving before Twilio's first poll reports this one
+        self.reported_size, self.reported_at = self.queue_size() + 1, time.time()
+
+    def dialing(self):
+        QUEUE_CALLS.labels(route="direct").inc()
+        self.capacity.dialed()
+
+    def wait_response(self, position: Optional[str], queue_time: Optional[str], queue_size: Optional[str]) -> bytes:
+        """TwiML for a ``/hold`` poll: leave if first in line and there is room."""
+        if queue_size and queue_size.isdigit():
+            self.reported_size, self.reported_at = int(queue_size), time.time()
+        if position == "1" and self.capacity.has_room():
+            self.capacity.dialed()
+            return self.leave_twiml
+        if (queue_time or "0") == "0":
+            return self.announce_twiml
+        return self.front_twiml if position == "1" else self.wait_twiml
+
+    def left(self, result: Optional[str], queue_time: Optional[str]):
+        """Record a caller leaving the queue; ``result`` is Twilio's QueueResult."""
+        QUEUE_DEPTH.dec()
+        self.reported_size = max(0, self.reported_size - 1)
+        try:
+            QUEUE_WAIT.labels(result=result or "unknown").observe(float(queue_time or 0))
+        except ValueError:
+            pass
@@ -0,0 +1,112 @@
+"""Production entry point for the web app: ``uv run main.py``.
+
+Runs uvicorn with uvloop and httptools when they are installed, optional
+worker processes, and keep-alive and shutdown timeouts from the
+environment. ``/healthz`` answers as long as the process serves requests.
+``/readyz`` turns 503 as soon as SIGTERM arrives.
+
+On SIGTERM the server keeps serving for ``WEB_DRAIN_DELAY_SECONDS`` so load
+balancers see the failing readiness check and stop routing to it. It then
+stops accepting connections and waits up to
+``WEB_GRACEFUL_TIMEOUT_SECONDS`` for in-flight webhooks to finish.
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import time
+from contextlib import asynccontextmanager
+from importlib.util import find_spec
+from typing import Optional
+
+logger = logging.getLogger("web")
+
+
+class Health:
+    """Liveness and readiness of this worker process."""
+
+    started_at: Optional[float] = None
+    draining_since: Optional[float] = None
+
+    @classmethod
+    def ready(cls) -> bool:
+        return cls.started_at is not None and cls.draining_since is None
+
+    @classmethod
+    def status(cls) -> dict:
+        now = time.monotonic()
+        return {
+            "ready": cls.ready(),
+            "uptime_seconds": round(now - cls.started_at, 1) if cls.started_at is not None else 0.0,
+            "draining_seconds": round(now - cls.draining_since, 1) if cls.draining_since is not None else None,
+            "pid": os.getpid(),
+        }
+
+
+def _install_drain_handler(delay: float):
+    """Flip readiness on SIGTERM and hand the signal to uvicorn ``delay`` seconds later."""
+    # Uvicorn installs its own handlers before the lifespan starts; wrap its SIGTERM one
+    uvicorn_handler = signal.getsignal(signal.SIGTERM)
+    if not callable(uvicorn_handler):
+        return
+    loop = asyncio.get_running_loop()
+
+    def on_sigterm(sig, frame):
+        if Health.draining_since is not None:
+            # A second SIGTERM skips the remaining delay
+            uvicorn_handler(sig, frame)
+            return
+        Health.draining_since = time.monotonic()
+        logger.info("SIGTERM received; draining for %.1fs before shutdown", delay)
+        loop.call_soon_threadsafe(loop.call_later, delay, uvicorn_handler, sig, frame)
+
+    signal.signal(signal.SIGTERM, on_sigterm)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    delay = float(os.getenv("WEB_DRAIN_DELAY_SECONDS", "5"))
+    if delay > 0:
+        _install_drain_handler(delay)
+    Health.started_at = time.monotonic()
+    yield
+
+
+def _event_loop() -> str:
+    return "uvloop" if find_spec("uvloop") else "asyncio"
+
+
+def _http_protocol() -> str:
+    return "httptools" if find_spec("httptools") else "h11"
+
+
+def serve(app, import_string: str = "main:app"):
+    """Run the app under uvicorn with settings from the environment."""
+    import uvicorn
+
+    workers = int(os.getenv("WEB_WORKERS", "1"))
+    loop, http = _event_loop(), _http_protocol()
+    if (loop, http) != ("uvloop", "httptools"):
+        logger.warning("running with %s/%s; install uvloop and httptools for production", loop, http)
+    limit = os.getenv("WEB_LIMIT_CONCURRENCY")
+
+    uvicorn.run(
+        # Worker processes import the app themselves
+        import_string if workers > 1 else app,
+        host=os.getenv("WEB_HOST", "0.0.0.0"),
+        port=int(os.getenv("WEB_PORT", "8000")),
+        workers=workers,
+        loop=loop,
+        http=http,
+        # Longer than the usual 60s proxy idle timeout, so the proxy closes idle connections first
+        timeout_keep_alive=int(os.getenv("WEB_KEEPALIVE_SECONDS", "75")),
+        timeout_graceful_shutdown=int(os.getenv("WEB_GRACEFUL_TIMEOUT_SECONDS", "30")),
+        backlog=int(os.getenv("WEB_BACKLOG", "2048")),
+        limit_concurrency=int(limit) if limit else None,
+        access_log=os.getenv("WEB_ACCESS_LOG", "0") == "1",
+        # Leave logging to observability.logs
+        log_config=None,
+        proxy_headers=True,
+        forwarded_allow_ips=os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1"),
+    )
@@ -0,0 +1,84 @@
+"""Twilio access tokens for the browser console, reused per identity.
+
+Signing a token is the most expensive thing ``/token`` does, and a QA run
+with hundreds of browser clients asks for one per page load. A signed JWT
+is kept per identity and handed out again until it is within
+``TWILIO_TOKEN_REFRESH_SECONDS`` of expiring.
+
+``/token`` is unauthenticated and its tokens accept incoming calls, so only
+the identities listed in ``TWILIO_TOKEN_IDENTITIES`` are ever signed. That
+also bounds the cache to one token per listed identity.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from twilio.jwt.access_token import AccessToken
+from twilio.jwt.access_token.grants import VoiceGrant
+
+
+class TokenCache:
+    """Signed Voice access tokens for a fixed set of identities."""
+
+    def __init__(
+        self,
+        account_sid: str,
+        api_key: str,
+        api_secret: str,
+        twiml_app_sid: str,
+        ttl_seconds: Optional[int] = None,
+        refresh_seconds: Optional[int] = None,
+        identities: Optional[Iterable[str]] = None,
+    ):
+        self.account_sid = account_sid
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.twiml_app_sid = twiml_app_sid
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else int(os.getenv("TWILIO_TOKEN_TTL_SECONDS", "3600"))
+        self.refresh_seconds = refresh_seconds if refresh_seconds is not None else int(os.getenv("TWILIO_TOKEN_REFRESH_SECONDS", "300"))
+        if identities is None:
+            identities = os.getenv("TWILIO_TOKEN_IDENTITIES", "browser-user").split(",")
+        # The first identity is what the console asks for by default
+        self.identities = tuple(identity.strip() for identity in identities if identity.strip()) or ("browser-user",)
+        self._tokens: Dict[str, Tuple[float, str]] = {}
+        # /token is a sync endpoint, so it runs on the threadpool
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _sign(self, identity: str) -> str:
+        token = AccessToken(
+            self.account_sid,
+            self.api_key,
+            self.api_secret,
+            identity=identity,
+            ttl=self.ttl_seconds,
+        )
+        grant = VoiceGrant(
+            outgoing_application_sid=self.twiml_app_sid,
+            incoming_allow=True
+        )
+        token.add_grant(grant)
+        return token.to_jwt()
+
+    def allows(self, identity: str) -> bool:
+        return identity in self.identities
+
+    def get(self, identity: str) -> str:
+        """Token for an allowed ``identity``; raises KeyError for any other."""
+        if not self.allows(identity):
+            raise KeyError(identity)
+        now = time.time()
+        with self._lock:
+            entry = self._tokens.get(identity)
+            if entry is not None and entry[0] - self.refresh_seconds > now:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        jwt = self._sign(identity)
+        with self._lock:
+            self._tokens[identity] = (now + self.ttl_seconds, jwt)
+        return jwt
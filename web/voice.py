@@ -0,0 +1,111 @@
+"""Precompiled TwiML and signature checks for the Twilio voice webhook.
+
+The ``/voice`` response depends only on settings read at startup, so the
+XML is rendered once per trunk and the webhook returns the stored bytes.
+Calls to a number listed in ``LIVEKIT_SIP_TRUNKS`` (``+1555...=host``,
+comma separated) are dialed into that SIP host; everything else uses
+``TWILIO_PHONE_NUMBER`` and ``LIVEKIT_SIP_HOST``.
+
+When ``TWILIO_AUTH_TOKEN`` is set, requests must carry a valid
+``X-Twilio-Signature``. The HMAC key schedule is computed once and copied
+per request.
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from twilio.twiml.voice_response import VoiceResponse
+
+
+def render_twiml(number: str, sip_host: str, username: Optional[str], password: Optional[str]) -> bytes:
+    """TwiML that dials ``number`` into LiveKit over SIP."""
+    response = VoiceResponse()
+    # Use callerId to set a valid E.164 phone number for SIP
+    dial = response.dial(caller_id=number)
+    dial.sip(f"sip:{number}@{sip_host}", username=username, password=password)
+    return str(response).encode()
+
+
+def parse_trunks(value: str) -> Dict[str, str]:
+    """``"+15551234567=host-a,+15557654321=host-b"`` -> {number: sip_host}."""
+    trunks = {}
+    for part in value.split(","):
+        if "=" not in part:
+            continue
+        number, host = part.split("=", 1)
+        trunks[number.strip()] = host.strip()
+    return trunks
+
+
+class TwimlTable:
+    """Rendered TwiML per called number, with a default for everything else."""
+
+    def __init__(self, default: bytes, variants: Optional[Dict[str, bytes]] = None):
+        self.default = default
+        self.variants = variants or {}
+
+    @classmethod
+    def from_env(cls) -> "TwimlTable":
+        username = os.getenv("LIVEKIT_SIP_USERNAME")
+        password = os.getenv("LIVEKIT_SIP_PASSWORD")
+        default = render_twiml(os.getenv("TWILIO_PHONE_NUMBER"), os.getenv("LIVEKIT_SIP_HOST"), username, password)
+        variants = {
+            number: render_twiml(number, host, username, password)
+            for number, host in parse_trunks(os.getenv("LIVEKIT_SIP_TRUNKS", "")).items()
+        }
+        return cls(default, variants)
+
+    def lookup(self, called: Optional[str]) -> bytes:
+        return self.variants.get(called, self.default) if called else self.default
+
+
+class SignatureValidator:
+    """Checks ``X-Twilio-Signature`` (HMAC-SHA1 over the URL and sorted POST params)."""
+
+    def __init__(self, auth_token: str, base_url: Optional[str] = None):
+        self._mac = hmac.new(auth_token.encode(), digestmod=hashlib.sha1)
+        # Public URL Twilio signed, when the app sits behind a proxy or tunnel
+        self.base_url = base_url.rstrip("/") if base_url else None
+
+    @classmethod
+    def from_env(cls) -> Optional["SignatureValidator"]:
+        token = os.getenv("TWILIO_AUTH_TOKEN")
+        if not token:
+            return None
+        return cls(token, os.getenv("TWILIO_WEBHOOK_BASE_URL"))
+
+    def signature(self, url: str, params: Dict[str, List[str]]) -> str:
+        mac = self._mac.copy()
+        mac.update(url.encode())
+        for name in sorted(params):
+            for value in sorted(set(params[name])):
+                mac.update(name.encode())
+                mac.update(value.encode())
+        return base64.b64encode(mac.digest()).decode()
+
+    def candidate_urls(self, url: str) -> Iterable[str]:
+        """``url`` as received plus with the default port toggled, as Twilio may sign either."""
+        yield url
+        parts = urlsplit(url)
+        default_port = {"https": 443, "http": 80}.get(parts.scheme)
+        if parts.port is not None:
+            yield urlunsplit(parts._replace(netloc=parts.hostname))
+        elif default_port is not None:
+            yield urlunsplit(parts._replace(netloc=f"{parts.hostname}:{default_port}"))
+
+    def is_valid(self, url: str, params: Dict[str, List[str]], signature: Optional[str]) -> bool:
+        if not signature:
+            return False
+        return any(
+            hmac.compare_digest(self.signature(candidate, params), signature)
+            for candidate in self.candidate_urls(url)
+        )
+
+    def request_url(self, path: str, query: str, received_url: str) -> str:
+        if self.base_url is None:
+            return received_url
+        return f"{self.base_url}{path}?{query}" if query else f"{self.base_url}{path}"